@@ -1,48 +1,56 @@
 # app.py
 from flask import Flask, jsonify, request, send_from_directory, send_file, Response
-from scrapers.amazon_scraper import amazon_scrape
-from scrapers.flipkart_scraper import flipkart_scrape
-from scrapers.myntra_scraper import myntra_scrape
-from scrapers.ajio_scraper import ajio_scrape
 from utils.file_handler import save_scraped_data, convert_to_csv, DATA_DIR
-from utils.visualization import generate_visualizations
+from utils.visualization import generate_visualizations, chart_cache
 from utils.terminal import output_queue, input_queue  # Import queues
+from utils.waits import get_wait_stats
+from utils.page_cache import page_cache
+from utils.jobs import start_job, get_job, jobs
+from utils.batch import ScrapeQuery
+from utils.scheduler import scheduler, schedule_job, PLATFORMS, load_scraper
+from utils.checkpoint import list_checkpoints, load_query
+from utils.product_store import product_store
+from utils.driver_pool import warm_up
 import os
-import threading
 import datetime
 import json
 from pathlib import Path
 
 app = Flask(__name__)
 
-def stream_output():
+def stream_output(events=output_queue):
     while True:
-        output = output_queue.get()
+        output = events.get()
         if output is None:
             break
         yield f"data: {output}\n\n"
 
-# Track active scrapers to prevent duplicates
-scraper_threads = {}
+# Track the scrapers started through the shared terminal to prevent duplicates
+scraper_jobs = {}
+
+def start_query(query, priority=0, user=None):
+    """Queues a job that runs a ScrapeQuery without prompts on the scheduler's workers."""
+    return schedule_job(query.platform, query, priority=priority, user=user)
+
+def job_options():
+    """Scheduling priority and user of a job request; the user defaults to the client address."""
+    data = request.get_json(silent=True) or {}
+    priority = data.get('priority') or 0
+    if not isinstance(priority, int):
+        raise ValueError("priority must be an integer")
+    return priority, data.get('user') or request.remote_addr
 
 @app.route('/api/scrape/<platform>', methods=['POST'])
 def scrape(platform):
     # Check if the scraper is already running
-    if platform in scraper_threads and scraper_threads[platform].is_alive():
+    if platform in scraper_jobs and not scraper_jobs[platform].done():
         return jsonify({"error": "Scraping in progress..."}), 409
 
     # Check request content type
     if not request.is_json:
         return jsonify({"error": "Unsupported Media Type"}), 415
 
-    scraper_functions = {
-        'amazon': amazon_scrape,
-        'flipkart': flipkart_scrape,
-        'myntra': myntra_scrape,
-        'ajio': ajio_scrape
-    }
-
-    if platform not in scraper_functions:
+    if platform not in PLATFORMS:
         return jsonify({"error": "Invalid platform"}), 400
 
     # Clear queues
@@ -51,12 +59,155 @@ def scrape(platform):
     with output_queue.mutex:
         output_queue.queue.clear()
 
-    # Start scraper in a new thread
-    scraper_thread = threading.Thread(target=scraper_functions[platform], daemon=True)
-    scraper_threads[platform] = scraper_thread
-    scraper_thread.start()
+    # Run the scraper on the shared crawl event loop, talking through the shared terminal queues
+    # The scraper module (and Selenium with it) is imported on its first scrape, not with the app
+    job = start_job(platform, load_scraper(platform), events=output_queue.shared, inputs=input_queue.shared)
+    scraper_jobs[platform] = job
 
-    return jsonify({"status": "Scrape started"}), 200
+    return jsonify({"status": "Scrape started", "job_id": job.id}), 200
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    # Each job has its own terminal channels, so any number can run side by side
+    if not request.is_json:
+        return jsonify({"error": "Unsupported Media Type"}), 415
+
+    platform = request.json.get('platform')
+    if platform not in PLATFORMS:
+        return jsonify({"error": "Invalid platform"}), 400
+
+    # With a search term the job runs without prompts, otherwise it asks on its input channel
+    try:
+        priority, user = job_options()
+        query = ScrapeQuery.from_dict(request.json) if 'search_term' in request.json else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job = schedule_job(platform, query, priority=priority, user=user)
+    return jsonify(job.to_dict()), 201
+
+@app.route('/api/batch', methods=['POST'])
+def create_batch():
+    # {"queries": [{"platform": ..., "search_term": ..., "fields": [...], "max_pages": ...}, ...], "defaults": {...}}
+    if not request.is_json:
+        return jsonify({"error": "Unsupported Media Type"}), 415
+
+    try:
+        priority, user = job_options()
+        defaults = request.json.get('defaults') or {}
+        queries = [ScrapeQuery.from_dict(data, defaults) for data in request.json.get('queries') or []]
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    if not queries:
+        return jsonify({"error": "No queries provided"}), 400
+
+    return jsonify([start_query(query, priority, user).to_dict() for query in queries]), 201
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify([job.to_dict() for job in jobs.values()]), 200
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return Response(stream_output(job.events), mimetype='text/event-stream')
+
+@app.route('/api/jobs/<job_id>/input', methods=['POST'])
+def job_input(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    user_input = request.json.get('input')
+    if user_input:
+        scheduler.send_input(job, user_input)
+        return jsonify({"status": "Input received"}), 200
+    return jsonify({"error": "No input provided"}), 400
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not scheduler.cancel(job):
+        return jsonify({"error": "Job already finished"}), 409
+    return jsonify({"status": "Cancellation requested"}), 200
+
+@app.route('/api/products', methods=['GET'])
+def products():
+    # Latest details of every product scraped so far, e.g. ?platform=amazon&max_price=2000&min_rating=4
+    try:
+        found = product_store.query(
+            platform=request.args.get('platform'),
+            brand=request.args.get('brand'),
+            max_price=request.args.get('max_price', type=float),
+            min_price=request.args.get('min_price', type=float),
+            min_rating=request.args.get('min_rating', type=float),
+            scraped_after=request.args.get('scraped_after', type=float),
+            search_term=request.args.get('search_term'),
+            limit=request.args.get('limit', 100, type=int),
+            offset=request.args.get('offset', 0, type=int),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify(found), 200
+
+@app.route('/api/products/<platform>/<product_id>/history', methods=['GET'])
+def price_history(platform, product_id):
+    # Prices of one product in every run that saw it, oldest first
+    return jsonify(product_store.price_series(platform, product_id)), 200
+
+@app.route('/api/runs', methods=['GET'])
+def runs():
+    return jsonify(product_store.runs(platform=request.args.get('platform'),
+                                      search_term=request.args.get('search_term'),
+                                      limit=request.args.get('limit', 100, type=int))), 200
+
+@app.route('/api/runs/<run>/diff', methods=['GET'])
+def run_diff(run):
+    # Price drops and rises, new and delisted products since the previous run of the search (or ?previous=)
+    diff = product_store.run_diff(run, previous=request.args.get('previous'))
+    if diff is None:
+        return jsonify({"error": "Run not found"}), 404
+    return jsonify(diff), 200
+
+@app.route('/api/checkpoints', methods=['GET'])
+def checkpoints():
+    # Unfinished scrapes that can be resumed
+    return jsonify(list_checkpoints()), 200
+
+@app.route('/api/checkpoints/<name>/resume', methods=['POST'])
+def resume_checkpoint(name):
+    query = load_query(name)
+    if query is None:
+        return jsonify({"error": "Checkpoint not found"}), 404
+    try:
+        priority, user = job_options()
+        job = start_query(ScrapeQuery.from_dict(dict(query, resume=True)), priority, user)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(job.to_dict()), 201
+
+@app.route('/api/scheduler', methods=['GET'])
+def scheduler_stats():
+    # Queue depth and worker utilization, for sizing SCHEDULER_WORKERS
+    return jsonify(scheduler.stats()), 200
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not job.done():
+        return jsonify({"error": "Scraping in progress..."}), 409
+    return jsonify({"job": job.to_dict(), "products": list(job.products())}), 200
 
 @app.route('/api/input', methods=['POST'])
 def handle_input():
@@ -66,6 +217,21 @@ def handle_input():
         return jsonify({"status": "Input received"}), 200
     return jsonify({"error": "No input provided"}), 400
 
+@app.route('/api/wait-stats', methods=['GET'])
+def wait_stats():
+    # Time spent waiting for pages to become ready, per wait label
+    return jsonify(get_wait_stats()), 200
+
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    # Page cache hits and misses of the web app process (scrapes on the scheduler's workers count in theirs)
+    return jsonify(page_cache.stats()), 200
+
+@app.route('/api/chart-cache-stats', methods=['GET'])
+def chart_cache_stats():
+    # Chart cache hits and misses of the web app process
+    return jsonify(chart_cache.stats()), 200
+
 @app.route('/download/<filename>', methods=['GET'])
 def download_file(filename):
     return send_from_directory(DATA_DIR, filename, as_attachment=True)
@@ -123,7 +289,7 @@ def generate_files():
 
 # Handle visualization generation
 @app.route('/api/generate-visualizations', methods=['POST'])
-def generate_visualizations():
+def create_visualizations():
     data = request.json
     platform = data.get('platform')
     search_term = data.get('search_term')
@@ -133,7 +299,7 @@ def generate_visualizations():
         return jsonify({"error": "Invalid input data"}), 400
 
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    visuals = generate_visualizations(scraped_data, search_term, timestamp)
+    visuals, _ = generate_visualizations(scraped_data, search_term, timestamp)
 
     return jsonify({
         "visualizations": {
@@ -166,4 +332,7 @@ def download_visualizations():
 
 
 if __name__ == '__main__':
+    # Pre-launch the pooled browsers in the process that serves requests, not in the reloader's watcher
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_up()
     app.run(debug=True)
\ No newline at end of file
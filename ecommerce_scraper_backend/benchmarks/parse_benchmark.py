@@ -0,0 +1,78 @@
+# benchmarks/parse_benchmark.py
+"""
+Per-page parse time of each HTML parser backend on saved Amazon product pages.
+
+Save a few product pages from the browser ("Save page as", HTML only), then run from
+ecommerce_scraper_backend:
+
+    python -m benchmarks.parse_benchmark page1.html page2.html --repeat 5
+"""
+import argparse
+import time
+from utils.parsing import PARSER_BACKENDS, make_soup, resolve_parser
+from utils.terminal import output_queue
+from scrapers.amazon_scraper import parse_product_page, PRODUCT_PAGE_SECTIONS
+
+
+ALL_FIELDS = ["title", "original_price", "discounted_price", "discount_percentage", "rating",
+              "reviews_count", "last_month_sales", "additional_features"]
+
+
+def parse_page(html, parser, parse_only):
+    """Parses one page and extracts every Amazon field, like a product page visit does."""
+    product_details = {}
+    parse_product_page(make_soup(html, parse_only=parse_only, parser=parser), product_details, ALL_FIELDS)
+    return product_details
+
+
+def benchmark(pages, repeat):
+    """
+    Times every installed backend, with and without restricted parsing.
+
+    :param pages: HTML of the saved product pages
+    :param repeat: Number of times each page is parsed per backend
+    :return: List of (backend, restricted, milliseconds per page, pages whose fields differ from a full parse)
+    """
+    results = []
+    for parser in PARSER_BACKENDS:
+        if resolve_parser(parser) != parser:
+            print(f"Skipping {parser}: not installed")
+            continue
+
+        for parse_only in (None, PRODUCT_PAGE_SECTIONS):
+            mismatches = sum(parse_page(html, parser, parse_only) != parse_page(html, parser, None) for html in pages)
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for html in pages:
+                    parse_page(html, parser, parse_only)
+            elapsed = time.perf_counter() - started
+
+            # parse_product_page reports every field on the terminal queue
+            with output_queue.mutex:
+                output_queue.queue.clear()
+
+            results.append((parser, parse_only is not None, elapsed * 1000 / (repeat * len(pages)), mismatches))
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("pages", nargs="+", help="Saved Amazon product page HTML files")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Parses per page and backend")
+    args = arg_parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    average_size = sum(len(html) for html in pages) / len(pages) / 1024
+
+    print(f"{len(pages)} pages, {average_size:.0f} KB on average, {args.repeat} repeats")
+    print(f"{'backend':<12} {'restricted':<11} {'ms/page':>9}  fields differ")
+    for parser, restricted, ms_per_page, mismatches in benchmark(pages, args.repeat):
+        print(f"{parser:<12} {'yes' if restricted else 'no':<11} {ms_per_page:>9.1f}  {mismatches}/{len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
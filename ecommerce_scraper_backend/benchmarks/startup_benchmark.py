@@ -0,0 +1,83 @@
+# benchmarks/startup_benchmark.py
+"""
+Import time of the web app and the scheduler's worker processes, as a guard on their cold start.
+
+Each module is imported in fresh interpreters; the benchmark fails (exit status 1) when the median
+import takes longer than the budget or pulls in one of the heavy libraries the scrapers and charts
+load on first use. Run from ecommerce_scraper_backend:
+
+    python -m benchmarks.startup_benchmark --repeat 5 --budget 0.5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+# Modules a cold start imports: the web app, and the scheduler a spawned worker process starts from
+MODULES = ["app", "utils.scheduler"]
+
+# Libraries only a scrape, a chart, a Parquet export or a run diff needs
+HEAVY_MODULES = ["selenium", "aiohttp", "bs4", "pandas", "numpy", "matplotlib", "seaborn", "wordcloud", "pyarrow"]
+
+# Run in the fresh interpreter: prints the import time and the heavy libraries it loaded
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps([elapsed, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+
+def import_time(module):
+    """
+    Imports a module in a new interpreter.
+
+    :return: (seconds the import took, heavy libraries it loaded)
+    """
+    probe = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    elapsed, loaded = json.loads(output.strip().splitlines()[-1])
+    return elapsed, loaded
+
+
+def benchmark(modules, repeat):
+    """
+    Times the imports of every module.
+
+    :param modules: Module names, e.g. 'app'
+    :param repeat: Number of fresh interpreters per module
+    :return: List of (module, median seconds, slowest seconds, heavy libraries loaded)
+    """
+    results = []
+    for module in modules:
+        times = []
+        loaded = set()
+        for _ in range(repeat):
+            elapsed, heavy = import_time(module)
+            times.append(elapsed)
+            loaded.update(heavy)
+        results.append((module, statistics.median(times), max(times), sorted(loaded)))
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to import (the app and the scheduler by default)")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    arg_parser.add_argument("--budget", type=float, default=0.5, help="Median import seconds allowed per module")
+    args = arg_parser.parse_args()
+
+    failed = False
+    print(f"{'module':<18} {'median s':>9} {'max s':>7}  heavy libraries loaded")
+    for module, median, slowest, loaded in benchmark(args.modules, args.repeat):
+        over = median > args.budget or loaded
+        failed = failed or over
+        print(f"{module:<18} {median:>9.3f} {slowest:>7.3f}  {', '.join(loaded) or '-'}{'  OVER BUDGET' if over else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
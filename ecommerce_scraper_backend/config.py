@@ -3,3 +3,69 @@ import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'hard_to_guess_string'
     DEBUG = True
+    # Number of browsers that visit product pages in parallel per scrape
+    SCRAPER_WORKERS = int(os.environ.get('SCRAPER_WORKERS') or 3)
+    # Maximum seconds to wait for a page to become ready before scraping it anyway
+    WAIT_TIMEOUT = float(os.environ.get('WAIT_TIMEOUT') or 10)
+    # How product pages are fetched: 'browser', or 'http' to download server-rendered pages
+    # and only fall back to the browser when a required field is missing (Amazon and Flipkart)
+    FETCH_MODE = os.environ.get('FETCH_MODE') or 'browser'
+    HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE') or 10)
+    HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT') or 15)
+    # Scheme and host to fetch product pages from instead of the real site, e.g. a local server with saved pages
+    HTTP_BASE_URL = os.environ.get('HTTP_BASE_URL')
+    # Product page fetches allowed in flight per host, across all running scrapes
+    CRAWL_PER_HOST_LIMIT = int(os.environ.get('CRAWL_PER_HOST_LIMIT') or 16)
+    # Threads that run the blocking Selenium, parsing and file work of the crawl loop
+    CRAWL_BLOCKING_THREADS = int(os.environ.get('CRAWL_BLOCKING_THREADS') or 32)
+    # BeautifulSoup backend for the scraped pages: 'lxml' (C, falls back to 'html.parser' if not installed) or 'html.parser'
+    HTML_PARSER = os.environ.get('HTML_PARSER') or 'lxml'
+    # Parse only the page sections a scraper reads where it declares them; set to 0 to parse whole pages
+    RESTRICTED_PARSING = (os.environ.get('RESTRICTED_PARSING') or '1') != '0'
+    # Skip images, fonts, media, analytics and ad requests in the scraping browsers; set to 0 to load everything
+    BLOCK_RESOURCES = (os.environ.get('BLOCK_RESOURCES') or '1') != '0'
+    # Process-wide pool of warm browser sessions reused across scrape jobs
+    BROWSER_POOL_SIZE = int(os.environ.get('BROWSER_POOL_SIZE') or 8)
+    # Sessions launched at startup and kept open while idle
+    BROWSER_POOL_WARM = int(os.environ.get('BROWSER_POOL_WARM') or 1)
+    # Seconds an unused session stays open
+    BROWSER_IDLE_TIMEOUT = float(os.environ.get('BROWSER_IDLE_TIMEOUT') or 300)
+    # Page loads after which a session is quit and replaced by a fresh one
+    BROWSER_MAX_NAVIGATIONS = int(os.environ.get('BROWSER_MAX_NAVIGATIONS') or 200)
+    # Persistent browser profiles (cookies, disk cache), one per pool session
+    BROWSER_PROFILE_DIR = os.environ.get('BROWSER_PROFILE_DIR') or os.path.join(os.path.expanduser('~'), '.ecommerce_scraper', 'browser_profiles')
+    # Finished scrape jobs (with their results) kept for the /api/jobs endpoints
+    JOB_HISTORY = int(os.environ.get('JOB_HISTORY') or 20)
+    # Searches a batch (run.py scrape) scrapes at once
+    BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY') or 4)
+    # Worker processes the scheduler runs the /api/jobs, /api/batch and CLI scrapes on, one job each
+    SCHEDULER_WORKERS = int(os.environ.get('SCHEDULER_WORKERS') or 4)
+    # Jobs allowed to run at once per platform, as 'platform=jobs' pairs separated by commas
+    PLATFORM_QUOTAS = os.environ.get('PLATFORM_QUOTAS') or 'amazon=2,flipkart=2,myntra=2,ajio=2'
+    # Unfinished scrapes are saved here so they can be resumed
+    CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR') or os.path.join(os.path.expanduser('~'), '.ecommerce_scraper', 'checkpoints')
+    # Scraped products between two checkpoint saves
+    CHECKPOINT_INTERVAL = int(os.environ.get('CHECKPOINT_INTERVAL') or 20)
+    # Scraped products appended to the results file at once
+    RESULTS_BATCH_SIZE = int(os.environ.get('RESULTS_BATCH_SIZE') or 50)
+    # Products a visit may start ahead of the next one written; finished products wait for the ones before them
+    VISIT_WINDOW = int(os.environ.get('VISIT_WINDOW') or 50)
+    # Specification columns of the CSV export: comma-separated whitelist (all when empty),
+    # and at most this many of the most often filled ones (0 for no limit)
+    CSV_SPEC_COLUMNS = os.environ.get('CSV_SPEC_COLUMNS') or ''
+    CSV_MAX_SPEC_COLUMNS = int(os.environ.get('CSV_MAX_SPEC_COLUMNS') or 0)
+    # Every scraped product is also kept in this SQLite database (STORE_PRODUCTS=0 turns it off)
+    STORE_PRODUCTS = (os.environ.get('STORE_PRODUCTS') or '1') != '0'
+    PRODUCT_DB = os.environ.get('PRODUCT_DB') or os.path.join(os.path.expanduser('~'), '.ecommerce_scraper', 'products.sqlite3')
+    # Products the store got within this many hours are not visited again (0 visits every product)
+    FRESHNESS_HOURS = float(os.environ.get('FRESHNESS_HOURS') or 0)
+    # Product pages and the records extracted from them are cached on disk for this many seconds
+    # (0 turns the cache off), the least recently used ones are dropped beyond the size limit
+    PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.ecommerce_scraper', 'page_cache')
+    PAGE_CACHE_TTL = float(os.environ.get('PAGE_CACHE_TTL') or 3600)
+    PAGE_CACHE_MAX_MB = int(os.environ.get('PAGE_CACHE_MAX_MB') or 200)
+    # Processes (threads on the scheduler's workers) that render the charts of a scrape side by side
+    CHART_WORKERS = int(os.environ.get('CHART_WORKERS') or 5)
+    # Rendered charts are reused for the same data, the least recently used dropped beyond the limit
+    CHART_CACHE_DIR = os.environ.get('CHART_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.ecommerce_scraper', 'chart_cache')
+    CHART_CACHE_MAX_MB = int(os.environ.get('CHART_CACHE_MAX_MB') or 100)
\ No newline at end of file
@@ -1,4 +1,73 @@
-from app import app
+import argparse
+import os
+import sys
+from app import app, start_query
+from config import Config
+from utils.batch import ScrapeQuery, read_queries, run_batch
+from utils.driver_pool import warm_up
+from utils.scheduler import PLATFORMS
+
+
+def scrape(args):
+    """Runs the queries given on the command line and in the batch file without prompts."""
+    defaults = {
+        "platform": args.platform,
+        "fields": args.fields,
+        "max_pages": args.max_pages,
+        "max_items": args.max_items,
+        "resume": args.resume,
+        "refresh": args.refresh,
+    }
+    queries = [ScrapeQuery.from_dict({"search_term": term}, defaults) for term in args.search_terms]
+    if args.queries:
+        queries += read_queries(args.queries, defaults)
+    if not queries:
+        raise ValueError("Give search terms or a --queries file")
+
+    failed = 0
+    for job in run_batch(queries, start_query, concurrency=args.concurrency):
+        files = (job.result or {}).get("filenames") or {}
+        print(f"{job.query.platform} '{job.query.search_term}': {job.status}, "
+              f"{(job.result or {}).get('products_scraped', 0)} products" + (f", saved to {files['json']}" if files else ""))
+        failed += job.status != "completed"
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the scraper web app, or run scrapes without prompts.")
+    commands = parser.add_subparsers(dest="command")
+
+    scrape_parser = commands.add_parser("scrape", help="Scrape search terms without prompts",
+                                        description="Scrape search terms without prompts. A --queries file has one "
+                                                    "query per line: a JSON object with platform, search_term, "
+                                                    "fields, max_pages and max_items, or a plain search term that "
+                                                    "uses the options below.")
+    scrape_parser.add_argument("search_terms", nargs="*", help="Search terms to scrape")
+    scrape_parser.add_argument("--platform", choices=PLATFORMS)
+    scrape_parser.add_argument("--fields", help="Comma-separated field names, e.g. title,discounted_price,rating")
+    scrape_parser.add_argument("--max-pages", type=int, help="Result pages per search (all by default)")
+    scrape_parser.add_argument("--max-items", type=int, help="Products per search on Ajio (all by default)")
+    scrape_parser.add_argument("--queries", help="File with one query per line")
+    scrape_parser.add_argument("--resume", action="store_true",
+                               help="Continue the searches from their checkpoints instead of starting over")
+    scrape_parser.add_argument("--refresh", action="store_true",
+                               help="Only re-fetch the prices, rating and reviews of the products stored for the "
+                                    "searches and save the ones that changed")
+    scrape_parser.add_argument("--concurrency", type=int, default=Config.BATCH_CONCURRENCY,
+                               help="Searches scraped at once")
+    args = parser.parse_args()
+
+    if args.command == "scrape":
+        try:
+            return scrape(args)
+        except ValueError as e:
+            parser.error(str(e))
+
+    # Pre-launch the pooled browsers in the process that serves requests, not in the reloader's watcher
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_up()
+    app.run(debug=True)
+
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
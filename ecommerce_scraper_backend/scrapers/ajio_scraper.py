@@ -1,31 +1,28 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup as bs
+from selenium.common.exceptions import WebDriverException
 from datetime import datetime
-import threading
+import asyncio
 import re
-import time
 import json
-import matplotlib
-import platform
-if platform.system() == 'Windows':
-    matplotlib.use('TkAgg')  # Use TkAgg on Windows
-else:
-    matplotlib.use('Agg')  # Use Agg for headless systems
 import ctypes
 import atexit
 import signal
-from utils.terminal import output_queue, input_queue
-from utils.file_handler import save_scraped_data, convert_to_csv
+import threading
+from urllib.parse import quote
+from utils.terminal import output_queue, read_input
+from utils.file_handler import JsonlWriter, JsonlRecords, save_scraped_data, convert_to_csv, save_parquet, output_columns
 from utils.visualization import generate_visualizations
-
-
-
-# Store all product details
-all_product_details = []
+from utils.word_frequency import TitleWords
+from utils.browser import new_driver
+from utils.crawler import Crawler
+from utils.checkpoint import open_checkpoint
+from utils.product_store import product_store
+from utils.batch import ScrapeQuery
+from utils.event_loop import run_blocking
+from utils.parsing import make_soup
+from utils.extraction import ExtractionSpec, Node, Field, Find, price, percentage, count
+from utils.waits import wait_until, element_present, element_count_above, format_wait_stats
+from utils.page_cache import format_cache_stats
 
 
 def prevent_sleep():
@@ -42,37 +39,213 @@ def allow_sleep():
 
 # Ensure sleep is allowed even if the program is terminated manually
 atexit.register(allow_sleep)  # Call when program exits normally
-signal.signal(signal.SIGINT, lambda signum, frame: (allow_sleep(), exit(0)))  # Ctrl+C
-signal.signal(signal.SIGTERM, lambda signum, frame: (allow_sleep(), exit(0)))  # Kill command
+# Scrapers are imported on first use, which may be on a request thread; only the main thread can set handlers
+if threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGINT, lambda signum, frame: (allow_sleep(), exit(0)))  # Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: (allow_sleep(), exit(0)))  # Kill command
+
+
+# Readiness predicates for the condition-based waits
+PRODUCT_GRID = "div.item.rilrtl-products-list__item.item"
+HOME_PAGE_READY = element_present("input[name='searchVal']")
+PRODUCT_GRID_READY = element_present(PRODUCT_GRID)
+PRODUCT_PAGE_READY = element_present("h1.prod-name")
+MORE_INFO_BUTTON = element_present("section.prod-desc > h2 > ul.prod-list > li > div.other-info-toggle")
+MORE_INFO_READY = element_present("section.prod-desc div.mandatory-list")
 
        
         
-def ajio_scrape():
+def extract_product_details(driver, product_details, fields_to_scrape):
+    """Visit the product link and add the selected detail fields to product_details."""
+    driver.get(product_details['link'])  # Navigate to product details page
+    wait_until(driver, PRODUCT_PAGE_READY, "ajio product page")
+
+    # Extract image url
+    if "image_url" in fields_to_scrape:
+        try:
+            img_element = driver.find_element(By.CSS_SELECTOR, "img.rilrtl-lazy-img")
+
+            image_url = (
+                    img_element.get_attribute("src") or
+                    img_element.get_attribute("data-src") or
+                    img_element.get_attribute("data-lazy") or
+                    img_element.get_attribute("data-original")
+            )
+            product_details["image_url"] = image_url if image_url else "URL not found"
+            output_queue.put(f"Found image URL: {product_details['image_url']}")
+        except Exception:
+            product_details['image_url'] = None
+
+    # Load the extra specifications before the page is parsed
+    if "product_specifications" in fields_to_scrape:
+        show_more_info(driver)
+
+    # Extract details from the product page
+    parse_product_page(make_soup(driver.page_source), product_details, fields_to_scrape)
+
+
+def show_more_info(driver):
+    """Click the 'more info' button that loads the extra specifications."""
+    try:
+        # Wait for the 'more info' button to be present
+        more_info_button = wait_until(driver, MORE_INFO_BUTTON, "ajio more info button")
+        if more_info_button is None:
+            raise ValueError("'more info' button not found")
+
+        # Scroll the button into view (button is scrolled into centre of viewport)
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});",
+                              more_info_button)
+
+        # Use JavaScript to perform the click
+        driver.execute_script("arguments[0].click();", more_info_button)
+        output_queue.put("Clicked on 'More Info' button.")
+        wait_until(driver, MORE_INFO_READY, "ajio more info", timeout=5)  # Wait for the extra specs
+
+    except Exception as e:
+        output_queue.put(f"Error clicking 'more info' button: {e}")
+
+
+def extract_product_specifications(product_page, product_details):
+    """General specifications as one text, plus the extra specifications as one key each."""
+    # Locate the prodDesc container
+    try:
+        product_info_div = product_page.find("section", class_="prod-desc")
+        if product_info_div:
+            output_queue.put("Found product info div")
+            try:
+                prod_list = product_info_div.find("ul", class_="prod-list")
+                list_items = prod_list.find_all("li", class_="detail-list")
+
+                # Combine all the text from <li> tags with newline as separator
+                general_specs = "\n".join(li.get_text(strip=True) for li in list_items)
+
+                # Add to product_details dictionary
+                product_details['general_specs'] = general_specs
+                output_queue.put("Extracted general specifications.")
+
+            except Exception:
+                product_details['general_specs'] = None
+
+            try:
+                mandatory_list = product_page.find("ul", class_="prod-list")
+                list_item = mandatory_list.find_all("div", class_="mandatory-list")
+
+                for item in list_item:
+                    key_div = item.find("div", class_="info-label")
+                    value_div = item.find("div", class_="title")
+
+                    if key_div and value_div:
+                        # Extract key and value text
+                        key = key_div.get_text(strip=True).replace("\xa0", " ")
+                        value = value_div.get_text(strip=True).replace("\xa0", " ")
+                        product_details[key] = value
+                        output_queue.put(f"{key}: {value}")
+
+            except Exception as e:
+                output_queue.put(f"Error adding extra specs: {e}")
+
+    except Exception as e:
+        output_queue.put("product specification tag not found")
+
+
+
+# Declarative extraction spec of the product page, compiled into a plan per field selection
+PRODUCT_PAGE_SPEC = ExtractionSpec(
+    nodes={
+        "price_section": Node(Find("div", class_="prod-price-section")),
+        "rating_popup": Node(Find("div", class_="rating-popup")),
+    },
+    fields={
+        "title": Field(Find("h1", class_="prod-name"), label="Found title"),
+        "discounted_price": Field(Find("div", class_="prod-sp"), node="price_section", parse=price,
+                                  label="Found discounted price"),
+        "original_price": Field(Find("span", class_="prod-cp"), node="price_section", parse=price,
+                                fallback="discounted_price", label="Found original price"),
+        "discount_percentage": Field(Find("span", class_="prod-discnt"), node="price_section", parse=percentage,
+                                     default="0%", label="Found discount percentage"),
+        "rating": Field(Find("div", class_="_1jiCk _3iz7j"), Find("span", class_="_3c5q0"), node="rating_popup",
+                        label="Found rating"),
+        "reviews_count": Field(Find("div", class_="_1jiCk rating-label-star-count"), Find("span", class_="_38RNg"),
+                               node="rating_popup", parse=count, label="Found reviews count"),
+        "brand_name": Field(Find("h2", class_="brand-name"), label="Found brand_name"),
+        "product_specifications": Field(extract=extract_product_specifications),
+    }
+)
+
+# Record keys of the fields whose keys differ from the field name; the extra specifications are spec keys
+FIELD_COLUMNS = {"product_specifications": ("general_specs",)}
+
+
+def parse_product_page(product_page, product_details, fields_to_scrape):
+    """Add the selected detail fields found in a parsed product page to product_details."""
+    PRODUCT_PAGE_SPEC.plan(fields_to_scrape).run(product_page, product_details)
+
+
+
+def parse_listing_page(driver, fields_to_scrape):
+    """Return the product links loaded so far in the infinite-scroll grid."""
+    listing = []
+    soup = make_soup(driver.page_source)  # Parse the page
+    # Extract product sections
+    product_sections = soup.find_all("div", class_="item rilrtl-products-list__item item")
+
+    if not product_sections:
+        output_queue.put("No products found on the page.")
+
+    for product in product_sections:
+        # Filter out unwanted sections based on 'style' attribute
+        style_attr = product.get("style", "")
+        if "height: 100px;" in style_attr:
+            continue  # Skip ad banners
+
+        # Extract link internally (for navigation)
+        try:
+            link = product.find("a")["href"]
+        except Exception:
+            continue
+
+        # Keep the product for the detail page visits
+        listing.append({'link': f"https://www.ajio.com{link}"})
+
+    return listing
+
+
+
+
+def results_url(search_term):
+    """Result page URL of a search term, for scrapes that do not use the search box."""
+    return f"https://www.ajio.com/search/?text={quote(search_term)}"
+
+
+async def ajio_scrape(query=None):
+    """
+    Scrapes Ajio search results, asking the user on the terminal for the search and options.
+
+    :param query: ScrapeQuery to run without prompts instead
+    :return: Summary of the saved files, None if the scrape did not complete
+    """
     last_scrolled_position = 0  # Track the last scroll position
-    product_count_ref = [0]  # Track the number of products scraped (mutable list)
+    product_count_ref = [0]  # Track the number of products loaded in the grid (mutable list)
     current_url = "https://www.ajio.com/"  # Initialize to homepage by default
 
 
     def initialize_driver():
         """Initialize the Selenium WebDriver with desired options."""
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument("--start-maximized")
-        chrome_options.add_argument("--disable-infobars")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--remote-debugging-port=9222")  # For debugging stability
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--start-maximized")
-        chrome_options.add_argument("--remote-debugging-timeout=300000")  # Increase DevTools timeout to 5 mins
-
-        return webdriver.Chrome(options=chrome_options)
+        return new_driver([
+            "--start-maximized",
+            "--disable-infobars",
+            "--disable-extensions",
+            "--disable-gpu",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-blink-features=AutomationControlled",
+            "--remote-debugging-timeout=300000",  # Increase DevTools timeout to 5 mins
+        ])
 
 
     def reconnect_driver():
         """Reconnect the driver in case of a crash while preserving state."""
-        global driver, last_scrolled_position, current_url
+        nonlocal driver
 
         try:
             driver.quit()  # Close the current session if active
@@ -81,83 +254,115 @@ def ajio_scrape():
 
         driver = initialize_driver()
         driver.get(current_url)  # Reconnect to the current page URL, not homepage
-        time.sleep(5)
+        wait_until(driver, PRODUCT_GRID_READY, "ajio product grid")
 
         # Scroll back to the last known position
         driver.execute_script(f"window.scrollTo(0, {last_scrolled_position});")
-        time.sleep(3)
 
-    def keep_browser_awake():
+    async def keep_browser_awake():
         """Simulate user activity without interfering with infinite scrolling."""
         while True:
-            time.sleep(30)  # Perform action every 30 seconds
+            await asyncio.sleep(30)  # Perform action every 30 seconds
             try:
                 # Perform a harmless click on the page to simulate user activity (on body or header)
-                driver.execute_script("document.querySelector('body').click();")
+                await run_blocking(driver.execute_script, "document.querySelector('body').click();")
             except WebDriverException:
                 output_queue.put("Driver lost connection during keep-alive. Attempting to reconnect...")
-                reconnect_driver()
+                await run_blocking(reconnect_driver)
 
-    def detect_stall(product_count_ref):
-        """Detect if the scraper is stuck by monitoring product count."""
-        global last_scrolled_position, driver
+    def recover_from_stall(last_count):
+        """Refresh the page and scroll until the products seen before the stall are loaded again."""
+        nonlocal last_scrolled_position
 
-        last_count = product_count_ref[0]
+        output_queue.put("Detected scraping stall. Refreshing the page...")
+        driver.refresh()
+        wait_until(driver, PRODUCT_GRID_READY, "ajio product grid")
 
-        while True:
-            time.sleep(600)  # Check every 600 seconds
-            if product_count_ref[0] == last_count:
-                output_queue.put("Detected scraping stall. Refreshing the page...")
-                driver.refresh()
-                time.sleep(5)
+        # Scroll gradually to load content
+        new_product_count = 0
 
-                # Scroll gradually to load content
-                new_product_count = 0
-                scroll_pause_time = 2  # Wait between scrolls
+        while new_product_count < last_count:
+            driver.execute_script("window.scrollBy(0, 800);")
+            # Wait for the grid to grow (or give up after a short while)
+            wait_until(driver, element_count_above(PRODUCT_GRID, new_product_count), "ajio grid growth", timeout=2)
 
-                while new_product_count < last_count:
-                    driver.execute_script("window.scrollBy(0, 800);")
-                    time.sleep(scroll_pause_time)
+            # Parse the refreshed page and count products
+            soup = make_soup(driver.page_source)
+            product_sections = soup.find_all("div", class_="item rilrtl-products-list__item item")
+            new_product_count = len(product_sections)
+            output_queue.put(f"Scrolled and loaded {new_product_count}/{last_count} products...")
+
+            if new_product_count >= last_count:
+                output_queue.put("Page recovered, continuing scraping...")
+                break
 
-                    # Parse the refreshed page and count products
-                    soup = bs(driver.page_source, 'html.parser')
-                    product_sections = soup.find_all("div", class_="item rilrtl-products-list__item item")
-                    new_product_count = len(product_sections)
-                    output_queue.put(f"Scrolled and loaded {new_product_count}/{last_count} products...")
+        last_scrolled_position = driver.execute_script("return window.scrollY;")
 
-                    if new_product_count >= last_count:
-                        output_queue.put("Page recovered, continuing scraping...")
-                        break
+    async def detect_stall(product_count_ref):
+        """Detect if the scraper is stuck by monitoring product count."""
+        last_count = product_count_ref[0]
 
-                last_scrolled_position = driver.execute_script("return window.scrollY;")
+        while True:
+            await asyncio.sleep(600)  # Check every 600 seconds
+            if product_count_ref[0] == last_count:
+                await run_blocking(recover_from_stall, last_count)
             last_count = product_count_ref[0]
 
+    # The listing functions use the current driver rather than the one the crawler was given,
+    # since reconnect_driver replaces it
+    def parse_current_listing(_, fields_to_scrape):
+        """Parse the products loaded in the grid of the current driver."""
+        return parse_listing_page(driver, fields_to_scrape)
+
+    def load_more_products(_, page_number):
+        """Scroll to the bottom of the list to load the next batch of products."""
+        nonlocal last_scrolled_position, current_url
+        try:
+            loaded = len(driver.find_elements(By.CSS_SELECTOR, PRODUCT_GRID))
+            product_count_ref[0] = loaded
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            # Wait for lazy loading to grow the product grid
+            wait_until(driver, element_count_above(PRODUCT_GRID, loaded), "ajio grid growth", timeout=5)
+
+            # Remember where the listing is, for reconnect_driver
+            current_url = driver.current_url
+            last_scrolled_position = driver.execute_script("return window.scrollY;")
+        except WebDriverException as e:
+            output_queue.put(f"Error scrolling the product list: {e}")
+            reconnect_driver()
+        return True
+
 
     prevent_sleep()
     # Initialize the driver
-    driver = initialize_driver()
+    driver = await run_blocking(initialize_driver)
 
-    # Start background threads for keep-alive and stall detection
-    threading.Thread(target=keep_browser_awake, daemon=True).start()
-    threading.Thread(target=detect_stall, args=(product_count_ref,), daemon=True).start()
+    # Keep-alive and stall detection run on the event loop while the listing is collected
+    listing_helpers = [asyncio.create_task(keep_browser_awake()),
+                       asyncio.create_task(detect_stall(product_count_ref))]
 
 
     try:
-        # Open Ajio homepage
-        driver.get("https://www.ajio.com/")
-        time.sleep(5)  # Allow time for the page to load
-
-        output_queue.put("Please type your search query directly into the Ajio search box and press Enter.")
-        output_queue.put("Once the search results have loaded, type 'ok' to proceed.")
-        reply = input_queue.get().strip().lower() # Wait for user confirmation
-        if reply != 'ok':
-            output_queue.put("Scraping canceled by the user.")
-            driver.quit()
-            exit()
+        if query is not None:
+            # Open the search results directly
+            await run_blocking(driver.get, results_url(query.search_term))
+            await run_blocking(wait_until, driver, PRODUCT_GRID_READY, "ajio product grid")
+        else:
+            # Open Ajio homepage
+            await run_blocking(driver.get, "https://www.ajio.com/")
+            await run_blocking(wait_until, driver, HOME_PAGE_READY, "ajio home page")  # Wait for the search box
+
+            output_queue.put("Please type your search query directly into the Ajio search box and press Enter.")
+            output_queue.put("Once the search results have loaded, type 'ok' to proceed.")
+            reply = (await read_input()).strip().lower() # Wait for user confirmation
+            if reply != 'ok':
+                output_queue.put("Scraping canceled by the user.")
+                return
             
 
         # Extract the search term from the current URL
-        search_url = driver.current_url.strip()
+        search_url = (await run_blocking(getattr, driver, 'current_url')).strip()
+        current_url = search_url  # reconnect_driver returns to the search results
 
         try:
             if "/s/" in search_url:  # Pattern 1: /s/{term}-{numbers}
@@ -179,13 +384,13 @@ def ajio_scrape():
             search_term = None
 
         # Confirm the scraping process with the user
-        output_queue.put(
-                f"Do you want to scrape data for the search term '{search_term.replace('_', ' ')}'? (yes/no): ")
-        proceed = input_queue.get().strip().lower()
-        if proceed != 'yes':
-            output_queue.put("Scraping canceled by the user.")
-            driver.quit()
-            exit()
+        if query is None:
+            output_queue.put(
+                    f"Do you want to scrape data for the search term '{search_term.replace('_', ' ')}'? (yes/no): ")
+            proceed = (await read_input()).strip().lower()
+            if proceed != 'yes':
+                output_queue.put("Scraping canceled by the user.")
+                return
 
         # Ask the user what fields they want to scrape
         available_fields = {
@@ -201,400 +406,130 @@ def ajio_scrape():
             "10": "product_specifications"
         }
 
-        output_queue.put("\n")
-        output_queue.put("Available fields to scrape:")
-        for key, value in available_fields.items():
-            output_queue.put(f"{key}. {value}")
+        if query is not None:
+            fields_to_scrape = query.select_fields(available_fields)
+        else:
+            output_queue.put("\n")
+            output_queue.put("Available fields to scrape:")
+            for key, value in available_fields.items():
+                output_queue.put(f"{key}. {value}")
 
-        output_queue.put("\n")
-        output_queue.put("Enter the numbers corresponding to the fields you want to scrape, separated by commas: ")
-        selected_fields = input_queue.get()
-        selected_fields = selected_fields.split(",")
+            output_queue.put("\n")
+            output_queue.put("Enter the numbers corresponding to the fields you want to scrape, separated by commas: ")
+            selected_fields = (await read_input())
+            selected_fields = selected_fields.split(",")
 
-        fields_to_scrape = [available_fields[field.strip()] for field in selected_fields if
-                            field.strip() in available_fields]
+            fields_to_scrape = [available_fields[field.strip()] for field in selected_fields if
+                                field.strip() in available_fields]
 
         if not fields_to_scrape:
             output_queue.put("No valid fields selected. Exiting.")
-            driver.quit()
-            exit()
+            return
 
         output_queue.put(f"Fields selected for scraping: {fields_to_scrape}")
 
         # Extract the maximum number of items dynamically
         try:
-            max_items_elem = driver.find_element(By.CSS_SELECTOR,
-                                                 "div.filter-container > div.filter > div.length > strong")
-            max_items_text = max_items_elem.text.strip()
+            max_items_elem = await run_blocking(driver.find_element, By.CSS_SELECTOR,
+                                                "div.filter-container > div.filter > div.length > strong")
+            max_items_text = (await run_blocking(getattr, max_items_elem, 'text')).strip()
 
             max_items = int("".join(re.findall(r'\d+', max_items_text)))  # Removes any commas and extracts digits
         except Exception as e:
             max_items = 0
 
-        # Ask the user how many items they want to scrape
-        output_queue.put("\n")
-        output_queue.put(f"How many items do you want to scrape? (0-{max_items}): ")
-        items_to_scrape = int(input_queue.get().strip())
-        if items_to_scrape < 1 or items_to_scrape > max_items:
-            output_queue.put(
-                f"Ajio displays only {max_items} items for a keyword. Please provide an item number between 1 and {max_items}.")
-            driver.quit()
-            exit()
+        if query is not None:
+            items_to_scrape = query.limit(query.max_items, max_items)
+        else:
+            # Ask the user how many items they want to scrape
+            output_queue.put("\n")
+            output_queue.put(f"How many items do you want to scrape? (0-{max_items}): ")
+            items_to_scrape = int((await read_input()).strip())
+            if items_to_scrape < 1 or items_to_scrape > max_items:
+                output_queue.put(
+                    f"Ajio displays only {max_items} items for a keyword. Please provide an item number between 1 and {max_items}.")
+                return
 
         output_queue.put(f"Scraping data for {items_to_scrape} items...")
 
 
-        scraped_links = set()  # Store all the links
+        # Progress is saved to a checkpoint the scrape can be resumed from
+        checkpoint = await open_checkpoint(query or ScrapeQuery("ajio", search_term, fields_to_scrape, max_items=items_to_scrape),
+                                           ask=query is None)
 
-        while product_count_ref[0] < items_to_scrape:
-            soup = bs(driver.page_source, 'html.parser')  # Parse the page
-            # Extract product sections
-            product_sections = soup.find_all("div", class_="item rilrtl-products-list__item item")
+        # Products are appended to a JSONL file as they are scraped; a resumed scrape continues its file
+        if checkpoint.timestamp is None:
+            checkpoint.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        platform = "ajio"
+        timestamp = checkpoint.timestamp
+        filename = f"{platform}_{search_term}_{timestamp}"
+        results = JsonlWriter(f"{filename}.jsonl")
+        words = TitleWords(search_term)  # Word cloud counts, taken as the products are scraped
 
-            if not product_sections:
-                output_queue.put("No products found on the page. Exiting.")
-                break
+        crawler = Crawler(fields_to_scrape, extract_product_details, checkpoint=checkpoint, platform=platform,
+                          field_columns=FIELD_COLUMNS)
 
-            # Iterate through products dynamically
-            index = 0  # Reset index for each page load
-            while index < len(product_sections) and product_count_ref[0] < items_to_scrape:
-                product = product_sections[index]
-
-                # Filter out unwanted sections based on 'style' attribute
-                style_attr = product.get("style", "")
-                if "height: 100px;" in style_attr:
-                    output_queue.put("Skipped an ad banner.")
-                    index += 1
-                    continue  # Skip this iteration for ad banners
-
-                # Scroll the next product into center view
-                try:
-                    product_elements = driver.find_elements(By.CSS_SELECTOR, "div.item.rilrtl-products-list__item.item")
-                    if index >= len(product_elements):
-                        output_queue.put(
-                            f"Index {index} exceeds visible product count ({len(product_elements)}). Re-fetching elements...")
-                        break  # Exit this loop to re-fetch elements after scrolling
-
-                    try:
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});",
-                                              product_elements[index])
-                        time.sleep(2)  # Pause for lazy loading
-
-                    except TimeoutException:
-                        output_queue.put("Timeout while scrolling. Proceeding with the next product.")
-
-                    # --- Force Populate Lazy Images ---
-                    driver.execute_script("""
-                        const lazyImages = document.querySelectorAll('img.rilrtl-lazy-img');
-                        lazyImages.forEach(img => {
-                            if (!img.src) {
-                                if (img.dataset.src) img.src = img.dataset.src;  // Set from 'data-src'
-                                else if (img.dataset.lazy) img.src = img.dataset.lazy;  // Set from 'data-lazy'
-                                else if (img.dataset.original) img.src = img.dataset.original;  // Set from 'data-original'
-                            }
-                        });
-                    """)
-                    time.sleep(2)  # Allow time for JavaScript to execute
-
-                except WebDriverException as e:
-                    output_queue.put(f"Error scrolling to product at index {index}: {e}")
-                    reconnect_driver()
-                    continue
-
-                product_details = {}
-
-                # Extract and add other fields based on user selection
-                try:
-                    # Extract link internally (for navigation)
-                    link = product.find("a")["href"]
-                    full_link = f"https://www.ajio.com{link}"
-                    if full_link in scraped_links:  # Prevent duplicates
-                        continue
-                    scraped_links.add(full_link)
-
-                    driver.get(full_link)  # Navigate to product details page
-                    current_url = full_link  # Update to product page URL
-                    time.sleep(3)
-
-                    # Only store link if the user selected it
-                    if "link" in fields_to_scrape:
-                        product_details['link'] = full_link
-
-                    # Extract image url
-                    if "image_url" in fields_to_scrape:
-                        try:
-                            img_element = driver.find_element(By.CSS_SELECTOR, "img.rilrtl-lazy-img")
-
-                            image_url = (
-                                    img_element.get_attribute("src") or
-                                    img_element.get_attribute("data-src") or
-                                    img_element.get_attribute("data-lazy") or
-                                    img_element.get_attribute("data-original")
-                            )
-                            product_details["image_url"] = image_url if image_url else "URL not found"
-                            output_queue.put(f"Found image URL: {product_details['image_url']}")
-                        except Exception:
-                            product_details['image_url'] = None
-
-                    # Extract details from the product page
-                    product_page = bs(driver.page_source, 'html.parser')
-
-                    # Extract product title
-                    if "title" in fields_to_scrape:
-                        try:
-                            title = product_page.find("h1", class_="prod-name").get_text(strip=True)
-                            output_queue.put(f"Found title: {title}")
-                            product_details['title'] = title
-                        except Exception:
-                            product_details['title'] = None
-
-                    # Extract pricing and discount information
-                    if "discounted_price" in fields_to_scrape:
-                        try:
-                            discounted_price_text = product_page.find("div", class_="prod-price-section").find("div",
-                                                                                                          class_="prod-sp").get_text(strip=True)
-                            if "MRP" in discounted_price_text:
-                                discounted_price_string = discounted_price_text.replace("MRP₹", "").replace(",", "").strip()
-                                discounted_price = int(discounted_price_string)
-                            else:
-                                discounted_price_string = discounted_price_text.replace("₹", "").replace(",", "").strip()
-                                discounted_price = int(discounted_price_string)
-
-                            output_queue.put(f"Found discounted price: {discounted_price}")
-                            product_details['discounted_price'] = discounted_price
-                        except Exception:
-                            product_details['discounted_price'] = None
-
-                    if "original_price" in fields_to_scrape:
-                        try:
-                            original_price_text = product_page.find("div", class_="prod-price-section").find("span",
-                                                                                                        class_="prod-cp").get_text(strip=True)
-                            if "MRP" in original_price_text:
-                                original_price_string = original_price_text.replace("MRP₹", "").replace(",", "").strip()
-                                original_price = int(original_price_string)
-                            else:
-                                original_price_string = original_price_text.replace("₹", "").replace(",", "").strip()
-                                original_price = int(original_price_string)
-
-                            output_queue.put(f"Found original price: {original_price}")
-                            product_details['original_price'] = original_price
-                        except Exception:
-                            output_queue.put("Original Price is same as Discounted Price.")
-                            if "discounted_price" in fields_to_scrape:
-                                product_details['original_price'] = product_details['discounted_price']
-                            else:
-                                discounted_price_text = product_page.find("div", class_="prod-price-section").find(
-                                    "div", class_="prod-sp").get_text(strip=True)
-                                if discounted_price_text:
-                                    if "MRP" in discounted_price_text:
-                                        discounted_price_string = discounted_price_text.replace("MRP₹", "").replace(",", "").strip()
-                                        discounted_price = int(discounted_price_string)
-                                    else:
-                                        discounted_price_string = discounted_price_text.replace("₹", "").replace(",", "").strip()
-                                        discounted_price = int(discounted_price_string)
-                                    output_queue.put(f"Found original Price: {discounted_price}")
-                                    product_details['original_price'] = discounted_price
-                                else:
-                                    product_details['original_price'] = None
-
-                    if "discount_percentage" in fields_to_scrape:
-                        try:
-                            discount_percentage_text = product_page.find("div", class_="prod-price-section").find(
-                                "span", class_="prod-discnt").get_text()
-                            discount_percentage_string = discount_percentage_text.split(" ")[0].replace("(", "").replace("%", "").strip()
-                            discount_percentage = int(discount_percentage_string)
-                            product_details['discount_percentage'] = f"{discount_percentage}%"
-                            output_queue.put(f"Found discount percentage: {product_details['discount_percentage']}")
-                        except Exception:
-                            output_queue.put(f"Discount % is 0")
-                            discount_percentage = 0
-                            product_details['discount_percentage'] = f"{discount_percentage}%"
-
-                    # Extract rating and reviews
-                    if "rating" in fields_to_scrape:
-                        try:
-                            rating_review_div = product_page.find("div", class_="rating-popup")
-                            section_div = rating_review_div.find("div", class_="_1jiCk _3iz7j")
-                            rating = section_div.find("span", class_="_3c5q0").get_text(strip=True)
-                            product_details['rating'] = rating
-                            output_queue.put(f"Found rating: {rating}")
-                        except Exception:
-                            product_details['rating'] = None
-
-                    if "reviews_count" in fields_to_scrape:
-                        try:
-                            review_div = product_page.find("div", class_="rating-popup")
-                            section_div = review_div.find("div", class_="_1jiCk rating-label-star-count")
-                            review_count_text = section_div.find("span", class_="_38RNg").get_text(strip=True)
-
-                            # Check if the count contains 'k' (e.g., 16.2k)
-                            if 'k' in review_count_text:
-                                review_count_text = review_count_text.replace("Ratings", "").replace(",", "").strip()
-                                # Handle decimal cases like '16.2k'
-                                if '.' in review_count_text:
-                                    # Split the number, convert to float, and multiply by 1000
-                                    review_count = int(float(review_count_text.replace('k', '')) * 1000)
-                                else:
-                                    # Simple case (e.g., 4k -> 4000)
-                                    review_count = int(review_count_text.replace('k', '')) * 1000
-                            else:
-                                # If no 'k' is present, just extract the number
-                                review_count = int(review_count_text.replace("Ratings", "").replace(",", "").strip())
-
-                            output_queue.put(f"Found reviews count: {review_count}")
-                            product_details['reviews_count'] = review_count
-                        except Exception:
-                            product_details['reviews_count'] = None
-
-                    # Extract brand's name
-                    if "brand_name" in fields_to_scrape:
-                        try:
-                            brand_name = product_page.find("h2", class_="brand-name").get_text(strip=True)
-                            output_queue.put(f"Found brand_name: {brand_name}")
-                            product_details['brand_name'] = brand_name
-                        except Exception:
-                            product_details['brand_name'] = None
-
-                    # Extract additional product specifications from the product page
-                    if "product_specifications" in fields_to_scrape:
-                        try:
-                            # Wait for the 'more info' button to be present
-                            more_info_button = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located(
-                                    (By.CSS_SELECTOR,
-                                     "section.prod-desc > h2 > ul.prod-list > li > div.other-info-toggle"))
-                            )
-
-                            # Scroll the button into view gradually (button is scrolled into centre of viewport)
-                            driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});",
-                                                  more_info_button)
-                            time.sleep(1)  # Allow for any animations
-
-                            # Use JavaScript to perform the click
-                            driver.execute_script("arguments[0].click();", more_info_button)
-                            output_queue.put("Clicked on 'More Info' button.")
-                            time.sleep(2)  # Allow time for content to load
-
-                        except Exception as e:
-                            output_queue.put(f"Error clicking 'more info' button: {e}")
-
-                        # Re-fetch the updated page source to include dynamically loaded content
-                        product_page = bs(driver.page_source, 'html.parser')
-
-                        # Locate the prodDesc container
-                        try:
-                            product_info_div = product_page.find("section", class_="prod-desc")
-                            if product_info_div:
-                                output_queue.put("Found product info div")
-                                try:
-                                    prod_list = product_info_div.find("ul", class_="prod-list")
-                                    list_items = prod_list.find_all("li", class_="detail-list")
-
-                                    # Combine all the text from <li> tags with newline as separator
-                                    general_specs = "\n".join(li.get_text(strip=True) for li in list_items)
-
-                                    # Add to product_details dictionary
-                                    product_details['general_specs'] = general_specs
-                                    output_queue.put("Extracted general specifications.")
-
-                                except Exception:
-                                    product_details['general_specs'] = None
-
-                                try:
-                                    mandatory_list = product_page.find("ul", class_="prod-list")
-                                    list_item = mandatory_list.find_all("div", class_="mandatory-list")
-
-                                    for item in list_item:
-                                        key_div = item.find("div", class_="info-label")
-                                        value_div = item.find("div", class_="title")
-
-                                        if key_div and value_div:
-                                            # Extract key and value text
-                                            key = key_div.get_text(strip=True).replace("\xa0", " ")
-                                            value = value_div.get_text(strip=True).replace("\xa0", " ")
-                                            product_details[key] = value
-                                            output_queue.put(f"{key}: {value}")
-
-                                except Exception as e:
-                                    output_queue.put(f"Error adding extra specs: {e}")
-
-                        except Exception as e:
-                            output_queue.put("product specification tag not found")
-
-                    all_product_details.append(product_details)
-                    product_count_ref[0] += 1
-                    output_queue.put(f"Product details of {product_count_ref[0]}/{items_to_scrape} scraped.")
-
-                    # Break if we've scraped the required number of products
-                    if product_count_ref[0] >= items_to_scrape:
-                        break
-
-                    driver.back()  # Go back to the main page
-                    time.sleep(2)
-                    current_url = driver.current_url  # Update to current main page URL
-
-                except Exception as e:
-                    output_queue.put(f"Error scraping product details: {e}")
-                    reconnect_driver()
-                    continue
-
-                # Increment index for the next product
-                index += 1
-
-                # Incremental scrolling after every 3 products
-                if product_count_ref[0] % 3 == 0:
-                    product_elements = driver.find_elements(By.CSS_SELECTOR, "div.item.rilrtl-products-list__item.item")
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});",
-                                          product_elements[index + 1])
-                    time.sleep(2)  # Pause for content to load
-                    soup = bs(driver.page_source, 'html.parser')  # Update soup after scroll
-                    product_sections = soup.find_all("div",
-                                                     class_="item rilrtl-products-list__item item")  # Refresh the product list
-
-            # Exit while loop if no new products are loaded
-            if product_count_ref[0] >= items_to_scrape:
-                break
+        # Phase one: scroll the listing and collect the product links
+        listing = await crawler.collect_listing(driver, parse_current_listing, load_more_products, max_items=items_to_scrape)
+        for helper in listing_helpers:
+            helper.cancel()
 
-        # Save scraped data to a file
-        platform = "ajio"
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{platform}_{search_term}_{timestamp}"
-        
-        # Create filenames with respective extensions
+        # Phase two: visit the product pages concurrently, the idle listing browser is one of the browsers
+        await crawler.visit_products(listing, drivers=[driver], results=results,
+                                     store=product_store.batch(platform, search_term, run=filename), words=words)
+
+        # Export the JSON, CSV and Parquet files by streaming the JSONL file
+        jsonl_filename = results.filename
         json_filename = f"{filename}.json"
         csv_filename = f"{filename}.csv"
+        parquet_filename = f"{filename}.parquet"
 
-        # Pass filenames to file_handler functions
-        save_scraped_data(all_product_details, json_filename)
-        convert_to_csv(all_product_details, csv_filename)
+        records = JsonlRecords(jsonl_filename)
+        fixed_columns = output_columns(fields_to_scrape, FIELD_COLUMNS)  # Not counted as spec columns
+        await run_blocking(save_scraped_data, records, json_filename)
+        await run_blocking(convert_to_csv, records, csv_filename, fixed_columns=fixed_columns)
+        if not await run_blocking(save_parquet, records, parquet_filename, fixed_columns=fixed_columns):
+            output_queue.put("Parquet export skipped: pyarrow is not installed.")
+            parquet_filename = None
+        await run_blocking(checkpoint.remove)
 
         output_queue.put("\n")
         output_queue.put(f"Scraping completed! Data saved to '{filename}'.")
-        output_queue.put(f"Total products scraped: {len(all_product_details)}")
+        output_queue.put(f"Total products scraped: {crawler.completed}")
+        output_queue.put(format_wait_stats())
+        output_queue.put(format_cache_stats())
         
         
         # Generate visuals
-        visuals, zip_filename = generate_visualizations(all_product_details, search_term, timestamp)
+        visuals, zip_filename = await run_blocking(generate_visualizations, records, search_term, timestamp, words)
         
         
-        # Step 6: Notify frontend
-        output_queue.put(json.dumps({
+        summary = {
             "type": "scrape_complete",
             "filenames": {
+                "jsonl": jsonl_filename,
                 "json": json_filename,
                 "csv": csv_filename,
+                "parquet": parquet_filename,
                 "visualizations": visuals,
                 "zip": zip_filename
             },
             "search_term": search_term,
-            "timestamp": timestamp
-        }))
+            "timestamp": timestamp,
+            "products_scraped": crawler.completed
+        }
+
+        # Step 6: Notify frontend
+        output_queue.put(json.dumps(summary))
+        return summary
 
 
     except Exception as e:
         output_queue.put(f"An error occurred: {e}")
 
     finally:
+        for helper in listing_helpers:
+            helper.cancel()
         allow_sleep()
-        driver.quit()
+        await run_blocking(driver.quit)
         
\ No newline at end of file
@@ -1,27 +1,28 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup as bs
 from datetime import datetime
 import re
-import time
 import json
-import matplotlib
-import platform
-if platform.system() == 'Windows':
-    matplotlib.use('TkAgg')  # Use TkAgg on Windows
-else:
-    matplotlib.use('Agg')  # Use Agg for headless system
 import ctypes
 import atexit
 import signal
-from utils.terminal import output_queue, input_queue
-from utils.file_handler import save_scraped_data, convert_to_csv
+import threading
+from urllib.parse import quote_plus
+from config import Config
+from utils.terminal import output_queue, read_input
+from utils.file_handler import JsonlWriter, JsonlRecords, save_scraped_data, convert_to_csv, save_parquet, output_columns
 from utils.visualization import generate_visualizations
-
-
-
-# Store all product details
-all_product_details = []
+from utils.word_frequency import TitleWords
+from utils.driver_pool import driver_pool
+from utils.crawler import Crawler
+from utils.checkpoint import open_checkpoint
+from utils.product_store import product_store
+from utils.batch import ScrapeQuery
+from utils.event_loop import run_blocking
+from utils.http_fetch import HttpFetcher
+from utils.parsing import make_soup
+from utils.extraction import ExtractionSpec, Node, Field, Find, price, percentage
+from utils.waits import wait_until, element_present, format_wait_stats
+from utils.page_cache import format_cache_stats
 
 
 def prevent_sleep():
@@ -38,32 +39,265 @@ def allow_sleep():
 
 # Ensure sleep is allowed even if the program is terminated manually
 atexit.register(allow_sleep)  # Call when program exits normally
-signal.signal(signal.SIGINT, lambda signum, frame: (allow_sleep(), exit(0)))  # Ctrl+C
-signal.signal(signal.SIGTERM, lambda signum, frame: (allow_sleep(), exit(0)))  # Kill command
+# Scrapers are imported on first use, which may be on a request thread; only the main thread can set handlers
+if threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGINT, lambda signum, frame: (allow_sleep(), exit(0)))  # Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: (allow_sleep(), exit(0)))  # Kill command
+
+
+# Readiness predicates for the condition-based waits
+HOME_PAGE_READY = element_present("input[name='q']")
+SEARCH_RESULTS_READY = element_present("div.cPHDOP.col-12-12 div[data-id]")
+PRODUCT_PAGE_READY = element_present("div.C7fEHH")  # Container of the title, price and rating blocks
+
+# Fields a page fetched over HTTP must contain, otherwise it is visited in the browser
+HTTP_REQUIRED_FIELDS = ("title", "discounted_price")
+
+
+
+def extract_product_details(driver, product_details, fields_to_scrape):
+    """Visit the product link in the browser and add the selected detail fields to product_details."""
+    navigate_link = product_details.get('link')
+    if not navigate_link:
+        return
+
+    driver.get(navigate_link)
+    wait_until(driver, PRODUCT_PAGE_READY, "flipkart product page")
+    parse_product_page(make_soup(driver.page_source), product_details, fields_to_scrape)
+
+
+def seller_name(element):
+    """Name in the first child of the seller block."""
+    return element.contents[0].find("span").text.strip()
+
+
+def extract_ratings_and_reviews_count(element, product_details):
+    """Split '1,234 Ratings & 56 Reviews' into rating_count and reviews_count."""
+    try:
+        spans = element.get_text(strip=True)
+
+        # Initialize defaults
+        rating_count = 0
+        review_count = 0
+
+        # Attempt to split by '&' or 'and'
+        parts = spans.split("&")
+        if len(parts) < 2:  # If '&' split fails, try 'and'
+            parts = spans.split("and")
+
+        # Extract rating and review counts
+        if len(parts) > 0:
+            rating_count = parts[0].replace("ratings", "").replace("Ratings", "").replace(
+                ",", "").strip()
+        if len(parts) > 1:
+            review_count = parts[1].replace("reviews", "").replace("Reviews", "").replace(
+                ",", "").strip()
+
+        # output_queue.put and store the extracted values
+        output_queue.put(f"rating count: {rating_count}")
+        output_queue.put(f"reviews count: {review_count}")
+
+        # Store in product details
+        product_details['rating_count'] = rating_count
+        product_details['reviews_count'] = review_count
+
+    except Exception as e:
+        output_queue.put(f"Error extracting rating/reviews count: {e}")
+        product_details['rating_count'] = None
+        product_details['reviews_count'] = None
+
+
+def extract_product_specifications(product_page, product_details):
+    """Add the rows of the specification tables to product_details (one key per row)."""
+    # Flag to check if data was extracted using Condition 1
+    condition1_extracted = False
+
+    try:
+        # Condition 1: <div class="_5Pmv5S">
+        product_info_div = product_page.find("div", class_="_5Pmv5S")
+        if product_info_div:
+            output_queue.put("Found product details in condition 1 format.")
+            rows = product_info_div.find("div", class_="row _1IK+Dg").find_all("div",
+                                                                               class_="row")
+            for row in rows:
+                key_div = row.find("div", class_="col col-3-12 _9NUIO9")
+                value_div = row.find("div", class_="col col-9-12 -gXFvC")
+
+                if key_div and value_div:
+                    key = key_div.get_text(strip=True).replace("\xa0", " ")
+                    value = value_div.get_text(strip=True).replace("\xa0", " ")
+                    product_details[key] = value
+                    output_queue.put(f"{key}: {value}")
+                    condition1_extracted = True  # Set the flag to True if details are extracted
+
+    except Exception as e:
+        output_queue.put(f"Error in extracting details using condition 1: {e}")
+
+    try:
+        # Condition 2: <div class="_3Fm-hO">
+        if not condition1_extracted:  # Only check if condition 1 didn't yield results
+            product_info_div = product_page.find("div", class_="_3Fm-hO")
+            if product_info_div:
+                output_queue.put("Found product details in condition 2 format.")
+                sections = product_info_div.find_all("div", class_="GNDEQ-")
+                for sect in sections:
+                    table = sect.find('table', class_="_0ZhAN9")
+                    rows = table.find_all("tr", class_="WJdYP6 row")
+                    for row in rows:
+                        key_td = row.find("td", class_="+fFi1w col col-3-12")
+                        value_td = row.find("td", class_="Izz52n col col-9-12")
+
+                        if key_td and value_td:
+                            key = key_td.get_text(strip=True).replace("\xa0", " ")
+                            value = value_td.get_text(strip=True).replace("\xa0", " ")
+                            product_details[key] = value
+                            output_queue.put(f"{key}: {value}")
+
+    except Exception as e:
+        output_queue.put(f"Error in extracting details using condition 2: {e}")
+
+
+
+# Declarative extraction spec of the product page, compiled into a plan per field selection
+PRODUCT_PAGE_SPEC = ExtractionSpec(
+    nodes={
+        "summary": Node(Find("div", class_="C7fEHH")),
+        "price_section": Node(Find("div", class_="x+7QT1") | Find("div", class_="x+7QT1 dB67CR"), parent="summary"),
+        "ratings": Node(Find("div", class_="ISksQ2"), parent="summary"),
+    },
+    fields={
+        "title": Field(Find("span", class_="VU-ZEz"), node="summary", label="Title"),
+        "discounted_price": Field(Find("div", class_="Nx9bqj CxhGGd"), node="price_section", parse=price,
+                                  label="Discounted price"),
+        "original_price": Field(Find("div", class_="yRaY8j A6+E6v"), node="price_section", parse=price,
+                                fallback="discounted_price", label="Original price"),
+        "discount_percentage": Field(Find("div", class_="UkUFwK WW8yVX dB67CR") | Find("div", class_="UkUFwK WW8yVX"),
+                                     node="price_section", parse=percentage, default="0%",
+                                     label="Discount percentage"),
+        "rating": Field(Find("div", class_="XQDdHH _1Quie7") | Find("div", class_="XQDdHH"), node="ratings",
+                        label="Rating"),
+        "ratings_&_reviews_count": Field(Find("span", class_="Wphh3N"), node="ratings",
+                                         extract=extract_ratings_and_reviews_count),
+        "seller_name": Field(Find("div", id="sellerName"), value=seller_name, label="Seller_name"),
+        "product_specifications": Field(extract=extract_product_specifications),
+    }
+)
+
+# Record keys of the fields whose keys differ from the field name; the specification rows are spec keys
+FIELD_COLUMNS = {"ratings_&_reviews_count": ("rating_count", "reviews_count"), "product_specifications": ()}
+
+
+def parse_product_page(product_page, product_details, fields_to_scrape):
+    """Add the selected detail fields found in a parsed product page to product_details."""
+    PRODUCT_PAGE_SPEC.plan(fields_to_scrape).run(product_page, product_details)
+
+
+
+def parse_listing_page(driver, fields_to_scrape):
+    """Return the products of the current result page with their links and listing-level fields."""
+    listing = []
+
+    wait_until(driver, SEARCH_RESULTS_READY, "flipkart search results")
+    data = driver.page_source  # Get the entire page source
+    soup = make_soup(data)
+
+    # Extract product sections only if they contain <div class="_75nlfW">
+    product_sections = soup.find_all("div", class_="cPHDOP col-12-12")
+    for section in product_sections:
+        # Find all <div class="_75nlfW"> and <div class="_75nlfW LYgYA3">
+        product_containers = section.find_all("div", class_=["_75nlfW", "_75nlfW LYgYA3"])
+
+        # Iterate through each product container
+        for container in product_containers:
+            # Find all <div> tags inside the container that have the "data-id" attribute
+            product_divs = container.find_all("div", attrs={"data-id": True})
+
+            for product in product_divs:
+                product_details = {}
+
+                # Extract link internally (for navigation)
+                try:
+                    link = product.find("a", target="_blank")["href"]
+                    product_details['link'] = f"https://www.flipkart.com{link}"
 
+                except Exception:
+                    product_details['link'] = None
 
 
-def flipkart_scrape():
+                # Extract and add other fields based on user selection
+                if "image_url" in fields_to_scrape:
+                    try:
+                        img_tag = product.find("img", class_="_53J4C-") or product.find("img", class_="DByuf4")
+                        product_details['image_url'] = img_tag['src']
+                        output_queue.put(f"Image found: {product_details['image_url']}")
+                    except Exception:
+                        product_details['image_url'] = None
+
+                # Keep the product for the detail page visits
+                listing.append(product_details)
+
+    return listing
+
+
+def go_to_next_page(driver, page_number):
+    """Follow the pagination to page_number; returns False on the last page."""
+    try:
+        next_buttons = driver.find_elements(By.CSS_SELECTOR, 'nav.WSL9JP > a._9QVEpD')
+
+        if len(next_buttons) == 1:  # First page: only one button (Next button)
+            next_link = next_buttons[0].get_attribute('href')
+
+        elif len(next_buttons) == 2:  # From the second page onwards: take the second button
+            next_link = next_buttons[1].get_attribute('href')
+
+        else:
+            return False
+
+        driver.get(next_link)  # Navigate to the next page
+        return True
+    except Exception as e:
+        output_queue.put(f"Error navigating to the next page: {e}")
+        return False
+
+
+
+def results_url(search_term):
+    """Result page URL of a search term, for scrapes that do not use the search box."""
+    return f"https://www.flipkart.com/search?q={quote_plus(search_term)}"
+
+
+async def flipkart_scrape(query=None):
+    """
+    Scrapes Flipkart search results, asking the user on the terminal for the search and options.
+
+    :param query: ScrapeQuery to run without prompts instead
+    :return: Summary of the saved files, None if the scrape did not complete
+    """
     prevent_sleep()
     # Set up the driver
-    driver = webdriver.Chrome()
+    driver = await driver_pool.acquire()
+    fetcher = None
 
     try:
-        # Open Flipkart homepage
-        driver.get("https://www.flipkart.com/")
-        time.sleep(5)  # Allow time for the page to load
-
-        output_queue.put("Please type your search query directly into the Flipkart search box and press Enter.")
-        output_queue.put("Once the search results have loaded, type 'ok' to proceed.")
-        reply = input_queue.get().strip().lower() # Wait for user confirmation
-        if reply != 'ok':
-            output_queue.put("Scraping canceled by the user.")
-            driver.quit()
-            exit()
+        if query is not None:
+            # Open the search results directly
+            await run_blocking(driver.get, results_url(query.search_term))
+            await run_blocking(wait_until, driver, SEARCH_RESULTS_READY, "flipkart search results")
+        else:
+            # Open Flipkart homepage
+            await run_blocking(driver.get, "https://www.flipkart.com/")
+            await run_blocking(wait_until, driver, HOME_PAGE_READY, "flipkart home page")  # Wait for the search box
+
+            output_queue.put("Please type your search query directly into the Flipkart search box and press Enter.")
+            output_queue.put("Once the search results have loaded, type 'ok' to proceed.")
+            reply = (await read_input()).strip().lower() # Wait for user confirmation
+            if reply != 'ok':
+                output_queue.put("Scraping canceled by the user.")
+                return
     
 
         # Extract the search term from the current URL
-        search_url = driver.current_url
+        search_url = await run_blocking(getattr, driver, 'current_url')
 
         try:
             if "q=" in search_url:
@@ -81,13 +315,13 @@ def flipkart_scrape():
 
 
         # Confirm the scraping process with the user
-        output_queue.put(
-                f"Do you want to scrape data for the search term '{search_term.replace('_', ' ')}'? (yes/no): ")
-        proceed = input_queue.get().strip().lower()
-        if proceed != 'yes':
-            output_queue.put("Scraping canceled by the user.")
-            driver.quit()
-            exit()
+        if query is None:
+            output_queue.put(
+                    f"Do you want to scrape data for the search term '{search_term.replace('_', ' ')}'? (yes/no): ")
+            proceed = (await read_input()).strip().lower()
+            if proceed != 'yes':
+                output_queue.put("Scraping canceled by the user.")
+                return
 
         # Ask the user what fields they want to scrape
         available_fields = {
@@ -103,354 +337,132 @@ def flipkart_scrape():
             "10": "product_specifications"
         }
 
-        output_queue.put("\n")
-        output_queue.put("Available fields to scrape:")
-        for key, value in available_fields.items():
-            output_queue.put(f"{key}. {value}")
+        if query is not None:
+            fields_to_scrape = query.select_fields(available_fields)
+        else:
+            output_queue.put("\n")
+            output_queue.put("Available fields to scrape:")
+            for key, value in available_fields.items():
+                output_queue.put(f"{key}. {value}")
 
-        output_queue.put("\n")
-        output_queue.put("Enter the numbers corresponding to the fields you want to scrape, separated by commas: ")
-        selected_fields = input_queue.get()
-        selected_fields = selected_fields.split(",")
+            output_queue.put("\n")
+            output_queue.put("Enter the numbers corresponding to the fields you want to scrape, separated by commas: ")
+            selected_fields = (await read_input())
+            selected_fields = selected_fields.split(",")
 
-        fields_to_scrape = [available_fields[field.strip()] for field in selected_fields if
-                            field.strip() in available_fields]
+            fields_to_scrape = [available_fields[field.strip()] for field in selected_fields if
+                                field.strip() in available_fields]
 
         if not fields_to_scrape:
             output_queue.put("No valid fields selected. Exiting.")
-            driver.quit()
-            exit()
+            return
 
         output_queue.put(f"Fields selected for scraping: {fields_to_scrape}")
 
         # Extract the maximum number of pages dynamically
         try:
-            max_pages_elem = driver.find_element(By.CSS_SELECTOR, "div._1G0WLw > span")
-            max_pages_text = max_pages_elem.text.strip()
+            max_pages_elem = await run_blocking(driver.find_element, By.CSS_SELECTOR, "div._1G0WLw > span")
+            max_pages_text = (await run_blocking(getattr, max_pages_elem, 'text')).strip()
             # Use regex to extract the last number from the text, removing commas
             max_pages = int(re.findall(r'\d+', max_pages_text.replace(",", ""))[-1])
         except Exception as e:
             max_pages = 1
 
-        # Ask the user how many pages they want to scrape
-        output_queue.put("\n")
-        output_queue.put(f"How many pages do you want to scrape? (1-{max_pages}): ")
-        pages_to_scrape = int(input_queue.get().strip())
-        if pages_to_scrape < 1 or pages_to_scrape > max_pages:
-            output_queue.put(
-                f"Flipkart displays only {max_pages} pages for a keyword. Please provide a page number between 1 and {max_pages}.")
-            driver.quit()
-            exit()
+        if query is not None:
+            pages_to_scrape = query.limit(query.max_pages, max_pages)
+        else:
+            # Ask the user how many pages they want to scrape
+            output_queue.put("\n")
+            output_queue.put(f"How many pages do you want to scrape? (1-{max_pages}): ")
+            pages_to_scrape = int((await read_input()).strip())
+            if pages_to_scrape < 1 or pages_to_scrape > max_pages:
+                output_queue.put(
+                    f"Flipkart displays only {max_pages} pages for a keyword. Please provide a page number between 1 and {max_pages}.")
+                return
 
         output_queue.put(f"Scraping data for {pages_to_scrape} pages...")
 
 
-        product_count = 0   # Track number of products
-        current_page = 1  # Track the current page
-
-
-        while current_page <= pages_to_scrape:
-            time.sleep(5)
-            current_page_url = driver.current_url  # Store the current page URL
-            data = driver.page_source  # Get the entire page source
-            soup = bs(data, 'html.parser')
-
-            # Extract product sections only if they contain <div class="_75nlfW">
-            product_sections = soup.find_all("div", class_="cPHDOP col-12-12")
-            for section in product_sections:
-                # Find all <div class="_75nlfW"> and <div class="_75nlfW LYgYA3">
-                product_containers = section.find_all("div", class_=["_75nlfW", "_75nlfW LYgYA3"])
-
-                # Iterate through each product container
-                for container in product_containers:
-                    # Find all <div> tags inside the container that have the "data-id" attribute
-                    product_divs = container.find_all("div", attrs={"data-id": True})
-
-                    for product in product_divs:
-                        product_details = {}
-
-                        # Extract link internally (for navigation)
-                        try:
-                            link = product.find("a", target="_blank")["href"]
-                            product_details['link'] = f"https://www.flipkart.com{link}"
-
-                        except Exception:
-                            product_details['link'] = None
-
-                        # --- FIXED LOGIC: Always keep the link internally for navigation ---
-                        navigate_link = product_details.get('link')  # Store the link for navigation
-
-                        # Extract and add other fields based on user selection
-                        if "image_url" in fields_to_scrape:
-                            try:
-                                img_tag = product.find("img", class_="_53J4C-") or product.find("img", class_="DByuf4")
-                                product_details['image_url'] = img_tag['src']
-                                output_queue.put(f"Image found: {product_details['image_url']}")
-                            except Exception:
-                                product_details['image_url'] = None
-
-                        # Visit the product link to extract additional details
-                        if navigate_link:
-                            driver.get(navigate_link)
-                            time.sleep(3)
-                            product_page = bs(driver.page_source, 'html.parser')
-
-                            # Extract product title
-                            if "title" in fields_to_scrape:
-                                try:
-                                    title = product_page.find("div", class_="C7fEHH").find("span",
-                                                                                           class_="VU-ZEz").get_text(
-                                        strip=True).replace("\xa0", " ")
-                                    output_queue.put(f"Title: {title}")
-                                    product_details['title'] = title
-                                except Exception:
-                                    product_details['title'] = None
-
-                            # Extract pricing and discount information
-                            if "discounted_price" in fields_to_scrape:
-                                try:
-                                    price_div = product_page.find("div", class_="C7fEHH")
-                                    section_div = price_div.find("div", class_="x+7QT1") or price_div.find("div",
-                                                                                                           class_="x+7QT1 dB67CR")
-                                    discounted_price_text = section_div.find("div", class_="Nx9bqj CxhGGd").get_text(strip=True)
-                                    discounted_price_string = discounted_price_text.replace("₹", "").replace(",", "").strip()
-                                    discounted_price = int(discounted_price_string)
-                                    output_queue.put(f"Discounted price: {discounted_price}")
-                                    product_details['discounted_price'] = discounted_price
-                                except Exception:
-                                    product_details['discounted_price'] = None
-
-                            if "original_price" in fields_to_scrape:
-                                try:
-                                    price_div = product_page.find("div", class_="C7fEHH")
-                                    section_div = price_div.find("div", class_="x+7QT1") or price_div.find("div",
-                                                                                                           class_="x+7QT1 dB67CR")
-                                    original_price_text = section_div.find("div", class_="yRaY8j A6+E6v").get_text(strip=True)
-                                    original_price_string = original_price_text.replace("₹", "").replace(",", "").strip()
-                                    original_price = int(original_price_string)
-                                    output_queue.put(f"Original price: {original_price}")
-                                    product_details['original_price'] = original_price
-                                except Exception:
-                                    output_queue.put("Original Price is same as Discounted Price.")
-                                    if "discounted_price" in fields_to_scrape:
-                                        product_details['original_price'] = product_details['discounted_price']
-                                    else:
-                                        # If discounted price isn't selected, attempt to scrape it directly
-                                        price_div = product_page.find("div", class_="C7fEHH")
-                                        section_div = price_div.find("div", class_="x+7QT1") or price_div.find("div", class_="x+7QT1 dB67CR")
-
-                                        if section_div:  # Ensure section_div exists before proceeding
-                                            try:
-                                                discounted_price_text = section_div.find("div", class_="Nx9bqj CxhGGd").get_text(strip=True)
-                                                discounted_price_string = discounted_price_text.replace("₹", "").replace(",", "").strip()
-                                                discounted_price = int(discounted_price_string)
-                                                output_queue.put(f"Original Price (from discount price): {discounted_price}")
-                                                product_details['original_price'] = discounted_price
-                                            except Exception:
-                                                product_details['original_price'] = None
-                                        else:
-                                            product_details['original_price'] = None
-
-                            if "discount_percentage" in fields_to_scrape:
-                                try:
-                                    price_div = product_page.find("div", class_="C7fEHH")
-                                    section_div = price_div.find("div", class_="x+7QT1") or price_div.find("div",
-                                                                                                           class_="x+7QT1 dB67CR")
-                                    discount_percentage_text = (section_div.find("div", class_="UkUFwK WW8yVX dB67CR")
-                                                                or section_div.find("div", class_="UkUFwK WW8yVX")).get_text(strip=True)
-                                    discount_percentage = int(discount_percentage_text.replace(f"% off", "").strip())
-                                    product_details['discount_percentage'] = f"{discount_percentage}%"
-                                    output_queue.put(f"Discount percentage: {product_details['discount_percentage']}")
-                                except Exception:
-                                    output_queue.put(f"Discount % is 0")
-                                    discount_percentage = 0
-                                    product_details['discount_percentage'] = f"{discount_percentage}%"
-
-
-                            # Extract rating and reviews
-                            if "rating" in fields_to_scrape:
-                                try:
-                                    rating_review_div = product_page.find("div", class_="C7fEHH")
-                                    section_div = rating_review_div.find("div", class_="ISksQ2")
-                                    rating = (section_div.find("div", class_="XQDdHH _1Quie7")
-                                              or section_div.find("div", class_="XQDdHH")).get_text(strip=True)
-                                    output_queue.put(f"Rating: {rating}")
-                                    product_details['rating'] = rating
-                                except Exception:
-                                    product_details['rating'] = None
-
-                            if "ratings_&_reviews_count" in fields_to_scrape:
-                                try:
-                                    rating_review_div = product_page.find("div", class_="C7fEHH")
-                                    section_div = rating_review_div.find("div", class_="ISksQ2")
-                                    spans = section_div.find("span", class_="Wphh3N").get_text(strip=True)
-
-                                    # Initialize defaults
-                                    rating_count = 0
-                                    review_count = 0
-
-                                    # Attempt to split by '&' or 'and'
-                                    parts = spans.split("&")
-                                    if len(parts) < 2:  # If '&' split fails, try 'and'
-                                        parts = spans.split("and")
-
-                                    # Extract rating and review counts
-                                    if len(parts) > 0:
-                                        rating_count = parts[0].replace("ratings", "").replace("Ratings", "").replace(
-                                            ",", "").strip()
-                                    if len(parts) > 1:
-                                        review_count = parts[1].replace("reviews", "").replace("Reviews", "").replace(
-                                            ",", "").strip()
-
-                                    # output_queue.put and store the extracted values
-                                    output_queue.put(f"rating count: {rating_count}")
-                                    output_queue.put(f"reviews count: {review_count}")
-
-                                    # Store in product details
-                                    product_details['rating_count'] = rating_count
-                                    product_details['reviews_count'] = review_count
-
-                                except Exception as e:
-                                    output_queue.put(f"Error extracting rating/reviews count: {e}")
-                                    product_details['rating_count'] = None
-                                    product_details['reviews_count'] = None
-
-
-                            # Extract seller's name
-                            if "seller_name" in fields_to_scrape:
-                                try:
-                                    seller_tag = product_page.find("div", id="sellerName")
-                                    seller_name = seller_tag.contents[0].find("span").text.strip()
-                                    output_queue.put(f"Seller_name: {seller_name}")
-                                    product_details['seller_name'] = seller_name
-                                except Exception:
-                                    product_details['seller_name'] = None
-
-                            # Extract additional product specifications from the product page
-                            if "product_specifications" in fields_to_scrape:
-                                # Flag to check if data was extracted using Condition 1
-                                condition1_extracted = False
-
-                                try:
-                                    # Condition 1: <div class="_5Pmv5S">
-                                    product_info_div = product_page.find("div", class_="_5Pmv5S")
-                                    if product_info_div:
-                                        output_queue.put("Found product details in condition 1 format.")
-                                        rows = product_info_div.find("div", class_="row _1IK+Dg").find_all("div",
-                                                                                                           class_="row")
-                                        for row in rows:
-                                            key_div = row.find("div", class_="col col-3-12 _9NUIO9")
-                                            value_div = row.find("div", class_="col col-9-12 -gXFvC")
-
-                                            if key_div and value_div:
-                                                key = key_div.get_text(strip=True).replace("\xa0", " ")
-                                                value = value_div.get_text(strip=True).replace("\xa0", " ")
-                                                product_details[key] = value
-                                                output_queue.put(f"{key}: {value}")
-                                                condition1_extracted = True  # Set the flag to True if details are extracted
-
-                                except Exception as e:
-                                    output_queue.put(f"Error in extracting details using condition 1: {e}")
-
-                                try:
-                                    # Condition 2: <div class="_3Fm-hO">
-                                    if not condition1_extracted:  # Only check if condition 1 didn't yield results
-                                        product_info_div = product_page.find("div", class_="_3Fm-hO")
-                                        if product_info_div:
-                                            output_queue.put("Found product details in condition 2 format.")
-                                            sections = product_info_div.find_all("div", class_="GNDEQ-")
-                                            for sect in sections:
-                                                table = sect.find('table', class_="_0ZhAN9")
-                                                rows = table.find_all("tr", class_="WJdYP6 row")
-                                                for row in rows:
-                                                    key_td = row.find("td", class_="+fFi1w col col-3-12")
-                                                    value_td = row.find("td", class_="Izz52n col col-9-12")
-
-                                                    if key_td and value_td:
-                                                        key = key_td.get_text(strip=True).replace("\xa0", " ")
-                                                        value = value_td.get_text(strip=True).replace("\xa0", " ")
-                                                        product_details[key] = value
-                                                        output_queue.put(f"{key}: {value}")
-
-                                except Exception as e:
-                                    output_queue.put(f"Error in extracting details using condition 2: {e}")
-
-                            driver.get(current_page_url)  # Reload the main page
-                            time.sleep(2)
-
-
-                        # Add the link to the output only if the user selected it
-                        if "link" not in fields_to_scrape:
-                            product_details.pop('link', None)
-
-
-                        all_product_details.append(product_details)
-                        product_count += 1
-                        output_queue.put(f"{product_count} products scraped.")
-
-
-            # Move to the next page if necessary
-            if current_page < pages_to_scrape:
-                try:
-                    next_buttons = driver.find_elements(By.CSS_SELECTOR, 'nav.WSL9JP > a._9QVEpD')
+        # Progress is saved to a checkpoint the scrape can be resumed from
+        checkpoint = await open_checkpoint(query or ScrapeQuery("flipkart", search_term, fields_to_scrape, max_pages=pages_to_scrape),
+                                           ask=query is None)
 
-                    if len(next_buttons) == 1:  # First page: only one button (Next button)
-                        next_link = next_buttons[0].get_attribute('href')
+        # Products are appended to a JSONL file as they are scraped; a resumed scrape continues its file
+        if checkpoint.timestamp is None:
+            checkpoint.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        platform = "flipkart"
+        timestamp = checkpoint.timestamp
+        filename = f"{platform}_{search_term}_{timestamp}"
+        results = JsonlWriter(f"{filename}.jsonl")
+        words = TitleWords(search_term)  # Word cloud counts, taken as the products are scraped
 
-                    elif len(next_buttons) == 2:  # From the second page onwards: take the second button
-                        next_link = next_buttons[1].get_attribute('href')
+        crawler = Crawler(fields_to_scrape, extract_product_details, parse_page=parse_product_page,
+                          required_fields=HTTP_REQUIRED_FIELDS, checkpoint=checkpoint, platform=platform,
+                          field_columns=FIELD_COLUMNS)
 
-                    else:
-                        output_queue.put("No more pages available.")
-                        break
+        # Phase one: walk the result pages without leaving the listing
+        listing = await crawler.collect_listing(driver, parse_listing_page, go_to_next_page, max_pages=pages_to_scrape)
 
-                    driver.get(next_link)  # Navigate to the next page
-                    current_page += 1
-                except Exception as e:
-                    output_queue.put(f"Error navigating to the next page: {e}")
-                    break
-            else:
-                break
+        # In HTTP mode pages are downloaded with the browser session's cookies, the browser is the fallback
+        if Config.FETCH_MODE == 'http':
+            fetcher = HttpFetcher()
+            await run_blocking(fetcher.seed_from_driver, driver)
 
-        # Save scraped data to a file
-        platform = "flipkart"
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{platform}_{search_term}_{timestamp}"
-        
-        # Create filenames with respective extensions
+        # Phase two: fetch the product pages concurrently, the idle listing browser is one of the browsers
+        await crawler.visit_products(listing, drivers=[driver], fetcher=fetcher, results=results,
+                                     store=product_store.batch(platform, search_term, run=filename), words=words)
+
+        # Export the JSON, CSV and Parquet files by streaming the JSONL file
+        jsonl_filename = results.filename
         json_filename = f"{filename}.json"
         csv_filename = f"{filename}.csv"
+        parquet_filename = f"{filename}.parquet"
 
-        # Pass filenames to file_handler functions
-        save_scraped_data(all_product_details, json_filename)
-        convert_to_csv(all_product_details, csv_filename)
+        records = JsonlRecords(jsonl_filename)
+        fixed_columns = output_columns(fields_to_scrape, FIELD_COLUMNS)  # Not counted as spec columns
+        await run_blocking(save_scraped_data, records, json_filename)
+        await run_blocking(convert_to_csv, records, csv_filename, fixed_columns=fixed_columns)
+        if not await run_blocking(save_parquet, records, parquet_filename, fixed_columns=fixed_columns):
+            output_queue.put("Parquet export skipped: pyarrow is not installed.")
+            parquet_filename = None
+        await run_blocking(checkpoint.remove)
 
         output_queue.put("\n")
         output_queue.put(f"Scraping completed! Data saved to '{filename}'.")
-        output_queue.put(f"Total products scraped: {len(all_product_details)}")
+        output_queue.put(f"Total products scraped: {crawler.completed}")
+        output_queue.put(format_wait_stats())
+        output_queue.put(format_cache_stats())
         
         
         # Generate visuals
-        visuals, zip_filename = generate_visualizations(all_product_details, search_term, timestamp)
+        visuals, zip_filename = await run_blocking(generate_visualizations, records, search_term, timestamp, words)
         
         
-        # Step 6: Notify frontend
-        output_queue.put(json.dumps({
+        summary = {
             "type": "scrape_complete",
             "filenames": {
+                "jsonl": jsonl_filename,
                 "json": json_filename,
                 "csv": csv_filename,
+                "parquet": parquet_filename,
                 "visualizations": visuals,
                 "zip": zip_filename
             },
             "search_term": search_term,
-            "timestamp": timestamp
-        }))
+            "timestamp": timestamp,
+            "products_scraped": crawler.completed
+        }
+
+        # Step 6: Notify frontend
+        output_queue.put(json.dumps(summary))
+        return summary
 
 
     except Exception as e:
         output_queue.put(f"An error occurred: {e}")
 
     finally:
+        if fetcher is not None:
+            await fetcher.close()
         allow_sleep()
-        driver.quit()
+        await driver_pool.release(driver)
@@ -1,28 +1,27 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup as bs
 from datetime import datetime
 import re
-import time
 import json
-import matplotlib
-import platform
-if platform.system() == 'Windows':
-    matplotlib.use('TkAgg')  # Use TkAgg on Windows
-else:
-    matplotlib.use('Agg')  # Use Agg for headless systems
 import ctypes
 import atexit
 import signal
-from utils.terminal import output_queue, input_queue
-from utils.file_handler import save_scraped_data, convert_to_csv
+import threading
+from urllib.parse import quote
+from utils.terminal import output_queue, read_input
+from utils.file_handler import JsonlWriter, JsonlRecords, save_scraped_data, convert_to_csv, save_parquet, output_columns
 from utils.visualization import generate_visualizations
-
-
-# Store all product details
-all_product_details = []
+from utils.word_frequency import TitleWords
+from utils.driver_pool import driver_pool
+from utils.crawler import Crawler
+from utils.checkpoint import open_checkpoint
+from utils.product_store import product_store
+from utils.batch import ScrapeQuery
+from utils.event_loop import run_blocking
+from utils.parsing import make_soup
+from utils.extraction import ExtractionSpec, Field, Find, attr, price, count
+from utils.waits import wait_until, element_present, element_count_above, format_wait_stats
+from utils.page_cache import format_cache_stats
 
 
 def prevent_sleep():
@@ -39,33 +38,277 @@ def allow_sleep():
 
 # Ensure sleep is allowed even if the program is terminated manually
 atexit.register(allow_sleep)  # Call when program exits normally
-signal.signal(signal.SIGINT, lambda signum, frame: (allow_sleep(), exit(0)))  # Ctrl+C
-signal.signal(signal.SIGTERM, lambda signum, frame: (allow_sleep(), exit(0)))  # Kill command
+# Scrapers are imported on first use, which may be on a request thread; only the main thread can set handlers
+if threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGINT, lambda signum, frame: (allow_sleep(), exit(0)))  # Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: (allow_sleep(), exit(0)))  # Kill command
+
+
+# Readiness predicates for the condition-based waits
+HOME_PAGE_READY = element_present("input.desktop-searchBar")
+SEARCH_RESULTS_READY = element_present("ul.results-base > li[id]")
+PRODUCT_PAGE_READY = element_present("h1.pdp-title")
+NEXT_PAGE_BUTTON = EC.element_to_be_clickable((By.CSS_SELECTOR, "ul.pagination-container > li.pagination-next"))
+SPECIFICATION_TABLES = "div.index-sizeFitDesc div.index-tableContainer"
 
       
 
-def myntra_scrape():
+def extract_product_details(driver, product_details, fields_to_scrape):
+    """Visit the product link and add the selected detail fields to product_details."""
+    navigate_link = product_details.get('link')
+    if not navigate_link:
+        return
+
+    driver.get(navigate_link)
+    wait_until(driver, PRODUCT_PAGE_READY, "myntra product page")
+
+    # Load the second specification table before the page is parsed
+    if "specifications" in fields_to_scrape:
+        show_all_specifications(driver)
+
+    parse_product_page(make_soup(driver.page_source), product_details, fields_to_scrape)
+
+
+def show_all_specifications(driver):
+    """Click the "show more" button of the specifications, if available."""
+    try:
+        show_more_buttons = driver.find_elements(By.CSS_SELECTOR, "div.index-showMoreText")
+        if show_more_buttons:
+            tables_before = len(driver.find_elements(By.CSS_SELECTOR, SPECIFICATION_TABLES))
+
+            # Use Selenium to click on the button
+            driver.execute_script("arguments[0].click();",
+                                  show_more_buttons[0])  # Ensure the click happens
+
+            # Wait for the second table to appear
+            wait_until(driver, element_count_above(SPECIFICATION_TABLES, tables_before), "myntra show more")
+    except Exception as e:
+        output_queue.put(f"Error clicking 'show more' button: {e}")
+
+
+def style_image_url(style_attr):
+    """Image URL from a 'background-image: url("...jpg")' style attribute."""
+    match = re.search(r'url\("([^"]+\.(jpg|jpeg))"\)', style_attr)
+    return match.group(1) if match else None
+
+
+def rating_text(element):
+    """'4.2 | 1.2k Ratings' -> '4.2'."""
+    return element.get_text().split("|")[0].strip()
+
+
+def extract_discount_percentage(element, product_details):
+    """Discount shown on the page; when it is given in Rs., computed from the scraped prices."""
+    discount_percentage_text = element.get_text()
+
+    # Condition to handle "Rs." instead of a percentage
+    if "Rs." in discount_percentage_text:
+        original_price = product_details.get('original_price')
+        discounted_price = product_details.get('discounted_price')
+        discount_percentage = round(((original_price - discounted_price) / original_price) * 100)
+    else:
+        # Extract percentage directly if available
+        discount_percentage = int(discount_percentage_text.split(" ")[0].replace("(", "").replace("%", "").strip())
+
+    return f"{discount_percentage}%"
+
+
+def extract_product_description(product_page, product_details):
+    """Product description, plus the extra description sections as one key each."""
+    try:
+        # Find the product description paragraph
+        product_det_tag = product_page.find("p", class_="pdp-product-description-content")
+        if product_det_tag:
+            # Replace <br> tags with newline characters
+            for br in product_det_tag.find_all("br"):
+                br.insert_after("\n")  # Insert a newline after each <br>
+                br.decompose()  # Remove the <br> tag itself
+
+            # Get the text without collapsing spaces
+            product_det = product_det_tag.get_text(separator=" ").replace("\xa0", " ").strip()
+            output_queue.put("Found product_details")
+            product_details['product_details'] = product_det
+        else:
+            product_details['product_details'] = None
+
+        # Check for additional details in <div class="pdp-sizeFitDesc">
+        size_fit_desc_divs = product_page.find_all("div", class_="pdp-sizeFitDesc")
+        for div in size_fit_desc_divs:
+            try:
+                # Extract key from <h4> and value from <p>
+                key_tag = div.find("h4",
+                                   class_="pdp-sizeFitDescTitle pdp-product-description-title")
+                value_tag = div.find("p",
+                                     class_="pdp-sizeFitDescContent pdp-product-description-content")
+
+                if key_tag and value_tag:
+                    # Replace <br> tags in value with newline characters
+                    for br in value_tag.find_all("br"):
+                        br.insert_after("\n")  # Insert a newline after each <br>
+                        br.decompose()  # Remove the <br> tag itself
+
+                    key = key_tag.get_text(strip=True)
+                    value = value_tag.get_text(separator=" ").replace("\xa0", " ").strip()
+
+                    # Add key-value pair directly to product_details dictionary
+                    product_details[key] = value
+                    output_queue.put(f"{key}: {value}")
+            except Exception as e:
+                output_queue.put(f"Error processing additional detail div: {e}")
+                continue  # Skip this div if there's an issue
+
+    except Exception as e:
+        output_queue.put(f"Error extracting product details: {e}")
+        product_details['product_details'] = None
+
+
+def extract_specifications(product_page, product_details):
+    """Add the rows of the specification tables to product_details (one key per row)."""
+    try:
+        # Locate the sizeFitDesc container
+        product_info_div = product_page.find("div", class_="index-sizeFitDesc")
+        if product_info_div:
+            # Find all table containers (before and after clicking "show more")
+            tables = product_info_div.find_all("div", class_="index-tableContainer")
+            for table in tables:
+                # Extract rows from each table
+                rows = table.find_all("div", class_="index-row")
+                for row in rows:
+                    key_div = row.find("div", class_="index-rowKey")
+                    value_div = row.find("div", class_="index-rowValue")
+
+                    if key_div and value_div:
+                        # Extract key and value text
+                        key = key_div.get_text(strip=True).replace("\xa0", " ")
+                        value = value_div.get_text(strip=True).replace("\xa0", " ")
+                        product_details[key] = value
+                        output_queue.put(f"{key}: {value}")
+
+    except Exception as e:
+        output_queue.put(f"Error in extracting specifications: {e}")
+
+
+
+# Declarative extraction spec of the product page, compiled into a plan per field selection
+PRODUCT_PAGE_SPEC = ExtractionSpec(
+    fields={
+        "image_url": Field(Find("div", class_="image-grid-container common-clearfix"),
+                           Find("div", class_="image-grid-col50"), Find("div", class_="image-grid-image"),
+                           value=attr("style"), parse=style_image_url, label="Found image URL"),
+        "title": Field(Find("h1", class_="pdp-name"), label="Found title"),
+        "discounted_price": Field(Find("span", class_="pdp-price"), parse=price, label="Found discounted price"),
+        "original_price": Field(Find("span", class_="pdp-mrp"), Find("s"), parse=price, fallback="discounted_price",
+                                label="Found original price"),
+        "discount_percentage": Field(Find("span", class_="pdp-discount"), extract=extract_discount_percentage,
+                                     default="0%", label="Final discount percentage"),
+        "rating": Field(Find("div", class_="index-overallRating"), value=rating_text, label="Found rating"),
+        "reviews_count": Field(Find("div", class_="index-ratingsCount"), value=lambda element: element.get_text(),
+                               parse=count, label="Found reviews count"),
+        "brand_name": Field(Find("h1", class_="pdp-title"), label="Found brand_name"),
+        "seller_name": Field(Find("span", class_="supplier-productSellerName"), label="Found seller_name"),
+        "product_details": Field(extract=extract_product_description),
+        "specifications": Field(extract=extract_specifications),
+    }
+)
+
+# Record keys of the fields whose keys differ from the field name; the extra description sections and
+# the specification rows are spec keys
+FIELD_COLUMNS = {"product_details": ("product_details",), "specifications": ()}
+
+
+def parse_product_page(product_page, product_details, fields_to_scrape):
+    """Add the selected detail fields found in a parsed product page to product_details."""
+    PRODUCT_PAGE_SPEC.plan(fields_to_scrape).run(product_page, product_details)
+
+
+
+def parse_listing_page(driver, fields_to_scrape):
+    """Return the product links of the current result page."""
+    listing = []
+
+    wait_until(driver, SEARCH_RESULTS_READY, "myntra search results")
+    data = driver.page_source  # Get the entire page source
+    soup = make_soup(data)
+
+    # Extract individual products
+    product_sections = soup.find("ul", class_="results-base")
+    product_list = product_sections.find_all("li", attrs={"id": True})
+
+    for product in product_list:
+        product_details = {}
+
+        # Extract link internally (for navigation)
+        try:
+            link = product.find("a", target="_blank")["href"]
+            product_details['link'] = f"https://www.myntra.com/{link}"
+
+        except Exception:
+            product_details['link'] = None
+
+        # Keep the product for the detail page visits
+        listing.append(product_details)
+
+    return listing
+
+
+def go_to_next_page(driver, page_number):
+    """Click "Next" and wait for page_number; returns False on the last page."""
+    try:
+        # The listing browser never leaves the result page, so one click on "Next" is enough
+        next_button = wait_until(driver, NEXT_PAGE_BUTTON, "myntra next button")
+        if next_button is None:
+            return False
+        next_button.click()
+
+        # Wait until the pagination text shows the new page (e.g., Page 3 of 40)
+        wait_until(driver, EC.text_to_be_present_in_element(
+            (By.CSS_SELECTOR, "ul.pagination-container > li.pagination-paginationMeta"),
+            f"Page {page_number} of"), "myntra next page")
+        output_queue.put(f"Scraping Page {page_number}...")
+        return True
+
+    except Exception as e:
+        output_queue.put(f"Error clicking next button: {e}")
+        return False
+
+
+
+def results_url(search_term):
+    """Result page URL of a search term, for scrapes that do not use the search box."""
+    return f"https://www.myntra.com/{'-'.join(search_term.lower().split())}?rawQuery={quote(search_term)}"
+
+
+async def myntra_scrape(query=None):
+    """
+    Scrapes Myntra search results, asking the user on the terminal for the search and options.
+
+    :param query: ScrapeQuery to run without prompts instead
+    :return: Summary of the saved files, None if the scrape did not complete
+    """
     prevent_sleep()
-    global original_price, discounted_price
     # Set up the driver
-    driver = webdriver.Chrome()
+    driver = await driver_pool.acquire()
 
     try:
-        # Open Myntra homepage
-        driver.get("https://www.myntra.com/")
-        time.sleep(5)  # Allow time for the page to load
-
-        output_queue.put("Please type your search query directly into the Myntra search box and press Enter.")
-        output_queue.put("Once the search results have loaded, type 'ok' to proceed.")
-        reply = input_queue.get().strip().lower() # Wait for user confirmation
-        if reply != 'ok':
-            output_queue.put("Scraping canceled by the user.")
-            driver.quit()
-            exit()
+        if query is not None:
+            # Open the search results directly
+            await run_blocking(driver.get, results_url(query.search_term))
+            await run_blocking(wait_until, driver, SEARCH_RESULTS_READY, "myntra search results")
+        else:
+            # Open Myntra homepage
+            await run_blocking(driver.get, "https://www.myntra.com/")
+            await run_blocking(wait_until, driver, HOME_PAGE_READY, "myntra home page")  # Wait for the search box
+
+            output_queue.put("Please type your search query directly into the Myntra search box and press Enter.")
+            output_queue.put("Once the search results have loaded, type 'ok' to proceed.")
+            reply = (await read_input()).strip().lower() # Wait for user confirmation
+            if reply != 'ok':
+                output_queue.put("Scraping canceled by the user.")
+                return
             
 
         # Extract the search term from the current URL
-        search_url = driver.current_url
+        search_url = await run_blocking(getattr, driver, 'current_url')
         if "/" not in search_url:
             raise ValueError("Search term not found in URL. Please try again.")
 
@@ -73,13 +316,13 @@ def myntra_scrape():
         search_term = search_term[:30]  # Truncate search term to avoid long filenames
 
         # Confirm the scraping process with the user
-        output_queue.put(
-                f"Do you want to scrape data for the search term '{search_term.replace('_', ' ')}'? (yes/no): ")
-        proceed = input_queue.get().strip().lower()
-        if proceed != 'yes':
-            output_queue.put("Scraping canceled by the user.")
-            driver.quit()
-            exit()
+        if query is None:
+            output_queue.put(
+                    f"Do you want to scrape data for the search term '{search_term.replace('_', ' ')}'? (yes/no): ")
+            proceed = (await read_input()).strip().lower()
+            if proceed != 'yes':
+                output_queue.put("Scraping canceled by the user.")
+                return
 
         # Ask the user what fields they want to scrape
         available_fields = {
@@ -97,423 +340,120 @@ def myntra_scrape():
             "12": "specifications"
         }
 
-        output_queue.put("\n")
-        output_queue.put("Available fields to scrape:")
-        for key, value in available_fields.items():
-            output_queue.put(f"{key}. {value}")
+        if query is not None:
+            fields_to_scrape = query.select_fields(available_fields)
+        else:
+            output_queue.put("\n")
+            output_queue.put("Available fields to scrape:")
+            for key, value in available_fields.items():
+                output_queue.put(f"{key}. {value}")
 
-        output_queue.put("\n")
-        output_queue.put("Enter the numbers corresponding to the fields you want to scrape, separated by commas: ")
-        selected_fields = input_queue.get()
-        selected_fields = selected_fields.split(",")
+            output_queue.put("\n")
+            output_queue.put("Enter the numbers corresponding to the fields you want to scrape, separated by commas: ")
+            selected_fields = (await read_input())
+            selected_fields = selected_fields.split(",")
 
-        fields_to_scrape = [available_fields[field.strip()] for field in selected_fields if
-                            field.strip() in available_fields]
+            fields_to_scrape = [available_fields[field.strip()] for field in selected_fields if
+                                field.strip() in available_fields]
 
         if not fields_to_scrape:
             output_queue.put("No valid fields selected. Exiting.")
-            driver.quit()
-            exit()
+            return
 
         output_queue.put(f"Fields selected for scraping: {fields_to_scrape}")
 
         # Extract the maximum number of pages dynamically
         try:
-            max_pages_elem = driver.find_element(By.CSS_SELECTOR,
-                                                 "ul.pagination-container > li.pagination-paginationMeta")
-            max_pages_text = max_pages_elem.text.strip()
+            max_pages_elem = await run_blocking(driver.find_element, By.CSS_SELECTOR,
+                                                "ul.pagination-container > li.pagination-paginationMeta")
+            max_pages_text = (await run_blocking(getattr, max_pages_elem, 'text')).strip()
             # Use regex to extract the last number from the text, removing commas
             max_pages = int(re.findall(r'\d+', max_pages_text.replace(",", ""))[-1])
         except Exception as e:
             max_pages = 1
 
-        # Ask the user how many pages they want to scrape
-        output_queue.put("\n")
-        output_queue.put(f"How many pages do you want to scrape? (1-{max_pages}): ")
-        pages_to_scrape = int(input_queue.get().strip())
-        if pages_to_scrape < 1 or pages_to_scrape > max_pages:
-            output_queue.put(
-                f"Flipkart displays only {max_pages} pages for a keyword. Please provide a page number between 1 and {max_pages}.")
-            driver.quit()
-            exit()
+        if query is not None:
+            pages_to_scrape = query.limit(query.max_pages, max_pages)
+        else:
+            # Ask the user how many pages they want to scrape
+            output_queue.put("\n")
+            output_queue.put(f"How many pages do you want to scrape? (1-{max_pages}): ")
+            pages_to_scrape = int((await read_input()).strip())
+            if pages_to_scrape < 1 or pages_to_scrape > max_pages:
+                output_queue.put(
+                    f"Flipkart displays only {max_pages} pages for a keyword. Please provide a page number between 1 and {max_pages}.")
+                return
 
         output_queue.put(f"Scraping data for {pages_to_scrape} pages...")
 
 
-        product_count = 0
-        current_page = 1  # Track the current page
-
-        while current_page <= pages_to_scrape:
-            time.sleep(5)
-            current_page_url = driver.current_url  # Store the current page URL
-            data = driver.page_source  # Get the entire page source
-            soup = bs(data, 'html.parser')
-
-            # Extract individual products
-            product_sections = soup.find("ul", class_="results-base")
-            product_list = product_sections.find_all("li", attrs={"id": True})
-
-            for product in product_list:
-                product_details = {}
-
-                # Extract link internally (for navigation)
-                try:
-                    link = product.find("a", target="_blank")["href"]
-                    product_details['link'] = f"https://www.myntra.com/{link}"
-
-                except Exception:
-                    product_details['link'] = None
-
-                # --- FIXED LOGIC: Always keep the link internally for navigation ---
-                navigate_link = product_details.get('link')  # Store the link for navigation
-
-                # Visit the product link to extract additional details
-                if navigate_link:
-                    driver.get(navigate_link)
-                    time.sleep(3)
-                    product_page = bs(driver.page_source, 'html.parser')
-
-                    # Extract image url
-                    if "image_url" in fields_to_scrape:
-                        try:
-                            # Locate the first <div class="image-grid-col50"> inside <div class="image-grid-container common-clearfix">
-                            image_grid_container = product_page.find("div",
-                                                                     class_="image-grid-container common-clearfix")
-                            if image_grid_container:
-                                first_image_div = image_grid_container.find("div", class_="image-grid-col50")
-                                if first_image_div:
-                                    # Extract the style attribute
-                                    style_attr = first_image_div.find("div", class_="image-grid-image").get("style")
-                                    if style_attr:
-                                        # Use regex to extract the URL from the style attribute
-                                        match = re.search(r'url\("([^"]+\.(jpg|jpeg))"\)', style_attr)
-                                        if match:
-                                            image_url = match.group(1)  # Extracted URL
-                                            product_details['image_url'] = image_url
-                                            output_queue.put(f"Found image URL: {image_url}")
-                                        else:
-                                            product_details['image_url'] = None
-                                            output_queue.put("No URL found in style attribute.")
-                                    else:
-                                        product_details['image_url'] = None
-                                        output_queue.put("No style attribute found.")
-                                else:
-                                    product_details['image_url'] = None
-                                    output_queue.put("No <div class='image-grid-col50'> found.")
-                            else:
-                                product_details['image_url'] = None
-                                output_queue.put("No <div class='image-grid-container common-clearfix'> found.")
-                        except Exception as e:
-                            product_details['image_url'] = None
-                            output_queue.put(f"Error extracting image URL: {e}")
-
-
-                    # Extract product title
-                    if "title" in fields_to_scrape:
-                        try:
-                            title = product_page.find("h1", class_="pdp-name").get_text(strip=True).replace("\xa0", " ")
-                            output_queue.put(f"Found title: {title}")
-                            product_details['title'] = title
-                        except Exception:
-                            product_details['title'] = None
-
-                    # Extract pricing and discount information
-                    if "discounted_price" in fields_to_scrape:
-                        try:
-                            discounted_price_text = product_page.find("span", class_="pdp-price").get_text(strip=True)
-                            discounted_price_string = discounted_price_text.split(" ")[-1].replace("₹", "").strip()
-                            discounted_price = int(discounted_price_string)      # convert string to float
-                            output_queue.put(f"Found discounted price: {discounted_price}")
-                            product_details['discounted_price'] = discounted_price
-                        except Exception:
-                            product_details['discounted_price'] = None
-
-                    if "original_price" in fields_to_scrape:
-                        try:
-                            original_price_text = product_page.find("span", class_="pdp-mrp").find("s").get_text(strip=True)
-                            original_price_string = original_price_text.replace("₹", "").strip()
-                            original_price = int(original_price_string)       # convert string to float
-                            output_queue.put(f"Found original price: {original_price}")
-                            product_details['original_price'] = original_price
-                        except Exception:
-                            output_queue.put("Original Price is same as Discounted Price.")
-                            if "discounted_price" in fields_to_scrape:
-                                product_details['original_price'] = product_details['discounted_price']
-                            else:
-                                discounted_price_text = product_page.find("span", class_="pdp-price").get_text(strip=True)
-                                if discounted_price_text:
-                                    discounted_price_string = discounted_price_text.split(" ")[-1].replace("₹", "").strip()
-                                    discounted_price = int(discounted_price_string)
-                                    output_queue.put(f"Found original Price: {discounted_price}")
-                                    product_details['original_price'] = discounted_price
-                                else:
-                                    product_details['original_price'] = None
-
-                    if "discount_percentage" in fields_to_scrape:
-                        try:
-                            discount_percentage_text = product_page.find("span", class_="pdp-discount").get_text()
-
-                            # Condition to handle "Rs." instead of a percentage
-                            if "Rs." in discount_percentage_text:
-                                try:
-                                    # Calculate discount percentage
-                                    discount_percentage = round(((original_price - discounted_price) / original_price) * 100)
-
-                                except Exception as e:
-                                    output_queue.put(f"Error calculating discount percentage: {e}")
-                                    discount_percentage = 0        # Assign 0 as integer for consistent formatting
-                                    product_details['discount_percentage'] = f"{discount_percentage}%"
-
-                            else:
-                                # Extract percentage directly if available
-                                discount_percentage = int(discount_percentage_text.split(" ")[0].replace("(", "").replace("%", "").strip())
-
-                            product_details['discount_percentage'] = f"{discount_percentage}%"
-                            output_queue.put(f"Final discount percentage: {product_details['discount_percentage']}")
-
-                        except Exception:
-                            output_queue.put(f"Discount % is 0")
-                            discount_percentage = 0
-                            product_details['discount_percentage'] = f"{discount_percentage}%"
-
-
-                    # Extract rating and reviews
-                    if "rating" in fields_to_scrape:
-                        try:
-                            rating_text = product_page.find("div", class_="index-overallRating").get_text()
-                            rating = rating_text.split("|")[0].strip()
-                            output_queue.put(f"Found rating: {rating}")
-                            product_details['rating'] = rating
-                        except Exception:
-                            product_details['rating'] = None
-
-                    if "reviews_count" in fields_to_scrape:
-                        try:
-                            review_count_text = product_page.find("div", class_="index-ratingsCount").get_text()
-                            # Check if the count contains 'k' (e.g., 16.2k)
-                            if 'k' in review_count_text:
-                                review_count_text = review_count_text.replace("Ratings", "").replace(",", "").strip()
-                                # Handle decimal cases like '16.2k'
-                                if '.' in review_count_text:
-                                    # Split the number, convert to float, and multiply by 1000
-                                    review_count = int(float(review_count_text.replace('k', '')) * 1000)
-                                else:
-                                    # Simple case (e.g., 4k -> 4000)
-                                    review_count = int(review_count_text.replace('k', '')) * 1000
-                            else:
-                                # If no 'k' is present, just extract the number
-                                review_count = int(review_count_text.replace("Ratings", "").replace(",", "").strip())
-
-                            output_queue.put(f"Found reviews count: {review_count}")
-                            product_details['reviews_count'] = review_count
-                        except Exception:
-                            product_details['reviews_count'] = None
-
-                    # Extract brand's name
-                    if "brand_name" in fields_to_scrape:
-                        try:
-                            brand_name = product_page.find("h1", class_="pdp-title").get_text(strip=True)
-                            output_queue.put(f"Found brand_name: {brand_name}")
-                            product_details['brand_name'] = brand_name
-                        except Exception:
-                            product_details['brand_name'] = None
-
-                    # Extract seller's name
-                    if "seller_name" in fields_to_scrape:
-                        try:
-                            seller_name = product_page.find("span", class_="supplier-productSellerName").get_text(
-                                strip=True)
-                            output_queue.put(f"Found seller_name: {seller_name}")
-                            product_details['seller_name'] = seller_name
-                        except Exception:
-                            product_details['seller_name'] = None
-
-                    # Extract product_details available on the product page
-                    if "product_details" in fields_to_scrape:
-                        try:
-                            # Find the product description paragraph
-                            product_det_tag = product_page.find("p", class_="pdp-product-description-content")
-                            if product_det_tag:
-                                # Replace <br> tags with newline characters
-                                for br in product_det_tag.find_all("br"):
-                                    br.insert_after("\n")  # Insert a newline after each <br>
-                                    br.decompose()  # Remove the <br> tag itself
-
-                                # Get the text without collapsing spaces
-                                product_det = product_det_tag.get_text(separator=" ").replace("\xa0", " ").strip()
-                                output_queue.put("Found product_details")
-                                product_details['product_details'] = product_det
-                            else:
-                                product_details['product_details'] = None
-
-                            # Check for additional details in <div class="pdp-sizeFitDesc">
-                            size_fit_desc_divs = product_page.find_all("div", class_="pdp-sizeFitDesc")
-                            for div in size_fit_desc_divs:
-                                try:
-                                    # Extract key from <h4> and value from <p>
-                                    key_tag = div.find("h4",
-                                                       class_="pdp-sizeFitDescTitle pdp-product-description-title")
-                                    value_tag = div.find("p",
-                                                         class_="pdp-sizeFitDescContent pdp-product-description-content")
-
-                                    if key_tag and value_tag:
-                                        # Replace <br> tags in value with newline characters
-                                        for br in value_tag.find_all("br"):
-                                            br.insert_after("\n")  # Insert a newline after each <br>
-                                            br.decompose()  # Remove the <br> tag itself
-
-                                        key = key_tag.get_text(strip=True)
-                                        value = value_tag.get_text(separator=" ").replace("\xa0", " ").strip()
-
-                                        # Add key-value pair directly to product_details dictionary
-                                        product_details[key] = value
-                                        output_queue.put(f"{key}: {value}")
-                                except Exception as e:
-                                    output_queue.put(f"Error processing additional detail div: {e}")
-                                    continue  # Skip this div if there's an issue
-
-                        except Exception as e:
-                            output_queue.put(f"Error extracting product details: {e}")
-                            product_details['product_details'] = None
-
-                    # Extract additional product specifications from the product page
-                    if "specifications" in fields_to_scrape:
-                        try:
-                            # Locate and click the "show more" button, if available
-                            show_more_button = product_page.find("div", class_="index-showMoreText")
-                            if show_more_button:
-                                try:
-                                    # Use Selenium to click on the button
-                                    button_element = driver.find_element(By.CSS_SELECTOR, "div.index-showMoreText")
-                                    driver.execute_script("arguments[0].click();",
-                                                          button_element)  # Ensure the click happens
-                                    time.sleep(2)  # Allow time for the second table to load
-
-                                    # Wait explicitly for the second table to appear
-                                    WebDriverWait(driver, 10).until(
-                                        EC.presence_of_element_located(
-                                            (By.CSS_SELECTOR, "div.index-sizeFitDesc > div > div.index-tableContainer"))
-                                    )
-                                except Exception as e:
-                                    output_queue.put(f"Error clicking 'show more' button: {e}")
-
-                            # Re-fetch the updated page source to include dynamically loaded content
-                            product_page = bs(driver.page_source, 'html.parser')
-
-                            # Locate the sizeFitDesc container
-                            product_info_div = product_page.find("div", class_="index-sizeFitDesc")
-                            if product_info_div:
-                                # Find all table containers (before and after clicking "show more")
-                                tables = product_info_div.find_all("div", class_="index-tableContainer")
-                                for table in tables:
-                                    # Extract rows from each table
-                                    rows = table.find_all("div", class_="index-row")
-                                    for row in rows:
-                                        key_div = row.find("div", class_="index-rowKey")
-                                        value_div = row.find("div", class_="index-rowValue")
-
-                                        if key_div and value_div:
-                                            # Extract key and value text
-                                            key = key_div.get_text(strip=True).replace("\xa0", " ")
-                                            value = value_div.get_text(strip=True).replace("\xa0", " ")
-                                            product_details[key] = value
-                                            output_queue.put(f"{key}: {value}")
-
-                        except Exception as e:
-                            output_queue.put(f"Error in extracting specifications: {e}")
-
-                    # driver.get(current_page_url)    # This reloading of main page after every product is removed in our code because on myntra each page's url is exactly same and thus is causing problem in extraction and traversal.
-                    time.sleep(2)
-
-                # Add the link to the output only if the user selected it
-                if "link" not in fields_to_scrape:
-                    product_details.pop('link', None)
-
-
-                all_product_details.append(product_details)
-                product_count += 1
-                output_queue.put(f"{product_count} products scraped.")
-
-
-            # Move to the next page if necessary
-            if current_page < pages_to_scrape:
-                try:
-                    # We are heading back to the current page url after extracting all products of that page is because all the pages url are same and going back after each product extraction will take us to the 1st page instead of current page.
-                    # Reload the main page after processing product details
-                    driver.get(current_page_url)
-                    time.sleep(3)  # Allow sufficient time for the page to reload
-
-                    current_page += 1
-
-                    # Handle pagination by comparing current page to pagination meta text
-                    while True:
-                        try:
-                            # Locate the pagination text to compare with the current page
-                            pagination_meta = driver.find_element(By.CSS_SELECTOR,
-                                                                  "ul.pagination-container > li.pagination-paginationMeta").text.strip()
-                            output_queue.put(f"Pagination Meta: {pagination_meta}")
-
-                            # Extract current page number from the text (e.g., Page 3 of 40)
-                            current_page_text = int(re.findall(r'Page (\d+) of', pagination_meta)[0])
-
-                            # If the current page matches the expected page, break the loop and scrape
-                            if current_page_text == current_page:
-                                output_queue.put(f"Scraping Page {current_page}...")
-                                break
-                            else:
-                                # Click the "Next" button if the current page doesn't match
-                                next_button = WebDriverWait(driver, 10).until(
-                                    EC.element_to_be_clickable(
-                                        (By.CSS_SELECTOR, "ul.pagination-container > li.pagination-next"))
-                                )
-                                next_button.click()
-                                time.sleep(3)  # Allow the next page to load
-
-                        except Exception as e:
-                            output_queue.put(f"Error during pagination handling: {e}")
-                            break
-
-                except Exception as e:
-                    output_queue.put(f"Error clicking next button: {e}")
-                    break
-
-            else:
-                break
-
-        # Save scraped data to a file
+        # Progress is saved to a checkpoint the scrape can be resumed from
+        checkpoint = await open_checkpoint(query or ScrapeQuery("myntra", search_term, fields_to_scrape, max_pages=pages_to_scrape),
+                                           ask=query is None)
+
+        # Products are appended to a JSONL file as they are scraped; a resumed scrape continues its file
+        if checkpoint.timestamp is None:
+            checkpoint.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         platform = "myntra"
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = checkpoint.timestamp
         filename = f"{platform}_{search_term}_{timestamp}"
-        
-        # Create filenames with respective extensions
+        results = JsonlWriter(f"{filename}.jsonl")
+        words = TitleWords(search_term)  # Word cloud counts, taken as the products are scraped
+
+        crawler = Crawler(fields_to_scrape, extract_product_details, checkpoint=checkpoint, platform=platform,
+                          field_columns=FIELD_COLUMNS)
+
+        # Phase one: walk the result pages without leaving the listing
+        listing = await crawler.collect_listing(driver, parse_listing_page, go_to_next_page, max_pages=pages_to_scrape)
+
+        # Phase two: visit the product pages concurrently, the idle listing browser is one of the browsers
+        await crawler.visit_products(listing, drivers=[driver], results=results,
+                                     store=product_store.batch(platform, search_term, run=filename), words=words)
+
+        # Export the JSON, CSV and Parquet files by streaming the JSONL file
+        jsonl_filename = results.filename
         json_filename = f"{filename}.json"
         csv_filename = f"{filename}.csv"
+        parquet_filename = f"{filename}.parquet"
 
-        # Pass filenames to file_handler functions
-        save_scraped_data(all_product_details, json_filename)
-        convert_to_csv(all_product_details, csv_filename)
+        records = JsonlRecords(jsonl_filename)
+        fixed_columns = output_columns(fields_to_scrape, FIELD_COLUMNS)  # Not counted as spec columns
+        await run_blocking(save_scraped_data, records, json_filename)
+        await run_blocking(convert_to_csv, records, csv_filename, fixed_columns=fixed_columns)
+        if not await run_blocking(save_parquet, records, parquet_filename, fixed_columns=fixed_columns):
+            output_queue.put("Parquet export skipped: pyarrow is not installed.")
+            parquet_filename = None
+        await run_blocking(checkpoint.remove)
 
         output_queue.put("\n")
         output_queue.put(f"Scraping completed! Data saved to '{filename}'.")
-        output_queue.put(f"Total products scraped: {len(all_product_details)}")
+        output_queue.put(f"Total products scraped: {crawler.completed}")
+        output_queue.put(format_wait_stats())
+        output_queue.put(format_cache_stats())
         
         
         # Generate visuals
-        visuals, zip_filename = generate_visualizations(all_product_details, search_term, timestamp)
+        visuals, zip_filename = await run_blocking(generate_visualizations, records, search_term, timestamp, words)
         
         
-        # Step 6: Notify frontend
-        output_queue.put(json.dumps({
+        summary = {
             "type": "scrape_complete",
             "filenames": {
+                "jsonl": jsonl_filename,
                 "json": json_filename,
                 "csv": csv_filename,
+                "parquet": parquet_filename,
                 "visualizations": visuals,
                 "zip": zip_filename
             },
             "search_term": search_term,
-            "timestamp": timestamp
-        }))
+            "timestamp": timestamp,
+            "products_scraped": crawler.completed
+        }
+
+        # Step 6: Notify frontend
+        output_queue.put(json.dumps(summary))
+        return summary
 
 
     except Exception as e:
@@ -521,4 +461,4 @@ def myntra_scrape():
 
     finally:
         allow_sleep()
-        driver.quit()
+        await driver_pool.release(driver)
@@ -0,0 +1,36 @@
+# tests/test_product_store.py
+from utils.product_store import ProductStore
+
+
+LINK = "https://www.amazon.in/Shoe/dp/B000000001/ref=sr_1_1"
+
+
+def store_with_runs(tmp_path, previous_price, price):
+    """A store with two runs of the same search, one product priced previous_price and then price."""
+    store = ProductStore(tmp_path / "products.sqlite3")
+    store.upsert("amazon", [{"link": LINK, "discounted_price": previous_price}], "shoes", scraped_at=1, run="first")
+    store.upsert("amazon", [{"link": LINK, "discounted_price": price}], "shoes", scraped_at=2, run="second")
+    return store
+
+
+def test_run_diff_price_drop_without_rises(tmp_path):
+    diff = store_with_runs(tmp_path, "100", "90").run_diff("second")
+
+    assert diff["previous_run"] == "first"
+    assert diff["price_drops"] == [{"product_id": "B000000001", "price": 90.0, "price_previous": 100.0, "change": -10.0}]
+    assert diff["price_rises"] == []
+    assert diff["new"] == [] and diff["delisted"] == []
+
+
+def test_run_diff_price_rise_without_drops(tmp_path):
+    diff = store_with_runs(tmp_path, "90", "100").run_diff("second")
+
+    assert diff["price_drops"] == []
+    assert diff["price_rises"] == [{"product_id": "B000000001", "price": 100.0, "price_previous": 90.0, "change": 10.0}]
+
+
+def test_run_diff_null_prices(tmp_path):
+    diff = store_with_runs(tmp_path, None, None).run_diff("second")
+
+    assert diff["price_drops"] == []
+    assert diff["price_rises"] == []
\ No newline at end of file
@@ -0,0 +1,161 @@
+# utils/batch.py
+import json
+import time
+from config import Config
+from utils.terminal import output_queue
+
+
+# Platforms the workers can run, each one scrapers/<platform>_scraper.py with a <platform>_scrape coroutine
+PLATFORMS = ("amazon", "flipkart", "myntra", "ajio")
+
+class ScrapeQuery:
+    """
+    Parameters of a scrape that runs without prompts: the scraper opens the search URL itself
+    instead of waiting for the user to search, and takes the fields and page count from here.
+    """
+
+    def __init__(self, platform, search_term, fields, max_pages=None, max_items=None, resume=False, refresh=False):
+        """
+        :param platform: Name of the platform, one of PLATFORMS
+        :param search_term: Text to search for
+        :param fields: Names of the fields to scrape, e.g. ['title', 'discounted_price']
+        :param max_pages: Result pages to walk (all available pages by default)
+        :param max_items: Products to scrape on infinite-scroll listings like Ajio (all available by default)
+        :param resume: Continue from the checkpoint of the same scrape instead of starting over
+        :param refresh: Only re-fetch the prices, rating and reviews of the products stored for this search
+                        and save the ones that changed (fields then default to all of those)
+        """
+        if not platform:
+            raise ValueError("A platform is required")
+        if platform not in PLATFORMS:
+            raise ValueError(f"Invalid platform: {platform}")
+        if not search_term or not search_term.strip():
+            raise ValueError("A search term is required")
+        if not fields and not refresh:
+            raise ValueError("At least one field is required")
+        for name, limit in (("max_pages", max_pages), ("max_items", max_items)):
+            if limit is not None and (not isinstance(limit, int) or limit < 1):
+                raise ValueError(f"{name} must be a positive integer")
+
+        self.platform = platform
+        self.search_term = search_term.strip()
+        self.fields = list(fields)
+        self.max_pages = max_pages
+        self.max_items = max_items
+        self.resume = resume
+        self.refresh = refresh
+
+    @classmethod
+    def from_dict(cls, data, defaults=None):
+        """
+        Builds a query from its JSON form; fields may be a list or a comma-separated string.
+
+        :param data: Dict with platform, search_term, fields and optionally max_pages, max_items, resume and refresh
+        :param defaults: Values used for the keys missing from data
+        :return: ScrapeQuery
+        """
+        data = dict(defaults or {}, **data)
+        fields = data.get("fields") or []
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(",") if field.strip()]
+        return cls(data.get("platform"), data.get("search_term") or "", fields,
+                   max_pages=data.get("max_pages"), max_items=data.get("max_items"), resume=bool(data.get("resume")),
+                   refresh=bool(data.get("refresh")))
+
+    def to_dict(self):
+        return {
+            "platform": self.platform,
+            "search_term": self.search_term,
+            "fields": self.fields,
+            "max_pages": self.max_pages,
+            "max_items": self.max_items,
+            "resume": self.resume,
+            "refresh": self.refresh,
+        }
+
+    def select_fields(self, available_fields):
+        """
+        Returns the requested fields the scraper supports, in the scraper's order.
+
+        :param available_fields: The scraper's menu of number -> field name
+        :return: List of field names
+        """
+        unknown = [field for field in self.fields if field not in available_fields.values()]
+        if unknown:
+            output_queue.put(f"Ignoring unknown fields: {', '.join(unknown)}")
+        return [field for field in available_fields.values() if field in self.fields]
+
+    def limit(self, requested, available):
+        """Caps the requested page or item count at what the listing offers (everything by default)."""
+        if not available:  # The listing did not show its size
+            return requested
+        if requested is None or requested > available:
+            return available
+        return requested
+
+
+def read_queries(path, defaults=None):
+    """
+    Reads a batch file: one query per line, either a JSON object (see ScrapeQuery.from_dict) or
+    a plain search term using the defaults. Blank lines and lines starting with # are skipped.
+    Every line is checked before any query runs.
+
+    :param path: Path of the batch file
+    :param defaults: Platform, fields and limits for the keys a line does not set
+    :return: List of ScrapeQuery
+    :raises ValueError: Listing every invalid line with its line number
+    """
+    queries = []
+    errors = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                data = json.loads(line) if line.startswith("{") else {"search_term": line}
+                queries.append(ScrapeQuery.from_dict(data, defaults))
+            except (ValueError, TypeError) as e:  # Malformed JSON is a ValueError too
+                errors.append(f"{path}, line {line_number}: {e}")
+    if errors:
+        raise ValueError("\n".join(errors))
+    return queries
+
+
+def run_batch(queries, start, concurrency=None, echo=print, poll_interval=0.2):
+    """
+    Runs the queries as jobs, at most concurrency at once, and echoes their terminal output.
+
+    :param queries: List of ScrapeQuery
+    :param start: Function(query) that starts a job for the query and returns it
+    :param concurrency: Jobs running at once (defaults to Config.BATCH_CONCURRENCY)
+    :param echo: Function receiving every output line, prefixed with the query it belongs to
+    :param poll_interval: Seconds between two checks of the running jobs
+    :return: The jobs, in query order
+    """
+    concurrency = concurrency or Config.BATCH_CONCURRENCY
+    # A query that cannot start must not stop the batch after some of its jobs started
+    invalid = sorted({str(query.platform) for query in queries if query.platform not in PLATFORMS})
+    if invalid:
+        raise ValueError(f"Invalid platform: {', '.join(invalid)}")
+    pending = list(queries)
+    started = []
+    running = []
+
+    while pending or running:
+        while pending and len(running) < concurrency:
+            query = pending.pop(0)
+            job = start(query)
+            started.append(job)
+            running.append((query, job))
+
+        for query, job in list(running):
+            while not job.events.empty():
+                event = job.events.get()
+                if event is None:  # The job finished
+                    running.remove((query, job))
+                    break
+                echo(f"[{query.platform}: {query.search_term}] {event}")
+        time.sleep(poll_interval)
+
+    return started
@@ -0,0 +1,77 @@
+# utils/browser.py
+from pathlib import Path
+from selenium import webdriver
+from config import Config
+
+
+# Requests the scrapers never need: fonts, media, analytics and ads
+BLOCKED_URL_PATTERNS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.gif",
+    "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*", "*doubleclick.net*",
+    "*facebook.net*", "*connect.facebook.com*", "*amazon-adsystem.com*", "*fls-eu.amazon*", "*unagi.amazon*",
+    "*hotjar.com*", "*clarity.ms*", "*criteo.com*", "*criteo.net*", "*scorecardresearch.com*",
+    "*branch.io*", "*moengage.com*", "*newrelic.com*", "*nr-data.net*", "*sentry.io*",
+]
+
+# Stylesheets are only blocked in the product page browsers; the listing browser is the one the user searches in
+STYLESHEET_PATTERNS = ["*.css"]
+
+
+def browser_options(arguments=()):
+    """
+    Chrome options shared by all scrapers.
+
+    Pages load with the 'eager' strategy (driver.get returns at DOMContentLoaded; the scrapers wait for
+    the elements they need) and, with Config.BLOCK_RESOURCES, without images. Image URLs stay readable
+    from the src/data-src/style attributes.
+
+    :param arguments: Extra command-line switches, e.g. '--start-maximized'
+    :return: ChromeOptions
+    """
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = 'eager'
+    if Config.BLOCK_RESOURCES:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    for argument in arguments:
+        options.add_argument(argument)
+    return options
+
+
+def block_resources(driver, block_stylesheets=False):
+    """Blocks the requests matching BLOCKED_URL_PATTERNS (and stylesheets) through the DevTools protocol."""
+    patterns = BLOCKED_URL_PATTERNS + (STYLESHEET_PATTERNS if block_stylesheets else [])
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+class Browser(webdriver.Chrome):
+    """Chrome WebDriver that counts its page loads, so the driver pool can recycle worn sessions."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.navigations = 0
+
+    def get(self, url):
+        self.navigations += 1
+        super().get(url)
+
+
+def new_driver(arguments=(), block_stylesheets=False, user_data_dir=None):
+    """
+    Starts Chrome with the shared browser profile.
+
+    :param arguments: Extra command-line switches
+    :param block_stylesheets: Also skip CSS (for browsers nobody looks at)
+    :param user_data_dir: Persistent profile directory (cookies, disk cache) to start Chrome with;
+                          a fresh temporary profile when None
+    :return: WebDriver
+    """
+    arguments = list(arguments)
+    if user_data_dir is not None:
+        Path(user_data_dir).mkdir(parents=True, exist_ok=True)
+        arguments += [f"--user-data-dir={user_data_dir}", f"--disk-cache-dir={Path(user_data_dir) / 'cache'}"]
+    driver = Browser(options=browser_options(arguments))
+    if Config.BLOCK_RESOURCES:
+        block_resources(driver, block_stylesheets)
+    return driver
@@ -0,0 +1,170 @@
+# utils/charts.py
+# Drawing functions of the charts; imported on the first chart rendered, as they pull in the plotting libraries
+import pandas as pd
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Set Agg backend to avoid GUI issues
+from matplotlib.figure import Figure
+import seaborn as sns
+from wordcloud import WordCloud
+
+
+# Charts are drawn on their own Figure objects instead of the global pyplot state, so they can be
+# rendered side by side
+
+# 1. Word Cloud of the words in 'title' (df has the 'word' and 'count' columns of TitleWords.frequencies)
+def generate_wordcloud(df, path):
+    if df.empty:
+        print("Skipping wordcloud chart: No valid titles found.")
+        return False
+
+    frequencies = dict(zip(df['word'], df['count']))
+    wordcloud = WordCloud(width=1000, height=800, background_color="white").generate_from_frequencies(frequencies)
+
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
+    ax.imshow(wordcloud, interpolation="bilinear")
+    ax.axis("off")
+    ax.set_title("Most Frequent Words in Product Titles", fontsize=20, pad=40)
+    fig.tight_layout()  # Adjust layout to prevent cutoff
+    fig.savefig(path, dpi=100)
+    return True
+
+# 2. Price Distribution Histogram (Dynamic Bins)
+def plot_price_distribution(df, path):
+    df['discounted_price'] = pd.to_numeric(df['discounted_price'], errors='coerce')
+
+    # Calculate min and max dynamically
+    min_price = df['discounted_price'].min()
+    max_price = df['discounted_price'].max()
+
+    if pd.isna(min_price) or pd.isna(max_price) or min_price == max_price:
+        print("Insufficient price data to generate distribution.")
+        return False
+
+    # Automatically determine bin count (10 bins or adjust based on spread)
+    bin_count = 10  # Default
+    price_range = max_price - min_price
+
+    if price_range > 20000:
+        bin_count = 20  # More bins for wide price ranges
+    elif price_range < 5000:
+        bin_count = 8  # Fewer bins for narrow ranges
+
+    bin_size = (max_price - min_price) / bin_count
+    bins = [min_price + i * bin_size for i in range(bin_count + 1)]
+    labels = [f"{int(bins[i])}-{int(bins[i + 1])}" for i in range(len(bins) - 1)]
+
+    # Create a price range column
+    df['price_range'] = pd.cut(df['discounted_price'], bins=bins, labels=labels, right=False)
+
+    # Plot histogram
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
+    df['price_range'].value_counts().sort_index().plot(kind='bar', color='skyblue', ax=ax)
+    ax.set_title("Price Distribution of Products", fontsize=20, pad=40)
+    ax.set_xlabel("Price Range (₹)", fontsize=16, labelpad=25)
+    ax.set_ylabel("Number of Products", fontsize=16, labelpad=25)
+    ax.tick_params(axis='x', labelrotation=45, labelsize=14)
+    ax.tick_params(axis='y', labelsize=14)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    fig.tight_layout()  # Adjust layout to prevent cutoff
+    fig.savefig(path)
+    return True
+
+# 3. Price vs Ratings Scatter Plot
+def plot_price_vs_ratings(df, path):
+    df['discounted_price'] = pd.to_numeric(df['discounted_price'], errors='coerce')
+    df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
+    ax.scatter(df['discounted_price'], df['rating'], c='blue', alpha=0.5)
+    ax.set_title("Price vs Ratings", fontsize=20, pad=40)
+    ax.set_xlabel("Discounted Price (₹)", fontsize=16, labelpad=25)
+    ax.set_ylabel("Ratings", fontsize=16, labelpad=25)
+    ax.tick_params(labelsize=14)
+    ax.grid(True)
+    fig.tight_layout()  # Adjust layout to prevent overlap
+    fig.savefig(path)
+    return True
+
+# 4. Top Brands by Reviews Count
+def plot_top_brands_by_reviews(df, path):
+    df['reviews_count'] = pd.to_numeric(df['reviews_count'], errors='coerce')
+
+    top_brands = df.groupby('brand_name')['reviews_count'].sum().sort_values(ascending=False).head(10)
+
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
+    top_brands.plot(kind='bar', color='orange', ax=ax)
+    ax.set_title("Top Brands by Total Reviews Count", fontsize=20, pad=40)
+    ax.set_xlabel("Brand Name", fontsize=16, labelpad=25)
+    ax.set_ylabel("Total Reviews", fontsize=16, labelpad=25)
+    ax.tick_params(axis='x', labelrotation=90, labelsize=14)
+    ax.tick_params(axis='y', labelsize=14)
+    fig.tight_layout()  # Adjust layout to prevent overlap and cutoff
+    fig.savefig(path)
+    return True
+
+# 5. Amazon Heatmap - Ratings vs Discount % (with Sales Gradient)
+def plot_heatmap(df, path):
+    df['discount_percentage'] = pd.to_numeric(df['discount_percentage'].str.replace('%', ''), errors='coerce')
+    df['last_month_sales'] = pd.to_numeric(df['last_month_sales'].str.replace('+', ''), errors='coerce').replace(0, np.nan)  # Convert 0 to NaN
+    df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+
+    # Sort values for better visualization
+    df = df.sort_values(by=['rating', 'discount_percentage'], ascending=[True, True])
+
+    # Replace missing 'last_month_sales' with NaN (no zeros)
+    df['last_month_sales'] = df['last_month_sales'].fillna(np.nan)
+
+    # Create pivot table (WITHOUT fill_value=0)
+    heatmap_data = df.pivot_table(index='rating', columns='discount_percentage', values='last_month_sales',
+                                  aggfunc='sum')
+
+    # Replace 0 values in the pivot table with NaN
+    heatmap_data = heatmap_data.replace(0, np.nan)
+
+    # Create a mask for missing values (includes NaN and 0)
+    mask = heatmap_data.isnull()
+
+    # Set base figure size and adjust if needed
+    base_fig_width, base_fig_height = 10, 8
+    fig_width_user = min(16, max(10, int(0.75 * heatmap_data.shape[1])))
+    fig_height_user = min(12, max(8, int(0.75 * heatmap_data.shape[0])))
+
+    # Cap the size at (10, 8) to maintain consistency
+    fig_width = min(base_fig_width, fig_width_user)
+    fig_height = min(base_fig_height, fig_height_user)
+
+    # Calculate font size based on box density
+    n_rows, n_cols = heatmap_data.shape
+    box_area = n_rows * n_cols
+    font_size = max(6, min(14, int(200 / (box_area if box_area > 0 else 1))))
+
+    fig = Figure(figsize=(fig_width, fig_height))
+    ax = fig.subplots()
+
+    # Draw heatmap
+    sns.heatmap(heatmap_data, cmap="viridis", fmt='.0f', annot=True, linewidths=0.5, linecolor='gray',
+                cbar_kws={'label': 'Last Month Sales'}, mask=mask, annot_kws={"size": font_size}, ax=ax)  # Reduce font size for annotations
+
+    # Get the color bar's axis and adjust label properties
+    cb_ax = fig.axes[-1]  # Last axis is the color bar
+    cb_ax.set_ylabel('Last Month Sales', fontsize=14, labelpad=15)  # Set font size and padding
+
+    ax.set_title("Sales Heatmap (Ratings vs Discount %)", fontsize=20, pad=40)
+    ax.set_xlabel("Discount Percentage", fontsize=16, labelpad=25)
+    ax.set_ylabel("Ratings", fontsize=16, labelpad=25)
+
+    # Rotate x-axis labels to prevent overlap
+    ax.tick_params(axis='x', labelrotation=45, labelsize=14)
+    ax.tick_params(axis='y', labelrotation=0, labelsize=14)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+
+    fig.tight_layout()  # Adjust layout to prevent overlap
+    fig.savefig(path)
+    return True
\ No newline at end of file
@@ -0,0 +1,174 @@
+# utils/checkpoint.py
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from config import Config
+from utils.terminal import output_queue, read_input
+
+
+class Checkpoint:
+    """
+    Progress of one scrape saved to a local file, so a crashed or cancelled scrape can be resumed.
+
+    Holds the query, the pagination cursor (page number and URL of the last result page walked),
+    the product links collected so far, the links of the products already scraped and the
+    timestamp of the run, which names the results file those products were appended to. The
+    crawler rewrites the file after every result page and whenever it flushes the results;
+    the scraper deletes it once the output files are saved.
+    """
+
+    def __init__(self, query, directory=None):
+        """
+        :param query: ScrapeQuery of the scrape; scrapes with the same platform, search term,
+                      fields and limits share a checkpoint
+        :param directory: Folder of the checkpoint files (defaults to Config.CHECKPOINT_DIR)
+        """
+        self.query = query
+        self.name = checkpoint_name(query)
+        self.path = Path(directory or Config.CHECKPOINT_DIR) / f"{self.name}.json"
+        self.page_number = 0
+        self.cursor = None
+        self.listing = []
+        self.listing_complete = False
+        self.completed = set()  # links of the products written to the results file
+        self.timestamp = None
+        self.unsaved = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def open(cls, query, resume=False, directory=None):
+        """
+        Returns the checkpoint of a scrape, loaded from its file when resuming.
+
+        :param query: ScrapeQuery of the scrape
+        :param resume: Continue from the saved progress; otherwise an old checkpoint is overwritten
+        :param directory: Folder of the checkpoint files
+        :return: Checkpoint
+        """
+        checkpoint = cls(query, directory)
+        if resume:
+            if checkpoint.path.exists():
+                checkpoint.load()
+                output_queue.put(f"Resuming from the checkpoint: {len(checkpoint.listing)} product links, "
+                                 f"{len(checkpoint.completed)} products scraped.")
+            else:
+                output_queue.put("No checkpoint to resume from, starting over.")
+        return checkpoint
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        self.page_number = state["page_number"]
+        self.cursor = state["cursor"]
+        self.listing = state["listing"]
+        self.listing_complete = state["listing_complete"]
+        self.completed = set(state["completed"])
+        self.timestamp = state["timestamp"]
+
+    def set_listing(self, listing, page_number, cursor, complete=False):
+        """Records the product links collected so far and the result page they were collected up to."""
+        self.listing = [dict(entry) for entry in listing]
+        self.page_number = page_number
+        self.cursor = cursor
+        self.listing_complete = complete
+
+    def record(self, link):
+        """
+        Marks a product as written to the results file.
+
+        :return: True when Config.CHECKPOINT_INTERVAL products were marked since the last save
+        """
+        self.completed.add(link)
+        self.unsaved += 1
+        return self.unsaved >= Config.CHECKPOINT_INTERVAL
+
+    def writer(self):
+        """
+        Takes a snapshot of the progress and returns the function that writes it to the file,
+        so the writing can run off the event loop. The file is replaced atomically.
+        """
+        state = {
+            "query": self.query.to_dict(),
+            "page_number": self.page_number,
+            "cursor": self.cursor,
+            "listing": list(self.listing),
+            "listing_complete": self.listing_complete,
+            "completed": list(self.completed),
+            "timestamp": self.timestamp,
+            "updated": time.time(),
+        }
+        self.unsaved = 0
+
+        def write():
+            with self.lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temporary = self.path.with_suffix(".tmp")
+                with open(temporary, "w", encoding="utf-8") as f:
+                    json.dump(state, f, ensure_ascii=False)
+                os.replace(temporary, self.path)
+        return write
+
+    def remove(self):
+        """Deletes the checkpoint file once the scrape's output is saved."""
+        with self.lock:
+            if self.path.exists():
+                self.path.unlink()
+
+
+async def open_checkpoint(query, ask=False):
+    """
+    Opens the checkpoint of a scrape.
+
+    :param query: ScrapeQuery of the scrape; query.resume continues from the saved progress
+    :param ask: Ask the user on the terminal whether to resume when a checkpoint exists
+    :return: Checkpoint
+    """
+    resume = query.resume
+    checkpoint = Checkpoint(query)
+    if ask and checkpoint.path.exists():
+        output_queue.put("An unfinished scrape of this search was saved. Resume it? (yes/no): ")
+        resume = (await read_input()).strip().lower() == 'yes'
+    return Checkpoint.open(query, resume=resume)
+
+
+def checkpoint_name(query):
+    """File name of a scrape's checkpoint: platform, search term and a hash of the fields and limits."""
+    options = json.dumps([sorted(query.fields), query.max_pages, query.max_items])
+    search_term = "_".join(query.search_term.replace("_", " ").lower().split())[:30]
+    return f"{query.platform}_{search_term}_{hashlib.sha1(options.encode()).hexdigest()[:8]}"
+
+
+def list_checkpoints(directory=None):
+    """
+    Summaries of the saved checkpoints, most recent first.
+
+    :param directory: Folder of the checkpoint files (defaults to Config.CHECKPOINT_DIR)
+    :return: List of dicts with name, query, products_collected, products_scraped and updated
+    """
+    checkpoints = []
+    for path in Path(directory or Config.CHECKPOINT_DIR).glob("*.json"):
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        checkpoints.append({
+            "name": path.stem,
+            "query": state["query"],
+            "products_collected": len(state["listing"]),
+            "products_scraped": len(state["completed"]),
+            "updated": state["updated"],
+        })
+    return sorted(checkpoints, key=lambda checkpoint: checkpoint["updated"], reverse=True)
+
+
+def load_query(name, directory=None):
+    """Query dict stored in a checkpoint, or None if there is no such checkpoint."""
+    path = Path(directory or Config.CHECKPOINT_DIR) / f"{name}.json"
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["query"]
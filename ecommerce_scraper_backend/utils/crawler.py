@@ -0,0 +1,413 @@
+# utils/crawler.py
+import asyncio
+import time
+from urllib.parse import urlsplit
+from config import Config
+from utils.terminal import output_queue
+from utils.driver_pool import driver_pool
+from utils.event_loop import run_blocking
+from utils.parsing import make_soup
+from utils.product_store import product_id
+from utils.page_cache import page_cache
+from utils.file_handler import JsonlRecords, output_columns
+
+
+# Per-host caps shared by every crawl on the loop
+_host_limits = {}
+
+
+def host_limit(url):
+    """Returns the semaphore that caps the fetches in flight to the host of url."""
+    host = urlsplit(url).netloc
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(Config.CRAWL_PER_HOST_LIMIT)
+    return _host_limits[host]
+
+
+class Crawler:
+    """
+    asyncio crawl core the scrapers plug their extractors into.
+
+    Phase one walks the result pages with the listing browser, phase two keeps all product
+    page fetches in flight at once; each one is capped per host and leases a browser from the
+    process-wide driver pool (or downloads the page over HTTP) only for the duration of its visit.
+    Product pages found in the page cache are not fetched at all.
+    """
+
+    def __init__(self, fields_to_scrape, extract_details, parse_page=None, required_fields=(),
+                 max_browsers=None, parse_only=None, checkpoint=None, platform=None, use_cache=True, field_columns=None):
+        """
+        :param fields_to_scrape: Fields selected by the user
+        :param extract_details: Function(driver, product_details, fields_to_scrape) that visits
+                                product_details['link'] in the browser and adds the selected fields to it
+        :param parse_page: Function(product_page, product_details, fields_to_scrape) for pages fetched over HTTP
+        :param required_fields: Fields a fetched page must contain to skip the browser
+        :param max_browsers: Browsers leased at once for the product pages (defaults to Config.SCRAPER_WORKERS)
+        :param parse_only: Optional SoupStrainer restricting which sections of fetched pages are parsed
+        :param checkpoint: Optional Checkpoint the progress is saved to and resumed from
+        :param platform: Platform name; products are then told apart by their canonical product ID
+                         instead of their link, so repeated and sponsored results are visited once
+        :param use_cache: Take product pages and records from the page cache when they are there
+        :param field_columns: Dict of field -> its record keys, for the fields whose keys differ from their
+                              name (the scraper's FIELD_COLUMNS, see output_columns)
+        """
+        self.fields_to_scrape = fields_to_scrape
+        self.extract_details = extract_details
+        self.parse_page = parse_page
+        self.required_fields = required_fields
+        self.max_browsers = max_browsers or Config.SCRAPER_WORKERS
+        self.parse_only = parse_only
+        self.checkpoint = checkpoint
+        self.platform = platform
+        self.use_cache = use_cache
+        self.field_columns = field_columns or {}
+        self.browsers = None
+        self.results = None
+        self.store = None
+        self.words = None
+        self.own_drivers = []
+        self.fetcher = None
+        self.flush_lock = None
+        self.completed = 0
+        self.written = 0  # Products of this visit_products call kept so far, in listing order
+        self.finished = {}  # position -> (product details, unchanged) waiting for the products before them
+        self.to_visit = []
+        self.fresh = set()
+        self.started = 0  # Visits started so far, in listing order
+        self.visits = set()
+        self.done = None
+
+    async def collect_listing(self, driver, parse_listing, next_page, max_pages=None, max_items=None, max_idle_steps=3):
+        """
+        Phase one: walks the result pages and collects the product links.
+
+        :param driver: Browser showing the first result page
+        :param parse_listing: Function(driver, fields_to_scrape) returning the product details dicts
+                              (link and listing-level fields) currently shown
+        :param next_page: Function(driver, page_number) that moves to the given page, or loads more
+                          results on infinite-scroll listings; returns False when there are none
+        :param max_pages: Number of result pages to walk
+        :param max_items: Number of products to collect
+        :param max_idle_steps: Steps in a row without new products after which the listing is considered exhausted
+        :return: The product details dicts, without repeated products
+        """
+        listing = []
+        seen = set()
+        page_number = 1
+        idle_steps = 0
+
+        if self.checkpoint is not None and self.checkpoint.listing:
+            listing = [dict(entry) for entry in self.checkpoint.listing]
+            seen = {self._key(entry['link']) for entry in listing if entry.get('link')}
+            if self.checkpoint.listing_complete:
+                return listing
+            # Continue from the last result page walked before the interruption
+            page_number = self.checkpoint.page_number
+            await run_blocking(driver.get, self.checkpoint.cursor)
+
+        while True:
+            entries = await run_blocking(parse_listing, driver, self.fields_to_scrape)
+            new_entries = 0
+            for entry in entries:
+                link = entry.get('link')
+                if link:
+                    key = self._key(link)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                listing.append(entry)
+                new_entries += 1
+            output_queue.put(f"Collected {len(listing)} product links.")
+            await self._save_listing(driver, listing, page_number)
+
+            idle_steps = 0 if new_entries else idle_steps + 1
+            if max_items is not None and len(listing) >= max_items:
+                del listing[max_items:]
+                break
+            if max_pages is not None and page_number >= max_pages:
+                break
+            if idle_steps >= max_idle_steps:
+                output_queue.put("No more products are loading.")
+                break
+
+            page_number += 1
+            if not await run_blocking(next_page, driver, page_number):
+                output_queue.put("No more pages available.")
+                break
+
+        await self._save_listing(driver, listing, page_number, complete=True)
+        return listing
+
+    def _key(self, link):
+        return product_id(self.platform, link) if self.platform else link
+
+    async def _save_listing(self, driver, listing, page_number, complete=False):
+        if self.checkpoint is None:
+            return
+        try:
+            cursor = await run_blocking(getattr, driver, 'current_url')
+        except Exception as e:
+            output_queue.put(f"Could not read the listing position for the checkpoint: {e}")
+            cursor = self.checkpoint.cursor
+        self.checkpoint.set_listing(listing, page_number, cursor, complete)
+        await run_blocking(self.checkpoint.writer())
+
+    async def visit_products(self, listing, drivers=(), fetcher=None, results=None, store=None, words=None):
+        """
+        Phase two: fetches all product pages concurrently and fills in the detail fields.
+
+        :param listing: Product details dicts from collect_listing, updated in place
+        :param drivers: Idle browsers the visits use before leasing from the pool (e.g. the listing
+                        browser); they stay open
+        :param fetcher: Optional HttpFetcher; pages are then downloaded first and only visited in
+                        a browser when one of the required_fields is missing
+        :param results: Optional JsonlWriter the products are written to in listing order (the link only
+                        if selected), each as soon as it and the products before it are scraped; visits start
+                        at most Config.VISIT_WINDOW products ahead of the next one written. The checkpoint
+                        then records the products written, and a resumed scrape skips them
+        :param store: Optional ProductBatch the products (with their links) are upserted through, in the
+                      same batches as the results. With Config.FRESHNESS_HOURS, products the store got
+                      within that many hours are taken from it instead of being visited again
+        :param words: Optional TitleWords the title of each product is counted in as it is scraped
+                      (on a resumed scrape, also the titles already written to the results)
+        :return: The product details in listing order
+        """
+        self.browsers = asyncio.Semaphore(max(self.max_browsers, len(drivers)))
+        self.own_drivers = list(drivers)
+        self.fetcher = fetcher
+        self.results = results
+        self.store = store
+        self.words = words
+        self.flush_lock = asyncio.Lock()
+        self.written = 0
+        self.finished = {}
+        self.started = 0
+        self.visits = set()
+        self.done = asyncio.get_running_loop().create_future()
+
+        # Products written before a resumed scrape was interrupted are not fetched again
+        remaining = listing
+        if self.checkpoint is not None and results is not None:
+            remaining = [product_details for product_details in listing
+                         if product_details.get('link') not in self.checkpoint.completed]
+            self.completed = len(listing) - len(remaining)
+            if self.completed:
+                output_queue.put(f"{self.completed} products were already scraped before the interruption.")
+                if words is not None:
+                    await run_blocking(words.update, (record.get('title') for record in JsonlRecords(results.filename)))
+        self.fresh = await self._reuse_fresh(remaining)
+        self.to_visit = remaining
+
+        try:
+            if remaining:
+                self._start_visits()
+                await self.done
+        finally:
+            # After a failed visit or a cancellation, the visits still running are cancelled and waited for
+            for visit in self.visits:
+                visit.cancel()
+            await asyncio.gather(*self.visits, return_exceptions=True)
+            await self._flush()
+        return listing
+
+    def _start_visits(self):
+        """
+        Starts the visits of the products within Config.VISIT_WINDOW of the next one to be written;
+        called again each time a product is written, so only the window's visits are ever pending.
+        """
+        if self.done.done():
+            return  # Failed or cancelled
+        while self.started < min(len(self.to_visit), self.written + Config.VISIT_WINDOW):
+            product_details = self.to_visit[self.started]
+            visit = asyncio.ensure_future(self._visit(self.started, product_details,
+                                                      fresh=id(product_details) in self.fresh))
+            visit.add_done_callback(self._visited)
+            self.visits.add(visit)
+            self.started += 1
+
+    def _visited(self, visit):
+        self.visits.discard(visit)
+        if self.done.done():
+            return
+        if not visit.cancelled() and visit.exception() is not None:
+            self.done.set_exception(visit.exception())
+        elif self.written == len(self.to_visit) and not self.visits:
+            self.done.set_result(None)
+
+    async def _reuse_fresh(self, listing):
+        """
+        Fills in the products scraped recently by earlier runs from the store; returns the ids of their dicts.
+
+        A stored product is reused only when its details have every selected field, and only those fields'
+        keys are copied, as the earlier run may have scraped other fields. Fields that only add specification
+        keys cannot be told apart from the rest of the details, so with one selected nothing is reused.
+        """
+        if self.store is None or self.results is None or not Config.FRESHNESS_HOURS:
+            return set()
+        if any(self.field_columns.get(field) == () for field in self.fields_to_scrape):
+            return set()
+        columns = [column for column in output_columns(self.fields_to_scrape, self.field_columns)
+                   if column != 'link']
+        keys = {product_details['link']: product_id(self.store.platform, product_details['link'])
+                for product_details in listing if product_details.get('link')}
+        since = time.time() - Config.FRESHNESS_HOURS * 3600
+        stored = await run_blocking(self.store.store.fresh, self.store.platform, set(keys.values()), since)
+        if not stored:
+            return set()
+
+        fresh = set()
+        for product_details in listing:
+            product = stored.get(keys.get(product_details.get('link')))
+            if product is None or any(column not in product for column in columns):
+                continue
+            product_details.update((column, product[column]) for column in columns)
+            fresh.add(id(product_details))
+        if fresh:
+            output_queue.put(f"{len(fresh)} products scraped in the last {Config.FRESHNESS_HOURS:g} "
+                             f"hours were taken from the product store.")
+        return fresh
+
+    async def _lease_browser(self):
+        """Waits for a browser slot of this crawl; returns (driver, leased from the pool)."""
+        await self.browsers.acquire()
+        if self.own_drivers:
+            return self.own_drivers.pop(), False
+        try:
+            return await driver_pool.acquire(block_stylesheets=True), True
+        except Exception:
+            self.browsers.release()
+            raise
+
+    async def _return_browser(self, driver, pooled):
+        try:
+            if pooled:
+                await driver_pool.release(driver)
+            else:
+                self.own_drivers.append(driver)
+        finally:
+            self.browsers.release()
+
+    async def _visit(self, position, product_details, fresh=False):
+        """Scrapes the product at position of the products to visit (fresh ones are already filled in)."""
+        if fresh:
+            # Products taken from the store are already in it
+            await self._finish(position, product_details, unchanged=True)
+            self.completed += 1
+            return
+
+        link = product_details.get('link')
+        cached = False
+        if link:
+            try:
+                # The record extracted for the same fields by an earlier visit
+                record_key = f"record:{self._key(link)}:{','.join(sorted(self.fields_to_scrape))}"
+                record = await run_blocking(page_cache.get, record_key) if self.use_cache else None
+                if record is not None:
+                    product_details.update(record)
+                    cached = True
+                else:
+                    async with host_limit(link):
+                        if not await self._fetch(product_details):
+                            driver, pooled = await self._lease_browser()
+                            try:
+                                await run_blocking(self.extract_details, driver, product_details, self.fields_to_scrape)
+                            finally:
+                                await self._return_browser(driver, pooled)
+                    if self._extracted(product_details):
+                        await run_blocking(page_cache.put, record_key, product_details)
+            except Exception as e:
+                output_queue.put(f"Error scraping {link}: {e}")
+
+        # Cached records already reached the store when they were scraped
+        await self._finish(position, product_details, unchanged=cached)
+        self.completed += 1
+        output_queue.put(f"{self.completed} products scraped.")
+
+    async def _finish(self, position, product_details, unchanged=False):
+        """Keeps the finished products in listing order: a product waits until the ones before it are kept."""
+        self.finished[position] = (product_details, unchanged)
+        if position != self.written:
+            return
+        while self.written in self.finished:
+            # _keep writes the record before it first awaits, so the products are written in order
+            product_details, unchanged = self.finished.pop(self.written)
+            self.written += 1
+            self._start_visits()
+            await self._keep(product_details, unchanged=unchanged)
+
+    async def _keep(self, product_details, unchanged=False):
+        """
+        Writes a finished product to the results and the store (only to its price history when the
+        details came from the store or the cache); a full batch is flushed along with the checkpoint.
+        """
+        if self.words is not None:
+            self.words.add(product_details.get('title'))
+        if self.results is None:
+            return
+        record = dict(product_details)
+        if 'link' not in self.fields_to_scrape:
+            record.pop('link', None)
+        self.results.write(record)
+        if self.store is not None:
+            self.store.write(product_details, unchanged=unchanged)
+
+        link = product_details.get('link')
+        checkpoint_due = self.checkpoint is not None and link and self.checkpoint.record(link)
+        if checkpoint_due or self.results.full():
+            await self._flush()
+
+    async def _flush(self):
+        # The results, store and checkpoint snapshots are taken together before any await, so the
+        # checkpoint only counts products whose records are in the same flush; the lock hands out
+        # turns in order, so flushes are written one at a time and a newer checkpoint is never
+        # overwritten by an older one. The results are written before the checkpoint that counts them.
+        writes = [part.writer() for part in (self.results, self.store, self.checkpoint) if part is not None]
+        async with self.flush_lock:
+            for write in writes:
+                await run_blocking(write)
+
+    async def _fetch(self, product_details):
+        """Scrape the product over HTTP if possible; returns True when no browser visit is needed."""
+        if self.fetcher is None:
+            return False
+        html_key = f"html:{self._key(product_details['link'])}"
+        cached = await run_blocking(page_cache.get, html_key) if self.use_cache else None
+        html = cached
+        if html is None:
+            html = await self.fetcher.fetch(product_details['link'])
+            if html is None:
+                return False
+
+        fetched_details = dict(product_details)
+        missing = await run_blocking(self._parse_fetched, html, fetched_details)
+        if missing:
+            output_queue.put(f"Missing {', '.join(missing)} in fetched page, using the browser.")
+            return False
+
+        # Only pages with the required fields are cached, not e.g. a captcha page
+        if cached is None:
+            await run_blocking(page_cache.put, html_key, html)
+        product_details.update(fetched_details)
+        return True
+
+    def _extracted(self, product_details):
+        """
+        Whether a visit got the product's details, so its record may be cached: the selected required
+        fields are filled in and not every selected field is missing (as after a timeout or a captcha page).
+        """
+        selected = [field for field in self.fields_to_scrape if field != 'link']
+        if any(product_details.get(field) is None for field in self.required_fields if field in selected):
+            return False
+        return not selected or any(product_details.get(field) is not None for field in selected)
+
+    def _parse_fetched(self, html, product_details):
+        """
+        Adds the selected fields of a fetched page to product_details; returns the required fields the page
+        lacks. They are read from the page itself whatever the selection, so a captcha or robot-check page
+        is never accepted, and not from product_details, which may hold the listing's values.
+        """
+        product_page = make_soup(html, parse_only=self.parse_only)
+        self.parse_page(product_page, product_details, self.fields_to_scrape)
+        required = {}
+        self.parse_page(product_page, required, list(self.required_fields))
+        return [field for field in self.required_fields if required.get(field) is None]
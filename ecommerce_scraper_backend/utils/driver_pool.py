@@ -0,0 +1,170 @@
+# utils/driver_pool.py
+import asyncio
+import atexit
+import time
+from pathlib import Path
+from config import Config
+from utils.terminal import output_queue
+from utils.event_loop import run_blocking, submit
+
+
+class DriverPool:
+    """
+    Process-wide pool of warm browser sessions reused across scrape jobs.
+
+    Jobs lease a session with acquire() and hand it back with release() instead of launching and
+    quitting Chrome themselves. Each session keeps its own persistent user-data-dir and disk cache,
+    is health-checked before it is leased, is recycled after max_navigations page loads and is
+    closed once it has been idle for idle_timeout seconds. Must be used from the crawl event loop.
+    """
+
+    def __init__(self, max_size=None, warm_size=None, idle_timeout=None, max_navigations=None, profile_dir=None):
+        """
+        :param max_size: Maximum number of sessions leased at once (defaults to Config.BROWSER_POOL_SIZE)
+        :param warm_size: Sessions pre-launched by warm_up() and spared by idle eviction (defaults to Config.BROWSER_POOL_WARM)
+        :param idle_timeout: Seconds an unused session stays open (defaults to Config.BROWSER_IDLE_TIMEOUT)
+        :param max_navigations: Page loads after which a session is replaced (defaults to Config.BROWSER_MAX_NAVIGATIONS)
+        :param profile_dir: Directory holding one profile per session slot (defaults to Config.BROWSER_PROFILE_DIR)
+        """
+        self.max_size = max_size or Config.BROWSER_POOL_SIZE
+        self.warm_size = Config.BROWSER_POOL_WARM if warm_size is None else warm_size
+        self.idle_timeout = idle_timeout or Config.BROWSER_IDLE_TIMEOUT
+        self.max_navigations = max_navigations or Config.BROWSER_MAX_NAVIGATIONS
+        self.profile_dir = Path(profile_dir or Config.BROWSER_PROFILE_DIR)
+        self.idle = []  # (driver, time it was released), most recently used last
+        self.leased = set()
+        self.slots = {}  # driver -> profile slot; two running browsers cannot share a user-data-dir
+        self.launching = set()  # slots of the browsers being started
+        self.available = None
+        self.evictor = None
+
+    async def warm_up(self):
+        """Pre-launches warm_size sessions so the first jobs do not wait for Chrome to start."""
+        while len(self.slots) < min(self.warm_size, self.max_size):
+            try:
+                driver = await self._launch()
+            except Exception as e:
+                output_queue.put(f"Could not pre-launch a browser: {e}")
+                return
+            self.idle.append((driver, time.monotonic()))
+        self._start_evictor()
+
+    async def acquire(self, block_stylesheets=False):
+        """
+        Leases a healthy session, launching one if none is idle; waits while max_size sessions are leased.
+
+        :param block_stylesheets: Also skip CSS during this lease (for browsers nobody looks at)
+        :return: WebDriver
+        """
+        if self.available is None:
+            self.available = asyncio.Semaphore(self.max_size)
+        await self.available.acquire()
+        try:
+            driver = None
+            while driver is None and self.idle:
+                candidate, _ = self.idle.pop()
+                if await run_blocking(is_healthy, candidate):
+                    driver = candidate
+                else:
+                    output_queue.put("Replacing a browser that stopped responding.")
+                    await self._quit(candidate)
+            if driver is None:
+                driver = await self._launch()
+            if Config.BLOCK_RESOURCES:
+                from utils.browser import block_resources
+                await run_blocking(block_resources, driver, block_stylesheets)
+        except Exception:
+            self.available.release()
+            raise
+
+        self.leased.add(driver)
+        self._start_evictor()
+        return driver
+
+    async def release(self, driver):
+        """Returns a leased session; it is quit instead if it reached max_navigations."""
+        if driver not in self.leased:
+            # Not leased from the pool, e.g. a browser a scraper relaunched itself
+            await self._quit(driver)
+            return
+
+        self.leased.discard(driver)
+        self.available.release()
+        if getattr(driver, 'navigations', 0) >= self.max_navigations:
+            await self._quit(driver)
+        else:
+            self.idle.append((driver, time.monotonic()))
+
+    async def close(self):
+        """Quits the idle sessions; sessions still leased are quit when they are released."""
+        if self.evictor is not None:
+            self.evictor.cancel()
+            self.evictor = None
+        self.max_navigations = 0
+        while self.idle:
+            driver, _ = self.idle.pop()
+            await self._quit(driver)
+
+    async def _launch(self):
+        from utils.browser import new_driver  # Selenium is loaded with the first browser, not with the pool
+
+        taken = set(self.slots.values()) | self.launching
+        slot = min(set(range(len(taken) + 1)) - taken)
+        self.launching.add(slot)
+        try:
+            driver = await run_blocking(new_driver, user_data_dir=self.profile_dir / f"session-{slot}")
+        finally:
+            self.launching.discard(slot)
+        self.slots[driver] = slot
+        output_queue.put(f"Started browser session {slot + 1}.")
+        return driver
+
+    async def _quit(self, driver):
+        self.slots.pop(driver, None)
+        try:
+            await run_blocking(driver.quit)
+        except Exception as e:
+            output_queue.put(f"Could not close a browser: {e}")
+
+    def _start_evictor(self):
+        if self.evictor is None:
+            self.evictor = asyncio.get_running_loop().create_task(self._evict_idle())
+
+    async def _evict_idle(self):
+        """Closes the sessions idle for longer than idle_timeout, oldest first, keeping warm_size open."""
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 30))
+            now = time.monotonic()
+            for entry in list(self.idle):
+                if len(self.slots) <= self.warm_size:
+                    break
+                if now - entry[1] >= self.idle_timeout:
+                    self.idle.remove(entry)
+                    await self._quit(entry[0])
+
+
+def is_healthy(driver):
+    """Whether the browser session still answers commands."""
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+# Browser sessions shared by every scrape job of the process
+driver_pool = DriverPool()
+
+
+def warm_up():
+    """Starts pre-launching the warm sessions on the crawl loop; returns without waiting for Chrome."""
+    return submit(driver_pool.warm_up())
+
+
+@atexit.register
+def shutdown(timeout=30):
+    """Quits the pooled browsers; runs when the process exits."""
+    try:
+        submit(driver_pool.close()).result(timeout=timeout)
+    except Exception:
+        pass
@@ -0,0 +1,60 @@
+# utils/event_loop.py
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+
+
+# Threads that run the blocking calls (Selenium, parsing, file writes) of all crawls
+blocking_executor = ThreadPoolExecutor(max_workers=Config.CRAWL_BLOCKING_THREADS, thread_name_prefix="crawl-blocking")
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_loop():
+    """Returns the process-wide crawl event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="crawl-loop", daemon=True).start()
+    return _loop
+
+
+def submit(coroutine):
+    """
+    Schedules a scrape on the crawl loop; every job shares the loop's single thread.
+
+    :param coroutine: Coroutine to run, e.g. amazon_scrape()
+    :return: concurrent.futures.Future of the coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+
+
+async def run_blocking(function, *args, **kwargs):
+    """
+    Runs a blocking call on the shared executor without stalling the other jobs on the loop.
+
+    The call sees the caller's context variables, e.g. the job its terminal output belongs to. A running
+    call cannot be interrupted, so when the caller is cancelled (e.g. its job is) the cancellation waits
+    for the call to end: the caller's cleanup, such as returning its browser to the pool, never runs
+    while a thread is still using what it cleans up.
+    """
+    context = contextvars.copy_context()
+    call = blocking_executor.submit(functools.partial(context.run, function, *args, **kwargs))
+    result = asyncio.wrap_future(call)
+    try:
+        return await asyncio.shield(result)
+    except asyncio.CancelledError:
+        if not call.cancel():  # Already running
+            while not result.done():
+                try:
+                    await asyncio.wait([result])
+                except asyncio.CancelledError:
+                    pass  # Cancelled again; still waiting
+            if not result.cancelled():
+                result.exception()  # Retrieved, the caller is cancelled either way
+        raise
@@ -0,0 +1,218 @@
+# utils/extraction.py
+import re
+from utils.terminal import output_queue
+
+
+class Find:
+    """
+    One selector step: the first descendant matching a tag name and attributes,
+    with the same arguments as BeautifulSoup's find(). Combine alternatives with |.
+    """
+
+    def __init__(self, name=None, **attrs):
+        self.alternatives = [(name, attrs)]
+
+    def __or__(self, other):
+        combined = Find()
+        combined.alternatives = self.alternatives + other.alternatives
+        return combined
+
+    def run(self, element):
+        for name, attrs in self.alternatives:
+            found = element.find(name, **attrs)
+            if found is not None:
+                return found
+        return None
+
+
+class Node:
+    """
+    Named page section several fields read from; it is located once per page.
+
+    :param path: Find steps from the parent (or the page) to the section
+    :param parent: Name of the node the path starts from
+    """
+
+    def __init__(self, *path, parent=None):
+        self.path = path
+        self.parent = parent
+
+
+class Field:
+    """
+    How one selectable field is extracted.
+
+    :param path: Find steps from the node (or the page) to the element holding the value
+    :param node: Name of the shared Node the path starts from
+    :param value: Function(element) returning the raw value, the stripped text by default
+    :param parse: Function(raw value) returning the cleaned, typed value; failures count as missing
+    :param extract: Function(element, product_details) for fields that store several keys (e.g. tables)
+                    or need other fields; replaces value/parse, is also called when the element is missing
+                    (None) and its return value is stored unless None
+    :param default: Value stored when the field is missing
+    :param fallback: Field whose value is stored when this one is missing
+    :param label: Name shown on the terminal next to the value found
+    """
+
+    def __init__(self, *path, node=None, value=None, parse=None, extract=None, default=None, fallback=None,
+                 label=None):
+        self.path = path
+        self.node = node
+        self.value = value or text
+        self.parse = parse
+        self.extract = extract
+        self.default = default
+        self.fallback = fallback
+        self.label = label
+
+
+class ExtractionSpec:
+    """
+    Declarative field -> selector/cleaner mapping of one page type, checked when it is built.
+
+    plan(fields_to_scrape) compiles (and caches) the execution plan of a field selection.
+    """
+
+    def __init__(self, fields, nodes=None):
+        """
+        :param fields: Dict of field name -> Field, in extraction order
+        :param nodes: Dict of node name -> Node shared by several fields
+        """
+        self.fields = fields
+        self.nodes = nodes or {}
+        self.plans = {}
+        for name, field in fields.items():
+            if field.node is not None and field.node not in self.nodes:
+                raise ValueError(f"Field '{name}' reads unknown node '{field.node}'")
+            if field.fallback is not None and field.fallback not in fields:
+                raise ValueError(f"Field '{name}' falls back to unknown field '{field.fallback}'")
+        for name, node in self.nodes.items():
+            if node.parent is not None and node.parent not in self.nodes:
+                raise ValueError(f"Node '{name}' has unknown parent '{node.parent}'")
+
+    def plan(self, fields_to_scrape):
+        key = tuple(fields_to_scrape)
+        if key not in self.plans:
+            self.plans[key] = ExtractionPlan(self, key)
+        return self.plans[key]
+
+
+class ExtractionPlan:
+    """The fields (and the nodes they need) to extract for one field selection."""
+
+    def __init__(self, spec, fields_to_scrape):
+        self.spec = spec
+        self.selected = [name for name in spec.fields if name in fields_to_scrape]
+
+        # Fallback fields are extracted too, but only stored when selected
+        needed = set(self.selected)
+        for name in self.selected:
+            fallback = spec.fields[name].fallback
+            while fallback is not None and fallback not in needed:
+                needed.add(fallback)
+                fallback = spec.fields[fallback].fallback
+        self.steps = [name for name in spec.fields if name in needed]
+
+        # Nodes in dependency order, each located once per page
+        self.nodes = []
+        for name in self.steps:
+            self._add_node(spec.fields[name].node)
+
+    def _add_node(self, name):
+        if name is None or name in self.nodes:
+            return
+        self._add_node(self.spec.nodes[name].parent)
+        self.nodes.append(name)
+
+    def run(self, page, product_details):
+        """
+        Extracts the planned fields from a parsed page.
+
+        :param page: Parsed page (BeautifulSoup)
+        :param product_details: Dict the selected fields are added to
+        """
+        nodes = {}
+        for name in self.nodes:
+            node = self.spec.nodes[name]
+            start = page if node.parent is None else nodes[node.parent]
+            nodes[name] = follow(start, node.path)
+
+        values = {}
+        for name in self.steps:
+            field = self.spec.fields[name]
+            start = page if field.node is None else nodes[field.node]
+            value = self._extract(name, field, follow(start, field.path), product_details, values)
+            values[name] = value
+
+            # Fields with an extract function store their own keys; their field name only if they return a value
+            if name in self.selected and (field.extract is None or value is not None):
+                product_details[name] = value
+
+    def _extract(self, name, field, element, product_details, values):
+        value = None
+        try:
+            if field.extract is not None:
+                value = field.extract(element, product_details)
+            elif element is not None:
+                value = field.value(element)
+                if field.parse is not None:
+                    value = field.parse(value)
+        except Exception as e:
+            output_queue.put(f"Error extracting {name}: {e}")
+            value = None
+
+        if value is not None:
+            if field.label:
+                output_queue.put(f"{field.label}: {value}")
+        elif field.fallback is not None:
+            value = values.get(field.fallback)
+            output_queue.put(f"{name} not found, using {field.fallback}.")
+        elif field.default is not None:
+            value = field.default
+            output_queue.put(f"{name} not found, using {value}.")
+        return value
+
+
+def follow(start, path):
+    """Applies Find steps one after another; returns None as soon as one finds nothing."""
+    element = start
+    for step in path:
+        if element is None:
+            return None
+        element = step.run(element)
+    return element
+
+
+# Value helpers
+
+def text(element):
+    """Stripped text of the element, with non-breaking spaces as plain spaces."""
+    return element.get_text(strip=True).replace("\xa0", " ")
+
+
+def attr(name):
+    """Value helper: an attribute of the element."""
+    def value(element):
+        return element.get(name)
+    return value
+
+
+# Cleaners
+
+def price(value):
+    """'₹1,299', 'MRP₹1,299' or 'Rs. 1299' -> 1299."""
+    return int(float(re.search(r"\d[\d,]*(\.\d+)?", value).group().replace(",", "")))
+
+
+def percentage(value):
+    """'-20%', '20% off' or '(20% OFF)' -> '20%'."""
+    number = int(re.search(r"\d+", value).group())
+    return f"{number}%"
+
+
+def count(value):
+    """'1,234 Ratings', '16.2k' or '4k' -> 1234, 16200, 4000."""
+    value = value.replace("Ratings", "").replace("ratings", "").replace(",", "").strip()
+    if 'k' in value:
+        return int(float(value.replace('k', '')) * 1000)
+    return int(value)
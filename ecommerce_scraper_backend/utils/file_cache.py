@@ -0,0 +1,124 @@
+# utils/file_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class FileCache:
+    """
+    Size-bounded on-disk cache of byte strings that evicts the least recently used entries.
+
+    Each entry is a file named after the hash of its key. A file's modification time is its last use,
+    so the eviction order survives restarts; processes sharing the folder treat a file another one
+    evicted as a miss.
+    """
+
+    def __init__(self, directory, max_bytes, suffix=".bin"):
+        """
+        :param directory: Folder of the cache files
+        :param max_bytes: Size limit of the files
+        :param suffix: Extension of the cache files
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.entries = None  # file name -> size, least recently used first; read from the folder on first use
+        self.size = 0
+        self.counters = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached bytes of a key.
+
+        :param key: Cache key
+        :return: bytes, None on a miss
+        """
+        data = self.read(key)
+        with self.lock:
+            self.counters["hits" if data is not None else "misses"] += 1
+        return data
+
+    def read(self, key):
+        """Returns the cached bytes of a key and marks it as used, without counting a hit or miss."""
+        with self.lock:
+            self._load()
+            name = self._name(key)
+            path = self.directory / name
+            try:
+                data = path.read_bytes()
+            except OSError:
+                self._forget(name)
+                return None
+            self.entries.move_to_end(name)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return data
+
+    def put(self, key, data):
+        """Stores bytes under a key, evicting the least recently used entries beyond the size limit."""
+        with self.lock:
+            self._load()
+            name = self._name(key)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = self.directory / f"{name}.tmp"
+            temporary.write_bytes(data)
+            os.replace(temporary, self.directory / name)
+            self._forget(name)
+            self.entries[name] = len(data)
+            self.size += len(data)
+            self.counters["stored"] += 1
+
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                self._delete(next(iter(self.entries)))
+                self.counters["evicted"] += 1
+
+    def delete(self, key):
+        with self.lock:
+            self._load()
+            self._delete(self._name(key))
+
+    def stats(self):
+        """Hit and miss counters of this process, with the number and size of the cached entries."""
+        with self.lock:
+            self._load()
+            requests = self.counters["hits"] + self.counters["misses"]
+            return dict(self.counters, entries=len(self.entries), bytes=self.size,
+                        hit_rate=round(self.counters["hits"] / requests, 3) if requests else None)
+
+    def clear(self):
+        with self.lock:
+            self._load()
+            for name in list(self.entries):
+                self._delete(name)
+
+    def _name(self, key):
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + self.suffix
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        files = []
+        if self.directory.exists():
+            for path in self.directory.glob(f"*{self.suffix}"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, path.name, stat.st_size))
+        self.entries = OrderedDict((name, size) for _, name, size in sorted(files))
+        self.size = sum(self.entries.values())
+
+    def _forget(self, name):
+        self.size -= self.entries.pop(name, 0)
+
+    def _delete(self, name):
+        self._forget(name)
+        try:
+            (self.directory / name).unlink()
+        except OSError:
+            pass
\ No newline at end of file
@@ -1,7 +1,11 @@
+import csv
 import json
-import pandas as pd
 import os
+import re
+import tempfile
+from collections import Counter
 from pathlib import Path
+from config import Config
 
 # Dynamically determine the user's Downloads directory
 def get_download_path():
@@ -10,29 +14,273 @@ def get_download_path():
 
 DATA_DIR = get_download_path()
 
+class JsonlWriter:
+    """
+    Appends scraped records to a JSON Lines file in the 'data' directory as they are scraped.
+
+    write() only buffers; flush() appends the buffered batch, so callers decide when a batch is
+    written (e.g. right before saving a checkpoint). Appending lets a resumed scrape continue the file.
+    From an event loop, take writer() on the loop and run the function it returns in a thread.
+    """
+
+    def __init__(self, filename, batch_size=None):
+        """
+        :param filename: Output filename (with .jsonl extension)
+        :param batch_size: Records per batch, full() tells when it is reached (defaults to Config.RESULTS_BATCH_SIZE)
+        """
+        self.filename = filename
+        self.path = os.path.join(DATA_DIR, filename)
+        self.batch_size = batch_size or Config.RESULTS_BATCH_SIZE
+        self.buffer = []
+        self.count = 0
+
+    def write(self, record):
+        """Buffers one record; it is written by the next flush()."""
+        self.buffer.append(json.dumps(record, ensure_ascii=False))
+        self.count += 1
+
+    def full(self):
+        """Whether a whole batch is waiting to be flushed."""
+        return len(self.buffer) >= self.batch_size
+
+    def writer(self):
+        """Takes the buffered records and returns the function that appends them to the file."""
+        lines, self.buffer = self.buffer, []
+
+        def write():
+            os.makedirs(DATA_DIR, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.writelines(line + "\n" for line in lines)
+        return write
+
+    def flush(self):
+        """Appends the buffered records to the file."""
+        self.writer()()
+
+    def close(self):
+        """Writes the records still buffered."""
+        self.flush()
+
+
+class JsonlRecords:
+    """
+    Records of a JSON Lines file in the 'data' directory, read one at a time.
+
+    Every iteration reads the file again, so the records can be streamed more than once in bounded memory.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.path = os.path.join(DATA_DIR, filename)
+
+    def __iter__(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # A line cut off by a crash
+
+
 def save_scraped_data(data, filename):
     """
-    Saves scraped data to a JSON file in the 'data' directory.
+    Saves scraped data to a JSON file in the 'data' directory, writing one record at a time.
     
-    :param data: Data to be saved
+    :param data: Records to be saved, a list or any iterable (e.g. JsonlRecords)
     :param filename: Output filename (with .json extension)
     :return: Full path of the saved JSON file
     """
     os.makedirs(DATA_DIR, exist_ok=True)  # Ensure the directory exists
     filepath = os.path.join(DATA_DIR, filename)
     with open(filepath, "w", encoding="utf-8") as file:
-        json.dump(data, file, ensure_ascii=False, indent=4)
+        # Same layout as json.dump(data, file, indent=4)
+        separator = "[\n"
+        for record in data:
+            text = json.dumps(record, ensure_ascii=False, indent=4)
+            file.write(separator + "\n".join("    " + line for line in text.split("\n")))
+            separator = ",\n"
+        file.write("[]" if separator == "[\n" else "\n]")
     return filename
 
-def convert_to_csv(data, filename):
+def convert_to_csv(data, filename, fixed_columns=(), spec_columns=None, max_spec_columns=None):
     """
-    Converts scraped data to CSV format and saves it in the 'data' directory.
-    
-    :param data: Data to be converted to CSV
+    Converts scraped data to CSV format and saves it in the 'data' directory, writing one row at a time.
+
+    The columns are discovered in a first pass over the records, the rows written in a second one. Data
+    that can only be iterated once (e.g. a generator) is spilled to a temporary file during the first pass.
+    Specification tables add arbitrary keys to the records, so every column outside fixed_columns counts as
+    a specification column, and those can be whitelisted and capped.
+
+    :param data: Records to be converted to CSV, a list or any iterable (e.g. JsonlRecords)
     :param filename: Output filename (with .csv extension)
+    :param fixed_columns: Columns always written when present, e.g. the keys of the selected fields (output_columns)
+    :param spec_columns: Whitelist of the other columns (defaults to Config.CSV_SPEC_COLUMNS, all when empty)
+    :param max_spec_columns: Keep only this many of the other columns, the most often filled ones
+                             (defaults to Config.CSV_MAX_SPEC_COLUMNS, 0 for no limit)
     :return: Full path of the saved CSV file
     """
     os.makedirs(DATA_DIR, exist_ok=True)
     filepath = os.path.join(DATA_DIR, filename)
-    pd.DataFrame(data).to_csv(filepath, index=False)
+    if spec_columns is None:
+        spec_columns = [column.strip() for column in Config.CSV_SPEC_COLUMNS.split(",") if column.strip()]
+    if max_spec_columns is None:
+        max_spec_columns = Config.CSV_MAX_SPEC_COLUMNS
+    fixed_columns = set(fixed_columns)
+    spec_columns = set(spec_columns)
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spill:
+        filled, data = scan_columns(data, spill)
+        columns = select_columns(filled, fixed_columns, spec_columns, max_spec_columns)
+        with open(filepath, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=columns, extrasaction="ignore")
+            if columns:
+                writer.writeheader()
+            for record in data:
+                writer.writerow(record)
+    return filename
+
+def scan_columns(data, spill):
+    """
+    First pass over the records of an export: counts how often each column is filled.
+
+    :param data: Records, a list or any iterable
+    :param spill: Open temporary text file that one-shot iterables are copied to
+    :return: (Counter of column -> records with a value, in order of first appearance, records for the second pass)
+    """
+    one_pass = iter(data) is data
+    filled = Counter()  # Columns in order of first appearance, like a DataFrame built from the records
+    for record in data:
+        filled.update(dict.fromkeys(record, 0))
+        filled.update(key for key, value in record.items() if value not in (None, ""))
+        if one_pass:
+            spill.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if one_pass:
+        spill.seek(0)
+        data = (json.loads(line) for line in spill)
+    return filled, data
+
+def output_columns(fields, field_columns):
+    """
+    Record keys the selected fields write, for the fixed columns of the exports.
+
+    :param fields: Selected field names
+    :param field_columns: Dict of field -> its record keys, for the fields whose keys differ from their name
+                          (an empty tuple for fields that only add specification keys)
+    :return: List of record keys
+    """
+    return [column for field in fields for column in field_columns.get(field, (field,))]
+
+
+def select_columns(filled, fixed_columns, spec_columns, max_spec_columns):
+    """
+    Picks the CSV columns, in order of first appearance.
+
+    :param filled: Counter of column -> records with a value, in order of first appearance
+    :param fixed_columns: Columns always kept
+    :param spec_columns: Whitelist of the other columns, all when empty
+    :param max_spec_columns: Number of other columns kept, 0 for no limit
+    :return: List of column names
+    """
+    specs = [column for column in filled
+             if column not in fixed_columns and (not spec_columns or column in spec_columns)]
+    if max_spec_columns:
+        specs = sorted(specs, key=lambda column: filled[column], reverse=True)[:max_spec_columns]
+    specs = set(specs)
+    return [column for column in filled if column in fixed_columns or column in specs]
+
+
+# Typed columns of the Parquet export; every other column outside the fixed ones goes into the specifications map
+PARQUET_NUMBER_COLUMNS = {
+    "original_price": "float64",
+    "discounted_price": "float64",
+    "discount_percentage": "float64",
+    "rating": "float64",
+    "reviews_count": "int64",
+    "rating_count": "int64",
+    "last_month_sales": "int64",
+}
+PARQUET_CATEGORY_COLUMNS = ("brand_name", "seller_name")
+# Records per row group of the Parquet file
+PARQUET_BATCH_SIZE = 10000
+
+def number(value):
+    """'₹1,299', '45%', '4.3 out of 5', '1,234 ratings', '16.2k' or '1K+' -> the number, None if there is none."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    found = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*([kK])?", str(value))
+    if found is None:
+        return None
+    result = float(found.group(1).replace(",", ""))
+    return result * 1000 if found.group(2) else result
+
+def text_value(value):
+    """Strings as they are, other values (e.g. nested tables) as JSON."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+def save_parquet(data, filename, fixed_columns=()):
+    """
+    Saves scraped data to a Parquet file in the 'data' directory, one row group at a time.
+
+    Prices, discount, rating and counts are stored as numbers, brand and seller names dictionary-encoded,
+    the other fixed columns as strings and all remaining keys (specification tables) in a
+    'specifications' map column.
+
+    :param data: Records to be saved, a list or any iterable (e.g. JsonlRecords)
+    :param filename: Output filename (with .parquet extension)
+    :param fixed_columns: Columns stored as their own column when present, e.g. the keys of the selected fields
+    :return: Filename of the saved Parquet file, None when pyarrow is not installed
+    """
+    try:  # Imported here, it is only needed by this export
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:  # The Parquet export is optional
+        return None
+    os.makedirs(DATA_DIR, exist_ok=True)
+    filepath = os.path.join(DATA_DIR, filename)
+    own_columns = set(fixed_columns) | set(PARQUET_NUMBER_COLUMNS) | set(PARQUET_CATEGORY_COLUMNS)
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spill:
+        filled, data = scan_columns(data, spill)
+        columns = [column for column in filled if column in own_columns]
+        fields = []
+        for column in columns:
+            if column in PARQUET_NUMBER_COLUMNS:
+                fields.append(pa.field(column, pa.type_for_alias(PARQUET_NUMBER_COLUMNS[column])))
+            elif column in PARQUET_CATEGORY_COLUMNS:
+                fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+            else:
+                fields.append(pa.field(column, pa.string()))
+        fields.append(pa.field("specifications", pa.map_(pa.string(), pa.string())))
+        schema = pa.schema(fields)
+
+        def write_batch(writer, batch):
+            arrays = []
+            for field in fields:
+                if field.name == "specifications":
+                    values = [[(key, text_value(value)) for key, value in record.items()
+                               if key not in own_columns and value is not None] for record in batch]
+                elif field.name in PARQUET_NUMBER_COLUMNS:
+                    values = [number(record.get(field.name)) for record in batch]
+                    if pa.types.is_integer(field.type):
+                        values = [None if value is None else int(value) for value in values]
+                else:
+                    values = [text_value(record.get(field.name)) for record in batch]
+                arrays.append(pa.array(values, type=field.type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+        with pq.ParquetWriter(filepath, schema) as writer:
+            batch = []
+            for record in data:
+                batch.append(record)
+                if len(batch) >= PARQUET_BATCH_SIZE:
+                    write_batch(writer, batch)
+                    batch = []
+            if batch or not filled:
+                write_batch(writer, batch)
     return filename
\ No newline at end of file
@@ -0,0 +1,75 @@
+# utils/http_fetch.py
+import asyncio
+from urllib.parse import urlsplit, urlunsplit
+import aiohttp
+from config import Config
+from utils.terminal import output_queue
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+
+class HttpFetcher:
+    """
+    Lightweight fetch backend for server-rendered product pages.
+
+    Pages are downloaded over a pooled keep-alive aiohttp session instead of being rendered in Chrome,
+    optionally with the cookies and user agent of a Selenium session.
+    """
+
+    def __init__(self, pool_size=None, timeout=None, base_url=None):
+        """
+        :param pool_size: Connections kept alive per host (defaults to Config.HTTP_POOL_SIZE)
+        :param timeout: Request timeout in seconds (defaults to Config.HTTP_TIMEOUT)
+        :param base_url: Scheme and host that replace those of every fetched URL, e.g. a local
+                         server with saved pages (defaults to Config.HTTP_BASE_URL)
+        """
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.timeout = timeout or Config.HTTP_TIMEOUT
+        self.base_url = base_url or Config.HTTP_BASE_URL
+        self.headers = dict(DEFAULT_HEADERS)
+        self.cookies = {}
+        self.session = None
+
+    def seed_from_driver(self, driver):
+        """Copy the cookies and user agent of a Selenium session; call it before the first fetch."""
+        for cookie in driver.get_cookies():
+            self.cookies[cookie['name']] = cookie['value']
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        if user_agent:
+            self.headers["User-Agent"] = user_agent
+
+    async def fetch(self, url):
+        """
+        Downloads a page.
+
+        :param url: Page URL
+        :return: The page HTML, or None if the request failed
+        """
+        if self.session is None:
+            # The session belongs to the event loop it is created on
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_size)
+            self.session = aiohttp.ClientSession(headers=self.headers, cookies=self.cookies, connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+        if self.base_url:
+            base = urlsplit(self.base_url)
+            url = urlunsplit(urlsplit(url)._replace(scheme=base.scheme, netloc=base.netloc))
+        try:
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    output_queue.put(f"HTTP fetch returned {response.status} for {url}")
+                    return None
+                return await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            output_queue.put(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
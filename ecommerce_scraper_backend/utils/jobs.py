@@ -0,0 +1,158 @@
+# utils/jobs.py
+import asyncio
+import contextvars
+import itertools
+import queue
+import time
+import uuid
+from collections import OrderedDict
+from config import Config
+from utils.event_loop import submit
+from utils.file_handler import JsonlRecords
+
+
+# Job the code running in this context belongs to; asyncio tasks and run_blocking calls inherit it
+current_job = contextvars.ContextVar("current_job", default=None)
+
+# Jobs by id, oldest first
+jobs = OrderedDict()
+
+# States of a job that will not change any more
+FINISHED = ("completed", "failed", "cancelled")
+
+# Creation order of the jobs, for first-come first-served scheduling
+_sequence = itertools.count()
+
+
+class Job:
+    """
+    One scrape run with its own terminal channels and result store.
+
+    Everything the scraper writes to utils.terminal.output_queue goes to the job's events and
+    everything it reads from input_queue comes from the job's inputs, so jobs on different
+    platforms can run side by side.
+    """
+
+    def __init__(self, platform, events=None, inputs=None, query=None, priority=0, user=None, job_id=None):
+        """
+        :param platform: Name of the scraped platform, e.g. 'amazon'
+        :param events: Queue for the scraper's terminal output (a new one by default)
+        :param inputs: Queue for the answers to the scraper's prompts (a new one by default)
+        :param query: ScrapeQuery for a scrape without prompts
+        :param priority: Scheduling priority, higher runs first
+        :param user: Who submitted the job; the scheduler shares the workers fairly between users
+        :param job_id: Id of the job (a new one by default)
+        """
+        self.id = job_id or uuid.uuid4().hex
+        self.platform = platform
+        self.query = query
+        self.priority = priority
+        self.user = user
+        self.sequence = next(_sequence)
+        self.events = queue.Queue() if events is None else events
+        self.inputs = queue.Queue() if inputs is None else inputs
+        self.owns_channels = events is None
+        self.status = "created"
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self.worker = None  # Scheduler worker running the job
+
+    def start(self, scrape):
+        """
+        Runs the scraper on this process' crawl loop inside this job.
+
+        :param scrape: Scraper coroutine function, e.g. amazon_scrape
+        :return: self
+        """
+        self.status = "running"
+        self.started = time.time()
+        self.future = submit(self._run(scrape))
+        return self
+
+    async def _run(self, scrape):
+        current_job.set(self)
+        status, result, error = "failed", None, None
+        try:
+            result = await (scrape() if self.query is None else scrape(self.query))
+            # Scrapers return None when the user input was invalid or the scrape failed
+            status = "completed" if result is not None else "failed"
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except BaseException as e:
+            error = str(e)
+            raise
+        finally:
+            self.finish(status, result, error)
+
+    def cancel(self):
+        """Cancels a job running on this process' crawl loop."""
+        if self.future is not None:
+            self.future.cancel()
+
+    def finish(self, status, result=None, error=None):
+        """Records the outcome and ends the event stream of the job."""
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished = time.time()
+        if self.owns_channels:
+            self.events.put(None)  # Ends the job's event stream
+
+    def done(self):
+        return self.status in FINISHED
+
+    def products(self):
+        """Scraped product details streamed from the job's JSONL file, empty until the job completed."""
+        filenames = (self.result or {}).get("filenames") or {}
+        return JsonlRecords(filenames["jsonl"]) if "jsonl" in filenames else []
+
+    def to_dict(self):
+        """Job status for the API, without the scraped products."""
+        summary = self.result or {}
+        return {
+            "id": self.id,
+            "platform": self.platform,
+            "status": self.status,
+            "query": self.query.to_dict() if self.query is not None else None,
+            "priority": self.priority,
+            "user": self.user,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "products_scraped": summary.get("products_scraped", 0),
+            "result": summary or None,
+        }
+
+
+def register(job):
+    """Adds a job to the registry, forgetting the oldest finished jobs beyond Config.JOB_HISTORY."""
+    finished = [job_id for job_id, known in jobs.items() if known.done()]
+    for job_id in finished[:max(len(finished) - Config.JOB_HISTORY + 1, 0)]:
+        del jobs[job_id]
+    jobs[job.id] = job
+    return job
+
+
+def start_job(platform, scrape, events=None, inputs=None, query=None):
+    """
+    Creates, registers and starts a job on this process' crawl loop.
+
+    :param platform: Name of the scraped platform
+    :param scrape: Scraper coroutine function
+    :param events: Queue for the terminal output (a new one by default)
+    :param inputs: Queue for the prompt answers (a new one by default)
+    :param query: ScrapeQuery passed to the scraper, which then runs without prompts
+    :return: Job
+    """
+    return register(Job(platform, events, inputs, query)).start(scrape)
+
+
+def get_job(job_id):
+    """Returns the job with the given id, or None."""
+    return jobs.get(job_id)
@@ -0,0 +1,73 @@
+# utils/page_cache.py
+import json
+import time
+import zlib
+from config import Config
+from utils.file_cache import FileCache
+
+
+class PageCache(FileCache):
+    """
+    On-disk cache of product pages (compressed HTML) and of the records extracted from them.
+
+    Entries are zlib-compressed JSON files that count as misses once they are older than the TTL;
+    beyond the size limit the least recently used ones are deleted.
+    """
+
+    def __init__(self, directory=None, ttl=None, max_bytes=None):
+        """
+        :param directory: Folder of the cache files (defaults to Config.PAGE_CACHE_DIR)
+        :param ttl: Seconds an entry stays valid (defaults to Config.PAGE_CACHE_TTL, 0 turns the cache off)
+        :param max_bytes: Size limit of the files (defaults to Config.PAGE_CACHE_MAX_MB)
+        """
+        super().__init__(directory or Config.PAGE_CACHE_DIR, max_bytes or Config.PAGE_CACHE_MAX_MB * 1024 * 1024,
+                         suffix=".z")
+        self.ttl = Config.PAGE_CACHE_TTL if ttl is None else ttl
+        self.counters["expired"] = 0
+
+    def get(self, key):
+        """
+        Returns the cached value of a key.
+
+        :param key: Cache key, e.g. 'html:B0C1234567'
+        :return: The value stored with put(), None on a miss or an expired entry
+        """
+        if self.ttl <= 0:
+            return None
+        data = self.read(key)
+        try:
+            entry = json.loads(zlib.decompress(data)) if data is not None else None
+        except (ValueError, zlib.error):
+            entry = None
+        expired = entry is not None and time.time() - entry["stored"] > self.ttl
+        if expired:
+            self.delete(key)
+        with self.lock:
+            if entry is None or expired:
+                self.counters["misses"] += 1
+                self.counters["expired"] += expired
+                return None
+            self.counters["hits"] += 1
+        return entry["value"]
+
+    def put(self, key, value):
+        """
+        Stores a value, evicting the least recently used entries beyond the size limit.
+
+        :param key: Cache key
+        :param value: JSON-serializable value, e.g. the page HTML or the extracted record
+        """
+        if self.ttl <= 0:
+            return
+        entry = {"stored": time.time(), "value": value}
+        super().put(key, zlib.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8")))
+
+
+page_cache = PageCache()
+
+
+def format_cache_stats():
+    """Returns the page cache counters as a line for the terminal output."""
+    stats = page_cache.stats()
+    return (f"Page cache: {stats['hits']} hits, {stats['misses']} misses ({stats['expired']} expired), "
+            f"{stats['entries']} entries, {stats['bytes'] / 1024 / 1024:.1f} MB")
\ No newline at end of file
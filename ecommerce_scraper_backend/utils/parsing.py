@@ -0,0 +1,50 @@
+# utils/parsing.py
+from bs4 import BeautifulSoup as bs, SoupStrainer
+from bs4 import FeatureNotFound
+from config import Config
+
+
+# Tree builders make_soup can use, fastest first
+PARSER_BACKENDS = ("lxml", "html.parser")
+
+
+def resolve_parser(name=None):
+    """
+    Returns the parser backend to use.
+
+    :param name: Requested backend (defaults to Config.HTML_PARSER)
+    :return: name if it is installed, otherwise the pure-Python 'html.parser'
+    """
+    name = name or Config.HTML_PARSER
+    try:
+        bs("", name)
+    except FeatureNotFound:
+        return "html.parser"
+    return name
+
+
+HTML_PARSER = resolve_parser()
+
+
+def sections_by_id(*element_ids):
+    """
+    Builds a restricted-parsing filter that keeps only the elements with the given ids and their subtrees.
+
+    :param element_ids: ids of the page sections the scraper reads
+    :return: SoupStrainer for make_soup's parse_only
+    """
+    return SoupStrainer(id=list(element_ids))
+
+
+def make_soup(markup, parse_only=None, parser=None):
+    """
+    Parses HTML with the configured backend.
+
+    :param markup: HTML text
+    :param parse_only: Optional SoupStrainer; everything outside the matching subtrees is skipped
+    :param parser: Backend to use instead of Config.HTML_PARSER
+    :return: BeautifulSoup tree
+    """
+    if parse_only is not None and not Config.RESTRICTED_PARSING:
+        parse_only = None
+    return bs(markup, resolve_parser(parser) if parser else HTML_PARSER, parse_only=parse_only)
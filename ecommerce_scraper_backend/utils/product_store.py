@@ -0,0 +1,398 @@
+# utils/product_store.py
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import unquote, unquote_plus
+from config import Config
+from utils.file_handler import number
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    platform TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    link TEXT,
+    title TEXT,
+    brand TEXT,
+    seller TEXT,
+    price REAL,
+    original_price REAL,
+    discount REAL,
+    rating REAL,
+    reviews_count INTEGER,
+    search_term TEXT,
+    details TEXT NOT NULL,
+    first_scraped REAL NOT NULL,
+    scraped_at REAL NOT NULL,
+    PRIMARY KEY (platform, product_id)
+);
+-- Brands are matched case-insensitively, so the index is NOCASE; products_brand was its BINARY predecessor
+DROP INDEX IF EXISTS products_brand;
+CREATE INDEX IF NOT EXISTS products_brand_nocase ON products (platform, brand COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS products_price ON products (platform, price);
+CREATE INDEX IF NOT EXISTS products_scraped_at ON products (scraped_at);
+
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY,
+    platform TEXT NOT NULL,
+    search_term TEXT,
+    started REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_search ON runs (platform, search_term, started);
+
+CREATE TABLE IF NOT EXISTS price_history (
+    platform TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    run TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    price REAL,
+    original_price REAL,
+    discount REAL,
+    rating REAL,
+    reviews_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS price_history_product ON price_history (platform, product_id, scraped_at);
+CREATE INDEX IF NOT EXISTS price_history_run ON price_history (run);
+"""
+
+HISTORY_INSERT = """
+INSERT INTO price_history (platform, product_id, run, scraped_at, price, original_price, discount, rating, reviews_count)
+VALUES (:platform, :product_id, :run, :scraped_at, :price, :original_price, :discount, :rating, :reviews_count)
+"""
+
+# Values the price history keeps for every product of every run
+HISTORY_COLUMNS = ("price", "original_price", "discount", "rating", "reviews_count")
+
+UPSERT = """
+INSERT INTO products (platform, product_id, link, title, brand, seller, price, original_price, discount, rating,
+                      reviews_count, search_term, details, first_scraped, scraped_at)
+VALUES (:platform, :product_id, :link, :title, :brand, :seller, :price, :original_price, :discount, :rating,
+        :reviews_count, :search_term, :details, :scraped_at, :scraped_at)
+ON CONFLICT (platform, product_id) DO UPDATE SET
+    link = excluded.link, title = excluded.title, brand = excluded.brand, seller = excluded.seller,
+    price = excluded.price, original_price = excluded.original_price, discount = excluded.discount,
+    rating = excluded.rating, reviews_count = excluded.reviews_count, search_term = excluded.search_term,
+    details = excluded.details, scraped_at = excluded.scraped_at
+"""
+
+# Where each platform's product ID is found in a product link
+PRODUCT_ID_PATTERNS = {
+    "amazon": re.compile(r"/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})"),  # ASIN
+    "flipkart": re.compile(r"[?&]pid=([A-Z0-9]+)"),
+    "myntra": re.compile(r"/(\d+)/buy"),
+    "ajio": re.compile(r"/p/([\w-]+)"),
+}
+
+
+def product_id(platform, link):
+    """
+    Canonical ID of a product: the ASIN, Flipkart pid or Myntra/Ajio item code in its link.
+
+    Tracking parameters do not change it, and sponsored links that wrap the product URL
+    (e.g. Amazon's /sspa/click?url=...) give the same ID as the plain one.
+
+    :param platform: Platform the link belongs to
+    :param link: Product page URL
+    :return: The ID, the link without query and fragment if it has none, None without a link
+    """
+    if not link:
+        return None
+    pattern = PRODUCT_ID_PATTERNS.get(platform)
+    found = pattern.search(unquote(link)) if pattern else None
+    if found:
+        return found.group(1)
+    return re.split(r"[?#]", link)[0]
+
+
+def search_key(search_term):
+    """
+    Normalized search term: 'Running Shoes', 'running+shoes' and 'running_shoes' all give 'running_shoes'.
+
+    The scrapers take the term from the result page URL, so this is what the store matches searches on.
+    """
+    return re.sub(r"[^\w]+", "_", unquote_plus(search_term).lower().replace("_", " ")).strip("_")[:30]
+
+
+class ProductStore:
+    """
+    Local SQLite database of every product scraped, one row per platform and product ID.
+
+    Scraping a product again updates its row, so the database holds the latest details of each product
+    and can be queried by brand, price, rating and scrape time without reading the output files. Runs
+    also append the prices they saw to an append-only price history, one row per product and run. The
+    connection is opened on first use and shared by the threads of the process behind a lock.
+    """
+
+    def __init__(self, path=None):
+        """
+        :param path: Database file (defaults to Config.PRODUCT_DB)
+        """
+        self.path = path or Config.PRODUCT_DB
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        if self.connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Scheduler workers write from their own processes; WAL lets them read while another one writes
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self.connection = connection
+        return self.connection
+
+    def upsert(self, platform, records, search_term=None, scraped_at=None, run=None, unchanged=()):
+        """
+        Inserts or updates products in one transaction.
+
+        :param platform: Platform the products were scraped from
+        :param records: Product details; records without a link are skipped
+        :param search_term: Search the products were found with
+        :param scraped_at: Scrape time in epoch seconds (defaults to now)
+        :param run: Name of the scrape run; the prices of the products are then appended to the price history
+        :param unchanged: Products the run saw whose stored details are current (taken from the store or
+                          the page cache); only their prices are appended to the history
+        :return: Number of products written
+        """
+        scraped_at = scraped_at or time.time()
+        rows = self._rows(platform, records, search_term, scraped_at)
+        history = rows + self._rows(platform, unchanged, search_term, scraped_at)
+        if rows or (history and run):
+            with self.lock:
+                connection = self.connect()
+                with connection:
+                    connection.executemany(UPSERT, rows)
+                    if run:
+                        connection.execute("INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?)",
+                                           (run, platform, search_term and search_key(search_term), scraped_at))
+                        connection.executemany(HISTORY_INSERT, [dict(row, run=run) for row in history])
+        return len(rows)
+
+    def _rows(self, platform, records, search_term, scraped_at):
+        rows = []
+        for record in records:
+            key = product_id(platform, record.get('link'))
+            if key is None:
+                continue
+            rows.append({
+                "platform": platform,
+                "product_id": key,
+                "link": record.get('link'),
+                "title": record.get('title'),
+                "brand": record.get('brand_name') or record.get('Brand'),
+                "seller": record.get('seller_name'),
+                "price": number(record.get('discounted_price')),
+                "original_price": number(record.get('original_price')),
+                "discount": number(record.get('discount_percentage')),
+                "rating": number(record.get('rating')),
+                "reviews_count": number(record.get('reviews_count')),
+                "search_term": search_key(search_term) if search_term else None,
+                "details": json.dumps(record, ensure_ascii=False),
+                "scraped_at": scraped_at,
+            })
+        return rows
+
+    def query(self, platform=None, brand=None, max_price=None, min_price=None, min_rating=None,
+              scraped_after=None, search_term=None, limit=100, offset=0):
+        """
+        Products matching all the given conditions, cheapest first.
+
+        :param platform: Platform name
+        :param brand: Brand name (case-insensitive)
+        :param max_price: Highest price
+        :param min_price: Lowest price
+        :param min_rating: Rating the products must exceed
+        :param scraped_after: Only products scraped since this epoch time
+        :param search_term: Search the products were last found with
+        :param limit: Maximum number of products, -1 for all
+        :param offset: Products to skip, for paging
+        :return: List of dicts with the stored details plus platform, product_id, first_scraped and scraped_at
+        """
+        conditions, parameters = [], []
+        for condition, value in (("platform = ?", platform), ("brand = ? COLLATE NOCASE", brand),
+                                 ("price <= ?", max_price), ("price >= ?", min_price), ("rating > ?", min_rating),
+                                 ("scraped_at >= ?", scraped_after),
+                                 ("search_term = ?", search_term and search_key(search_term))):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        sql = "SELECT * FROM products"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY price IS NULL, price LIMIT ? OFFSET ?"
+        with self.lock:
+            rows = self.connect().execute(sql, parameters + [limit, offset]).fetchall()
+        return [self._product(row) for row in rows]
+
+    def get(self, platform, key):
+        """The stored product with this ID, None if it was never scraped."""
+        with self.lock:
+            row = self.connect().execute("SELECT * FROM products WHERE platform = ? AND product_id = ?",
+                                         (platform, key)).fetchone()
+        return self._product(row) if row else None
+
+    def fresh(self, platform, keys, since):
+        """
+        The stored products among the given IDs that were scraped since a point in time.
+
+        :param platform: Platform name
+        :param keys: Product IDs
+        :param since: Epoch time
+        :return: Dict of product ID -> product
+        """
+        keys = list(keys)
+        found = {}
+        with self.lock:
+            connection = self.connect()
+            for start in range(0, len(keys), 500):  # Stays below SQLite's limit of query parameters
+                chunk = keys[start:start + 500]
+                rows = connection.execute(
+                    f"SELECT * FROM products WHERE platform = ? AND scraped_at >= ? "
+                    f"AND product_id IN ({', '.join('?' * len(chunk))})", [platform, since] + chunk).fetchall()
+                found.update((row["product_id"], self._product(row)) for row in rows)
+        return found
+
+    def price_series(self, platform, key):
+        """
+        Price history of one product.
+
+        :param platform: Platform name
+        :param key: Product ID
+        :return: List of dicts with run, scraped_at, price, original_price, discount, rating and reviews_count, oldest first
+        """
+        with self.lock:
+            rows = self.connect().execute(
+                "SELECT run, scraped_at, price, original_price, discount, rating, reviews_count FROM price_history "
+                "WHERE platform = ? AND product_id = ? ORDER BY scraped_at", (platform, key)).fetchall()
+        return [dict(row) for row in rows]
+
+    def runs(self, platform=None, search_term=None, limit=100):
+        """
+        Recorded scrape runs, newest first.
+
+        :param platform: Platform name
+        :param search_term: Search of the runs
+        :param limit: Maximum number of runs
+        :return: List of dicts with run, platform, search_term, started and products
+        """
+        conditions, parameters = [], []
+        for condition, value in (("runs.platform = ?", platform),
+                                 ("runs.search_term = ?", search_term and search_key(search_term))):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        sql = ("SELECT runs.*, (SELECT COUNT(DISTINCT product_id) FROM price_history "
+               "WHERE price_history.run = runs.run) AS products FROM runs")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY started DESC LIMIT ?"
+        with self.lock:
+            rows = self.connect().execute(sql, parameters + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def run_diff(self, run, previous=None):
+        """
+        Differences between a run and an earlier one: price drops and rises, new and delisted products.
+
+        Both runs are loaded as frames and compared in one outer join on the product ID.
+
+        :param run: Name of the run
+        :param previous: Run to compare with (defaults to the run of the same search before it)
+        :return: Dict with run, previous_run, price_drops, price_rises, new and delisted lists;
+                 None if the run is unknown
+        """
+        import pandas as pd  # Only the diffs need it, the scrapers and the web app start without it
+
+        with self.lock:
+            connection = self.connect()
+            current = connection.execute("SELECT * FROM runs WHERE run = ?", (run,)).fetchone()
+            if current is None:
+                return None
+            if previous is None:
+                row = connection.execute(
+                    "SELECT run FROM runs WHERE platform = ? AND search_term IS ? AND started < ? "
+                    "ORDER BY started DESC LIMIT 1",
+                    (current["platform"], current["search_term"], current["started"])).fetchone()
+                previous = row["run"] if row else None
+            frames = [pd.read_sql_query(
+                f"SELECT product_id, {', '.join(HISTORY_COLUMNS)} FROM price_history WHERE run = ?",
+                connection, params=(name,)).drop_duplicates("product_id", keep="last") for name in (run, previous)]
+
+        merged = frames[0].merge(frames[1], on="product_id", how="outer", suffixes=("", "_previous"), indicator=True)
+        both = merged[merged["_merge"] == "both"]
+        both = both.assign(change=both["price"] - both["price_previous"])
+
+        def products(frame, columns):
+            frame = frame[["product_id"] + columns].astype(object)
+            return frame.where(frame.notna(), None).to_dict("records")
+
+        prices = ["price", "price_previous"]
+        return {
+            "run": run,
+            "previous_run": previous,
+            "price_drops": products(both[both["change"] < 0], prices + ["change"]),
+            "price_rises": products(both[both["change"] > 0], prices + ["change"]),
+            "new": products(merged[merged["_merge"] == "left_only"], list(HISTORY_COLUMNS)),
+            "delisted": products(merged[merged["_merge"] == "right_only"],
+                                 [f"{column}_previous" for column in HISTORY_COLUMNS]),
+        }
+
+    def batch(self, platform, search_term=None, run=None):
+        """
+        Returns a writer that collects a scrape's products for batched upserts, None if Config.STORE_PRODUCTS is off.
+
+        :param platform: Platform of the scrape
+        :param search_term: Search of the scrape
+        :param run: Name of the run, for the price history (e.g. the name of its output files)
+        :return: ProductBatch
+        """
+        return ProductBatch(self, platform, search_term, run) if Config.STORE_PRODUCTS else None
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    @staticmethod
+    def _product(row):
+        product = json.loads(row["details"])
+        product.update(platform=row["platform"], product_id=row["product_id"],
+                       first_scraped=row["first_scraped"], scraped_at=row["scraped_at"])
+        return product
+
+
+class ProductBatch:
+    """
+    Products of one scrape waiting to be upserted, written like a JsonlWriter: write() buffers and the
+    function writer() returns stores the buffered batch (in a thread when called from the event loop).
+    """
+
+    def __init__(self, store, platform, search_term=None, run=None):
+        self.store = store
+        self.platform = platform
+        self.search_term = search_term
+        self.run = run
+        self.buffer = []
+        self.unchanged = []
+
+    def write(self, record, unchanged=False):
+        """Buffers a product; unchanged ones (taken from the store or cache) only go to the price history."""
+        (self.unchanged if unchanged else self.buffer).append(dict(record))
+
+    def writer(self):
+        """Takes the buffered products and returns the function that upserts them."""
+        records, self.buffer = self.buffer, []
+        unchanged, self.unchanged = self.unchanged, []
+
+        def write():
+            if records or unchanged:
+                self.store.upsert(self.platform, records, self.search_term, run=self.run, unchanged=unchanged)
+        return write
+
+
+product_store = ProductStore()
\ No newline at end of file
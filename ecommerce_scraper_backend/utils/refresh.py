@@ -0,0 +1,123 @@
+# utils/refresh.py
+import importlib
+import json
+from datetime import datetime
+from utils.terminal import output_queue
+from utils.crawler import Crawler
+from utils.event_loop import run_blocking
+from utils.file_handler import JsonlWriter, JsonlRecords, save_scraped_data, convert_to_csv, number, output_columns
+from utils.http_fetch import HttpFetcher
+from utils.product_store import product_store, search_key
+
+
+# Fields that change between two scrapes of the same product; a refresh re-fetches only these
+VOLATILE_FIELDS = ("discounted_price", "original_price", "discount_percentage", "rating", "reviews_count",
+                   "ratings_&_reviews_count", "last_month_sales")
+
+
+def changes(previous, current):
+    """
+    Compares the refreshed values of a product with the stored ones.
+
+    :param previous: Stored product details
+    :param current: Refreshed product details
+    :return: Dict of key -> (previous value, current value) for the values that changed
+    """
+    changed = {}
+    for key, value in current.items():
+        if key == 'link' or value is None:
+            continue
+        old = previous.get(key)
+        # Compare numbers as numbers, so '₹1,299' and 1299 are the same price
+        if number(old) is not None and number(value) is not None:
+            same = number(old) == number(value)
+        else:
+            same = old == value
+        if not same:
+            changed[key] = (old, value)
+    return changed
+
+
+async def refresh_prices(query):
+    """
+    Price-only refresh of the products the store has for a search: re-fetches just the volatile
+    fields, over HTTP where the platform renders them server-side, and saves only the products
+    whose values changed.
+
+    :param query: ScrapeQuery with refresh set; its fields pick among VOLATILE_FIELDS (all by default)
+                  and max_items caps the number of products checked
+    :return: Summary of the saved files, None if the store has no products for the search
+    """
+    platform = query.platform
+    scraper = importlib.import_module(f"scrapers.{platform}_scraper")
+    spec_fields = scraper.PRODUCT_PAGE_SPEC.fields
+    fields = [field for field in VOLATILE_FIELDS if field in spec_fields and (not query.fields or field in query.fields)]
+    if not fields:
+        fields = [field for field in VOLATILE_FIELDS if field in spec_fields]
+
+    previous = await run_blocking(product_store.query, platform=platform, search_term=query.search_term,
+                                  limit=query.max_items or -1)
+    previous = [product for product in previous if product.get('link')]
+    if not previous:
+        output_queue.put(f"No stored {platform} products for '{query.search_term}' to refresh; scrape the search first.")
+        return None
+    output_queue.put(f"Refreshing {', '.join(fields)} of {len(previous)} products...")
+
+    # Amazon and Flipkart render prices server-side, so the pages are downloaded and the browser is only the fallback
+    fetcher = HttpFetcher() if hasattr(scraper, "HTTP_REQUIRED_FIELDS") else None
+    crawler = Crawler(fields, scraper.extract_product_details, parse_page=scraper.parse_product_page,
+                      required_fields=("discounted_price",), parse_only=getattr(scraper, "PRODUCT_PAGE_SECTIONS", None),
+                      platform=platform, use_cache=False)
+    listing = [{'link': product['link']} for product in previous]
+    try:
+        await crawler.visit_products(listing, fetcher=fetcher)
+    finally:
+        if fetcher is not None:
+            await fetcher.close()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{platform}_{search_key(query.search_term)}_prices_{timestamp}"
+    results = JsonlWriter(f"{filename}.jsonl")
+    refreshed = []
+    for product, current in zip(previous, listing):
+        if all(current.get(field) is None for field in fields):
+            continue  # The page could not be read; keep the stored values
+        changed = changes(product, current)
+        details = {key: value for key, value in product.items()
+                   if key not in ('platform', 'product_id', 'first_scraped', 'scraped_at')}
+        details.update((key, value) for key, value in current.items() if value is not None)
+        refreshed.append(details)
+        if changed:
+            record = {"product_id": product['product_id'], "title": product.get('title'), "link": product['link']}
+            for key, (old, new) in changed.items():
+                record[key] = new
+                record[f"previous_{key}"] = old
+            results.write(record)
+    await run_blocking(results.flush)
+    await run_blocking(product_store.upsert, platform, refreshed, query.search_term, run=filename)
+
+    json_filename = f"{filename}.json"
+    csv_filename = f"{filename}.csv"
+    records = JsonlRecords(results.filename)
+    await run_blocking(save_scraped_data, records, json_filename)
+    columns = output_columns(fields, scraper.FIELD_COLUMNS)
+    fixed_columns = ["product_id", "title", "link"] + columns + [f"previous_{column}" for column in columns]
+    await run_blocking(convert_to_csv, records, csv_filename, fixed_columns=fixed_columns)
+
+    output_queue.put("\n")
+    output_queue.put(f"Refresh completed! {len(refreshed)} of {len(previous)} products checked, "
+                     f"{results.count} changed. Changes saved to '{filename}'.")
+    summary = {
+        "type": "refresh_complete",
+        "filenames": {
+            "jsonl": results.filename,
+            "json": json_filename,
+            "csv": csv_filename,
+        },
+        "search_term": query.search_term,
+        "timestamp": timestamp,
+        "products_checked": len(refreshed),
+        "products_scraped": results.count,
+    }
+    output_queue.put(json.dumps(summary))
+    return summary
\ No newline at end of file
@@ -0,0 +1,307 @@
+# utils/scheduler.py
+import atexit
+import importlib
+import multiprocessing
+import queue
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from config import Config
+from utils.batch import ScrapeQuery, PLATFORMS
+from utils.driver_pool import driver_pool
+from utils.jobs import Job, register
+
+
+def load_scraper(platform, refresh=False):
+    """Imports the scraper coroutine function of a platform, or the price refresh when refresh is set."""
+    if refresh:
+        return importlib.import_module("utils.refresh").refresh_prices
+    module = importlib.import_module(f"scrapers.{platform}_scraper")
+    return getattr(module, f"{platform}_scrape")
+
+
+def platform_quotas(setting=None):
+    """
+    Parses per-platform concurrency quotas.
+
+    :param setting: 'platform=jobs' pairs separated by commas, e.g. 'amazon=2,ajio=1' (defaults to Config.PLATFORM_QUOTAS)
+    :return: Dict of platform -> jobs allowed to run at once
+    """
+    setting = Config.PLATFORM_QUOTAS if setting is None else setting
+    quotas = {}
+    for pair in setting.split(","):
+        if pair.strip():
+            platform, jobs = pair.split("=")
+            quotas[platform.strip()] = int(jobs)
+    return quotas
+
+
+class Worker:
+    """A worker process of the scheduler and the job it runs."""
+
+    def __init__(self, number, context, outbox):
+        self.number = number
+        self.inbox = context.Queue()
+        self.process = context.Process(target=worker_main, args=(self.inbox, outbox, number),
+                                       name=f"scrape-worker-{number}", daemon=True)
+        self.process.start()
+        self.job = None
+        self.busy_since = None
+        self.busy_seconds = 0.0
+
+    def send(self, *message):
+        self.inbox.put(message)
+
+
+class Scheduler:
+    """
+    Dispatches scrape jobs to a pool of worker processes.
+
+    Each worker runs one job at a time on its own crawl loop and browsers, relaying the job's
+    terminal output back and its input and cancellation in. Queued jobs start by priority (higher
+    first), then fairly between users (the user served longest ago first), then in submission
+    order, as long as their platform's quota of running jobs allows.
+    """
+
+    def __init__(self, workers=None, quotas=None):
+        """
+        :param workers: Number of worker processes (defaults to Config.SCHEDULER_WORKERS)
+        :param quotas: Dict of platform -> jobs allowed to run at once (defaults to Config.PLATFORM_QUOTAS;
+                       platforms without a quota may use every worker)
+        """
+        self.max_workers = workers or Config.SCHEDULER_WORKERS
+        self.quotas = platform_quotas() if quotas is None else quotas
+        self.context = multiprocessing.get_context("spawn")
+        self.outbox = None
+        self.workers = []
+        self.pending = []
+        self.running = {}  # job id -> Job
+        self.last_served = {}  # user -> dispatch number of their last started job
+        self.dispatches = 0
+        self.started = time.time()
+        self.lock = threading.RLock()
+        self.collector = None
+
+    def submit(self, job):
+        """Queues a registered job."""
+        with self.lock:
+            job.status = "queued"
+            self.pending.append(job)
+            self._dispatch()
+        return job
+
+    def cancel(self, job):
+        """
+        Cancels a queued or running job.
+
+        :return: False if the job had already finished
+        """
+        with self.lock:
+            if job in self.pending:
+                self.pending.remove(job)
+                job.finish("cancelled")
+                return True
+            if job.id in self.running:
+                job.worker.send("cancel", job.id)
+                return True
+        if job.future is not None and not job.done():
+            # Started on this process' crawl loop by the legacy endpoints
+            job.cancel()
+            return True
+        return False
+
+    def send_input(self, job, text):
+        """Passes a prompt answer to a job; answers to queued jobs wait until the job starts."""
+        with self.lock:
+            if job.id in self.running:
+                job.worker.send("input", job.id, text)
+            else:
+                job.inputs.put(text)
+
+    def stats(self):
+        """Queue depth and worker utilization, for sizing the pool."""
+        with self.lock:
+            now = time.time()
+            busy = [worker for worker in self.workers if worker.job is not None]
+            busy_seconds = sum(worker.busy_seconds + (now - worker.busy_since if worker.job else 0)
+                               for worker in self.workers)
+            uptime = now - self.started
+            return {
+                "workers": self.max_workers,
+                "workers_started": len(self.workers),
+                "workers_busy": len(busy),
+                "utilization": len(busy) / self.max_workers,
+                "average_utilization": busy_seconds / (self.max_workers * uptime) if uptime else 0.0,
+                "queue_depth": len(self.pending),
+                "queued_by_platform": dict(Counter(job.platform for job in self.pending)),
+                "running_by_platform": dict(Counter(job.platform for job in self.running.values())),
+                "oldest_queued_seconds": max((now - job.created for job in self.pending), default=0.0),
+                "quotas": self.quotas,
+            }
+
+    def shutdown(self, timeout=10):
+        """Stops the workers; running jobs are cancelled."""
+        with self.lock:
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.send("stop")
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def _next_job(self):
+        running = Counter(job.platform for job in self.running.values())
+        candidates = [job for job in self.pending
+                      if running[job.platform] < self.quotas.get(job.platform, self.max_workers)]
+        if not candidates:
+            return None
+        top = max(job.priority for job in candidates)
+        return min((job for job in candidates if job.priority == top),
+                   key=lambda job: (self.last_served.get(job.user, -1), job.sequence))
+
+    def _dispatch(self):
+        """Starts queued jobs on idle workers, launching workers up to max_workers."""
+        while self.pending:
+            # No worker is launched while the quotas hold back every queued job
+            job = self._next_job()
+            if job is None:
+                return
+            worker = next((worker for worker in self.workers if worker.job is None), None)
+            if worker is None and len(self.workers) < self.max_workers:
+                worker = self._start_worker()
+            if worker is None:
+                return
+
+            self.pending.remove(job)
+            self.running[job.id] = job
+            self.dispatches += 1
+            self.last_served[job.user] = self.dispatches
+            worker.job = job
+            worker.busy_since = time.time()
+            job.worker = worker
+            job.status = "running"
+            job.started = time.time()
+            worker.send("run", job.id, job.platform, job.query.to_dict() if job.query else None)
+            while not job.inputs.empty():
+                worker.send("input", job.id, job.inputs.get())
+
+    def _start_worker(self):
+        if self.outbox is None:
+            self.outbox = self.context.Queue()
+            self.collector = threading.Thread(target=self._collect, name="scheduler-collector", daemon=True)
+            self.collector.start()
+        number = next(number for number in range(len(self.workers) + 1)
+                      if number not in {worker.number for worker in self.workers})
+        worker = Worker(number, self.context, self.outbox)
+        self.workers.append(worker)
+        return worker
+
+    def _collect(self):
+        """Relays the workers' messages to the jobs and replaces workers that died."""
+        while True:
+            # Checked on every message too, so a dead worker is noticed while other jobs keep talking
+            self._check_workers()
+            try:
+                message = self.outbox.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            kind, job_id = message[0], message[1]
+            with self.lock:
+                job = self.running.get(job_id)
+                if job is None:
+                    continue
+                if kind == "event":
+                    job.events.put(message[2])
+                elif kind == "done":
+                    self._release(job)
+                    job.finish(*message[2:])
+                    self._dispatch()
+
+    def _check_workers(self):
+        with self.lock:
+            for worker in list(self.workers):
+                if not worker.process.is_alive():
+                    self.workers.remove(worker)
+                    if worker.job is not None:
+                        job = worker.job
+                        self._release(job)
+                        job.finish("failed", error=f"Worker process exited with code {worker.process.exitcode}")
+            self._dispatch()
+
+    def _release(self, job):
+        worker = job.worker
+        self.running.pop(job.id, None)
+        if worker is not None and worker.job is job:
+            worker.busy_seconds += time.time() - worker.busy_since
+            worker.job = None
+            worker.busy_since = None
+
+
+def worker_main(inbox, outbox, number=0):
+    """
+    Entry point of a worker process: runs the jobs sent to its inbox on its own crawl loop.
+
+    :param inbox: Queue of ('run', job id, platform, query dict), ('input', job id, text),
+                  ('cancel', job id) and ('stop',) messages
+    :param outbox: Queue of ('event', job id, text) and ('done', job id, status, result, error) messages
+    :param number: Number of the worker; its browsers get their own profiles under worker-<number>
+    """
+    # A running browser locks its user-data-dir, so the workers and the web app cannot share session slots
+    driver_pool.profile_dir = Path(Config.BROWSER_PROFILE_DIR) / f"worker-{number}"
+    jobs = {}
+    while True:
+        message = inbox.get()
+        kind = message[0]
+        if kind == "stop":
+            for job in jobs.values():
+                job.cancel()
+            return
+
+        job_id = message[1]
+        if kind == "run":
+            platform, query = message[2], message[3]
+            job = Job(platform, query=ScrapeQuery.from_dict(query) if query else None, job_id=job_id)
+            jobs[job_id] = job
+            threading.Thread(target=_relay_events, args=(job, outbox, jobs), daemon=True).start()
+            try:
+                job.start(load_scraper(platform, refresh=job.query is not None and job.query.refresh))
+            except Exception as e:
+                job.finish("failed", error=str(e))
+        elif job_id in jobs:
+            if kind == "input":
+                jobs[job_id].inputs.put(message[2])
+            elif kind == "cancel":
+                jobs[job_id].cancel()
+
+
+def _relay_events(job, outbox, jobs):
+    while True:
+        event = job.events.get()
+        if event is None:
+            break
+        outbox.put(("event", job.id, event))
+    jobs.pop(job.id, None)
+    outbox.put(("done", job.id, job.status, job.result, job.error))
+
+
+def schedule_job(platform, query=None, priority=0, user=None):
+    """
+    Creates, registers and queues a job on the worker processes.
+
+    :param platform: Name of the scraped platform
+    :param query: ScrapeQuery for a scrape without prompts; without one the job asks on its input channel
+    :param priority: Higher priorities start first
+    :param user: Who submitted the job, for fair sharing of the workers
+    :return: Job
+    """
+    if platform not in PLATFORMS:
+        raise ValueError(f"Invalid platform: {platform}")
+    return scheduler.submit(register(Job(platform, query=query, priority=priority, user=user)))
+
+
+# Scheduler of the web app and the CLI
+scheduler = Scheduler()
+atexit.register(scheduler.shutdown)
@@ -1,5 +1,37 @@
+import asyncio
 import queue
+from utils.jobs import current_job
+
+
+class TerminalChannel:
+    """
+    Queue that belongs to the job running in the current context.
+
+    Scrapers and utils keep calling put()/get() on the module-level queues; inside a job the calls
+    go to the job's own channel, outside of one (and for the legacy endpoints) to the shared queue.
+    """
+
+    def __init__(self, job_attribute):
+        self.job_attribute = job_attribute
+        self.shared = queue.Queue()
+
+    def current(self):
+        job = current_job.get()
+        return self.shared if job is None else getattr(job, self.job_attribute)
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
 
 # Global queues for communication
-output_queue = queue.Queue()  # For scraper outputs to frontend
-input_queue = queue.Queue()   # For frontend inputs to scraper
\ No newline at end of file
+output_queue = TerminalChannel("events")  # For scraper outputs to frontend
+input_queue = TerminalChannel("inputs")   # For frontend inputs to scraper
+
+
+async def read_input(poll_interval=0.2):
+    """Waits for the next frontend input without blocking the crawl event loop."""
+    while True:
+        try:
+            return input_queue.get_nowait()
+        except queue.Empty:
+            await asyncio.sleep(poll_interval)
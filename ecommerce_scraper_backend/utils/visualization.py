@@ -1,245 +1,170 @@
 # utils/visualization.py
-import pandas as pd
-import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Set Agg backend to avoid GUI issues
-import matplotlib.pyplot as plt
-import seaborn as sns
-from wordcloud import WordCloud
-import re
 import os
+import atexit
+import hashlib
 import contextlib
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, BrokenExecutor
 from pathlib import Path
 import zipfile
+from config import Config
+from utils.file_cache import FileCache
+from utils.word_frequency import TitleWords
+
+
+# Chart name (also the prefix of its file) -> drawing function in utils/charts.py, columns it reads and label for messages
+CHARTS = {
+    'wordcloud': ('generate_wordcloud', ('word', 'count'), "wordcloud"),
+    'price_distribution': ('plot_price_distribution', ('discounted_price',), "price distribution"),
+    'price_vs_ratings': ('plot_price_vs_ratings', ('discounted_price', 'rating'), "price vs rating"),
+    'top_brands': ('plot_top_brands_by_reviews', ('brand_name', 'reviews_count'), "brands by reviews"),
+    'heatmap': ('plot_heatmap', ('discount_percentage', 'last_month_sales', 'rating'), "heatmap"),
+}
+
+# Rendered charts by the hash of their input; bump the version when a chart's look changes
+CHART_CACHE_VERSION = 1
+chart_cache = FileCache(Config.CHART_CACHE_DIR, Config.CHART_CACHE_MAX_MB * 1024 * 1024)
+
+_chart_pool = None
+_chart_pool_lock = threading.Lock()
+
+
+def chart_pool():
+    """
+    Returns the pool the charts are rendered in, started on first use.
+
+    A process pool where possible; the scheduler's worker processes are daemonic and cannot start
+    processes of their own, so there the charts are rendered in threads.
+    """
+    global _chart_pool
+    with _chart_pool_lock:
+        if _chart_pool is None:
+            if multiprocessing.current_process().daemon:
+                _chart_pool = ThreadPoolExecutor(Config.CHART_WORKERS, thread_name_prefix="chart")
+            else:
+                # Spawned workers, as forking a process with running threads (e.g. the crawl loop) is unsafe
+                _chart_pool = ProcessPoolExecutor(Config.CHART_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _chart_pool
+
+
+def discard_chart_pool(pool):
+    """Forgets a broken pool (e.g. a worker process was killed), so the next charts start a new one."""
+    global _chart_pool
+    with _chart_pool_lock:
+        if _chart_pool is pool:
+            _chart_pool = None
+    pool.shutdown(wait=False)
+
+
+@atexit.register
+def shutdown_chart_pool():
+    if _chart_pool is not None:
+        _chart_pool.shutdown(wait=False)
+
+
+def save_cached_chart(data, filename, visualization_dir):
+    """Writes a chart from the cache under this run's filename; returns the filename, None for a skipped chart."""
+    if not data:
+        return None
+    Path(visualization_dir, filename).write_bytes(data)
+    return filename
+
+
+def render_chart(name, df, visualization_dir, search_term, timestamp):
+    """
+    Draws one chart and saves it as a PNG file.
+
+    :param name: Key of CHARTS
+    :param df: DataFrame with the columns the chart reads
+    :return: Filename of the chart, None if it was skipped (the data has nothing to draw)
+    :raises Exception: Whatever failed the drawing; unlike a skip, a failure is not cached
+    """
+    function_name, _, _ = CHARTS[name]
+    filename = f"{name}_{search_term}_{timestamp}.png"
+    path = os.path.join(visualization_dir, filename)
+    # Cleanup existing files before generating new ones
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+    function = getattr(importlib.import_module("utils.charts"), function_name)
+    return filename if function(df, path) else None
+
+
+def chart_key(name, chart_data):
+    """Cache key of a chart: its name and a hash of the columns it reads."""
+    content = chart_data.to_json(orient='split', index=False, default_handler=str)
+    return f"chart:{CHART_CACHE_VERSION}:{name}:{hashlib.sha1(content.encode('utf-8')).hexdigest()}"
+
+
+def generate_visualizations(data, search_term, timestamp, words=None):
+    """
+    Renders the five charts concurrently and packs them into a ZIP file.
+
+    Only the columns the charts read are loaded, one record at a time, and each chart gets only its own;
+    a chart that fails or is skipped does not hold up the others. Charts of the same data are copied from the chart cache instead of being rendered again.
+
+    :param data: Records, a list or any iterable (e.g. JsonlRecords)
+    :param words: TitleWords counted while the titles were scraped; counted from data's titles without one
+    :return: (dict of chart name -> filename or None, ZIP filename)
+    """
+    import pandas as pd  # Loaded on the first charts, the web app starts without it
 
-def generate_visualizations(data, search_term, timestamp):
     try:
-        df = pd.DataFrame(data)
+        columns = list(dict.fromkeys(column for name, (_, chart_columns, _) in CHARTS.items()
+                                     if name != 'wordcloud' for column in chart_columns))
+        present = set()  # Columns some record has, like the columns of a frame of all the records
+        count_titles = words is None
+        if count_titles:
+            words = TitleWords(search_term)
+
+        def rows():
+            for record in data:
+                present.update(column for column in columns if column in record)
+                if count_titles:
+                    words.add(record.get('title'))
+                yield tuple(record.get(column) for column in columns)
+
+        df = pd.DataFrame.from_records(rows(), columns=columns)
+        df = df[[column for column in columns if column in present]]
+        frames = {'wordcloud': pd.DataFrame(list(words.frequencies().items()), columns=['word', 'count'])}
         visualization_dir = str(Path.home() / "Downloads")
         os.makedirs(visualization_dir, exist_ok=True)
 
-        # 1. Word Cloud for 'title'
-        def generate_wordcloud(df, search_term, timestamp):
+        # Generate all visualizations; charts the cache has are copied, the others rendered in the pool
+        pool = chart_pool()
+        futures = {}
+        keys = {}
+        visualizations = {}
+        for name, (_, columns, label) in CHARTS.items():
+            chart_data = frames[name] if name in frames else df[[column for column in columns if column in df.columns]]
+            keys[name] = chart_key(name, chart_data)
+            cached = chart_cache.get(keys[name])
+            if cached is not None:
+                visualizations[name] = save_cached_chart(cached, f"{name}_{search_term}_{timestamp}.png",
+                                                         visualization_dir)
+                continue
             try:
-                # Cleanup existing files before generating new ones
-                with contextlib.suppress(FileNotFoundError):
-                    os.remove(f"{visualization_dir}/wordcloud_{search_term}_{timestamp}.png")
-                
-                if 'title' not in df.columns or df['title'].isnull().all():
-                    print("Skipping wordcloud chart: 'title' column missing or empty.")
-                    return None
-
-                titles = df['title'].dropna().astype(str).tolist()
-                if not titles:
-                    print("Skipping wordcloud chart: No valid titles found.")
-                    return None
-                
-                
-                combined_titles = " ".join(titles)
-                cleaned_titles = re.sub(r'[^A-Za-z\s]', '', combined_titles)  # Remove numbers and special chars
-                wordcloud = WordCloud(width=1000, height=800, background_color="white").generate(cleaned_titles)
-
-                plt.figure(figsize=(10, 8))
-                plt.imshow(wordcloud, interpolation="bilinear")
-                plt.axis("off")
-                plt.title("Most Frequent Words in Product Titles", fontsize=20, pad=40)   # Adjust title position (1.0 is default)
-                plt.tight_layout()  # Adjust layout to prevent cutoff
-                wordcloud_filename = f"wordcloud_{search_term}_{timestamp}.png"
-                plt.savefig(os.path.join(visualization_dir, wordcloud_filename), dpi=100)
-                plt.close()
-                return wordcloud_filename
-
+                futures[name] = pool.submit(render_chart, name, chart_data, visualization_dir, search_term, timestamp)
             except Exception as e:
-                print(f"Skipping wordcloud chart: {e}")
-                return None
-
-        # 2. Price Distribution Histogram (Dynamic Bins)
-        def plot_price_distribution(df, search_term, timestamp):
+                print(f"Skipping {label} chart: {e}")
+        for name, (_, _, label) in CHARTS.items():
+            if name in visualizations:
+                continue
             try:
-                # Cleanup existing files before generating new ones
-                with contextlib.suppress(FileNotFoundError):
-                    os.remove(f"{visualization_dir}/price_distribution_{search_term}_{timestamp}.png")
-                    
-                df['discounted_price'] = pd.to_numeric(df['discounted_price'], errors='coerce')
-
-                # Calculate min and max dynamically
-                min_price = df['discounted_price'].min()
-                max_price = df['discounted_price'].max()
-
-                if pd.isna(min_price) or pd.isna(max_price) or min_price == max_price:
-                    print("Insufficient price data to generate distribution.")
-                    return None
-
-                # Automatically determine bin count (10 bins or adjust based on spread)
-                bin_count = 10  # Default
-                price_range = max_price - min_price
-
-                if price_range > 20000:
-                    bin_count = 20  # More bins for wide price ranges
-                elif price_range < 5000:
-                    bin_count = 8  # Fewer bins for narrow ranges
-
-                bin_size = (max_price - min_price) / bin_count
-                bins = [min_price + i * bin_size for i in range(bin_count + 1)]
-                labels = [f"{int(bins[i])}-{int(bins[i + 1])}" for i in range(len(bins) - 1)]
-
-                # Create a price range column
-                df['price_range'] = pd.cut(df['discounted_price'], bins=bins, labels=labels, right=False)
-
-                # Plot histogram
-                plt.figure(figsize=(10, 8))
-                df['price_range'].value_counts().sort_index().plot(kind='bar', color='skyblue')
-                plt.title("Price Distribution of Products", fontsize=20, pad=40)
-                plt.xlabel("Price Range (₹)", fontsize=16, labelpad=25)
-                plt.ylabel("Number of Products", fontsize=16, labelpad=25)
-                plt.xticks(rotation=45, ha='right', fontsize=14)
-                plt.yticks(fontsize=14)
-                plt.tight_layout()  # Adjust layout to prevent cutoff
-                price_distribution_filename = f"price_distribution_{search_term}_{timestamp}.png"
-                plt.savefig(os.path.join(visualization_dir, price_distribution_filename))
-                plt.close()
-                return price_distribution_filename
-
-            except Exception as e:
-                print(f"Skipping price distribution chart: {e}")
-                return None
-
-        # 3. Price vs Ratings Scatter Plot
-        def plot_price_vs_ratings(df, search_term, timestamp):
-            try:
-                # Cleanup existing files before generating new ones
-                with contextlib.suppress(FileNotFoundError):
-                    os.remove(f"{visualization_dir}/price_vs_ratings_{search_term}_{timestamp}.png")
-                    
-                df['discounted_price'] = pd.to_numeric(df['discounted_price'], errors='coerce')
-                df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
-
-                plt.figure(figsize=(10, 8))
-                plt.tight_layout()   # Adjust layout to prevent overlap (cut-off labels)
-                plt.scatter(df['discounted_price'], df['rating'], c='blue', alpha=0.5)
-                plt.title("Price vs Ratings", fontsize=20, pad=40)
-                plt.xlabel("Discounted Price (₹)", fontsize=16, labelpad=25)
-                plt.ylabel("Ratings", fontsize=16, labelpad=25)
-                plt.xticks(fontsize=14)
-                plt.yticks(fontsize=14)
-                plt.grid(True)
-                plt.tight_layout()  # Adjust layout to prevent overlap
-                price_vs_ratings_filename = f"price_vs_ratings_{search_term}_{timestamp}.png"
-                plt.savefig(os.path.join(visualization_dir, price_vs_ratings_filename))
-                plt.close()
-                return price_vs_ratings_filename
-
-            except Exception as e:
-                print(f"Skipping price vs rating chart: {e}")
-                return None
-
-        # 4. Top Brands by Reviews Count
-        def plot_top_brands_by_reviews(df, search_term, timestamp):
-            try:
-                # Cleanup existing files before generating new ones
-                with contextlib.suppress(FileNotFoundError):
-                    os.remove(f"{visualization_dir}/top_brands_{search_term}_{timestamp}.png")
-                    
-                df['reviews_count'] = pd.to_numeric(df['reviews_count'], errors='coerce')
-
-                top_brands = df.groupby('brand_name')['reviews_count'].sum().sort_values(ascending=False).head(10)
-
-                plt.figure(figsize=(10, 8))
-                top_brands.plot(kind='bar', color='orange')
-                plt.title("Top Brands by Total Reviews Count", fontsize=20, pad=40)
-                plt.xlabel("Brand Name", fontsize=16, labelpad=25)
-                plt.ylabel("Total Reviews", fontsize=16, labelpad=25)
-                plt.xticks(rotation=90, fontsize=14)
-                plt.yticks(fontsize=14)
-                plt.tight_layout()  # Adjust layout to prevent overlap and cutoff
-                top_brands_filename = f"top_brands_{search_term}_{timestamp}.png"
-                plt.savefig(os.path.join(visualization_dir, top_brands_filename))
-                plt.close()
-                return top_brands_filename
-
-            except Exception as e:
-                print(f"Skipping brands by reviews chart: {e}")
-                return None
-
-        # 5. Amazon Heatmap - Ratings vs Discount % (with Sales Gradient)
-        def plot_heatmap(df, search_term, timestamp):
-            try:
-                # Cleanup existing files before generating new ones
-                with contextlib.suppress(FileNotFoundError):
-                    os.remove(f"{visualization_dir}/heatmap_{search_term}_{timestamp}.png")
-                    
-                df['discount_percentage'] = pd.to_numeric(df['discount_percentage'].str.replace('%', ''), errors='coerce')
-                df['last_month_sales'] = pd.to_numeric(df['last_month_sales'].str.replace('+', ''), errors='coerce').replace(0, np.nan)  # Convert 0 to NaN
-                df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
-
-                # Sort values for better visualization
-                df = df.sort_values(by=['rating', 'discount_percentage'], ascending=[True, True])
-
-                # Replace missing 'last_month_sales' with NaN (no zeros)
-                df['last_month_sales'] = df['last_month_sales'].fillna(np.nan)
-
-                # Create pivot table (WITHOUT fill_value=0)
-                heatmap_data = df.pivot_table(index='rating', columns='discount_percentage', values='last_month_sales',
-                                              aggfunc='sum')
-                
-                # Replace 0 values in the pivot table with NaN
-                heatmap_data = heatmap_data.replace(0, np.nan)
-
-                # Create a mask for missing values (includes NaN and 0)
-                mask = heatmap_data.isnull()
-
-                # Set base figure size and adjust if needed
-                base_fig_width, base_fig_height = 10, 8
-                fig_width_user = min(16, max(10, int(0.75 * heatmap_data.shape[1])))
-                fig_height_user = min(12, max(8, int(0.75 * heatmap_data.shape[0])))
-
-                # Cap the size at (10, 8) to maintain consistency
-                fig_width = min(base_fig_width, fig_width_user)
-                fig_height = min(base_fig_height, fig_height_user)
-                
-                # Calculate font size based on box density
-                n_rows, n_cols = heatmap_data.shape
-                box_area = n_rows * n_cols
-                font_size = max(6, min(14, int(200 / (box_area if box_area > 0 else 1))))
-
-                plt.figure(figsize=(fig_width, fig_height))
-
-                # Draw heatmap
-                sns.heatmap(heatmap_data, cmap="viridis", fmt='.0f', annot=True, linewidths=0.5, linecolor='gray',
-                            cbar_kws={'label': 'Last Month Sales'}, mask=mask, annot_kws={"size": font_size})  # Reduce font size for annotations
-
-                # Get the color bar's axis and adjust label properties
-                cb_ax = plt.gcf().axes[-1]  # Last axis is the color bar
-                cb_ax.set_ylabel('Last Month Sales', fontsize=14, labelpad=15)  # Set font size and padding
-                
-                plt.title("Sales Heatmap (Ratings vs Discount %)", fontsize=20, pad=40)
-                plt.xlabel("Discount Percentage", fontsize=16, labelpad=25)
-                plt.ylabel("Ratings", fontsize=16, labelpad=25)
-
-                # Rotate x-axis labels to prevent overlap
-                plt.xticks(rotation=45, ha='right', fontsize=14)
-                plt.yticks(rotation=0, fontsize=14)
-
-                plt.tight_layout()  # Adjust layout to prevent overlap
-                heatmap_filename = f"heatmap_{search_term}_{timestamp}.png"
-                plt.savefig(os.path.join(visualization_dir, heatmap_filename))
-                plt.close()
-                return heatmap_filename
-
-            except Exception as e:
-                print(f"Skipping heatmap chart: {e}")
-                return None
-
-        # Generate all visualizations
-        visualizations = {
-            'wordcloud': generate_wordcloud(df, search_term, timestamp),
-            'price_distribution': plot_price_distribution(df, search_term, timestamp),
-            'price_vs_ratings': plot_price_vs_ratings(df, search_term, timestamp),
-            'top_brands': plot_top_brands_by_reviews(df, search_term, timestamp),
-            'heatmap': plot_heatmap(df, search_term, timestamp)
-        }
-
-        # Create ZIP Archive
+                visualizations[name] = futures[name].result() if name in futures else None
+            except Exception as e:  # e.g. the drawing failed or the worker died; not cached, the next call tries again
+                print(f"Skipping {label} chart: {e}")
+                visualizations[name] = None
+                if isinstance(e, BrokenExecutor):
+                    discard_chart_pool(pool)
+                continue
+            if name in futures:
+                # Skipped charts are cached as empty entries, as the same data skips them again
+                filename = visualizations[name]
+                chart_cache.put(keys[name], Path(visualization_dir, filename).read_bytes() if filename else b"")
+
+        # Create ZIP Archive; not cached, as it holds this run's filenames and zipping the charts is cheap
         zip_filename = f"{search_term}_{timestamp}_visuals.zip"
         zip_path = os.path.join(str(Path.home() / "Downloads"), zip_filename)
         with zipfile.ZipFile(zip_path, 'w') as zipf:
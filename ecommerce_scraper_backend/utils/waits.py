@@ -0,0 +1,97 @@
+# utils/waits.py
+import threading
+import time
+from config import Config
+
+# Selenium is imported by the functions that use it, so the wait statistics can be read without it
+
+
+# How often the readiness predicates are polled (seconds)
+POLL_FREQUENCY = 0.1
+
+# Time actually spent waiting, recorded per wait label
+wait_stats = {}
+wait_stats_lock = threading.Lock()
+
+
+def element_present(css_selector):
+    """Readiness predicate: an element matching css_selector is in the DOM."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    return EC.presence_of_element_located((By.CSS_SELECTOR, css_selector))
+
+
+def any_element_present(*css_selectors):
+    """Readiness predicate: at least one of the css_selectors matches an element."""
+    from selenium.webdriver.support import expected_conditions as EC
+    return EC.any_of(*(element_present(css_selector) for css_selector in css_selectors))
+
+
+def element_count_above(css_selector, count):
+    """Readiness predicate: more than count elements match css_selector (e.g. a grid that grows on scroll)."""
+    from selenium.webdriver.common.by import By
+
+    def predicate(driver):
+        return len(driver.find_elements(By.CSS_SELECTOR, css_selector)) > count
+    return predicate
+
+
+def wait_until(driver, condition, label, timeout=None):
+    """
+    Polls a readiness predicate instead of sleeping for a fixed time.
+
+    :param driver: WebDriver to poll
+    :param condition: Predicate called with the driver, e.g. one of the helpers above
+    :param label: Name the time spent waiting is recorded under
+    :param timeout: Maximum seconds to wait (defaults to Config.WAIT_TIMEOUT)
+    :return: The predicate's result, or None if it timed out
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    timeout = Config.WAIT_TIMEOUT if timeout is None else timeout
+    started = time.monotonic()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    except TimeoutException:
+        result = None
+    record_wait(label, time.monotonic() - started, timed_out=result is None)
+    return result
+
+
+def record_wait(label, seconds, timed_out=False):
+    """Adds one wait to the statistics of label."""
+    with wait_stats_lock:
+        stats = wait_stats.setdefault(label, {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        stats["timeouts"] += int(timed_out)
+
+
+def get_wait_stats():
+    """
+    Returns the recorded wait times.
+
+    :return: Dict of label -> count, total, average and max seconds waited, and the number of timeouts
+    """
+    with wait_stats_lock:
+        return {
+            label: {
+                "count": stats["count"],
+                "total": round(stats["total"], 3),
+                "average": round(stats["total"] / stats["count"], 3),
+                "max": round(stats["max"], 3),
+                "timeouts": stats["timeouts"],
+            }
+            for label, stats in wait_stats.items()
+        }
+
+
+def format_wait_stats():
+    """Returns the recorded wait times as one line per label, for the terminal output."""
+    lines = ["Time spent waiting for pages:"]
+    for label, stats in sorted(get_wait_stats().items()):
+        lines.append(f"{label}: {stats['count']} waits, avg {stats['average']}s, "
+                     f"max {stats['max']}s, {stats['timeouts']} timeouts")
+    return "\n".join(lines)
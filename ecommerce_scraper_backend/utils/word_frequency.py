@@ -0,0 +1,65 @@
+# utils/word_frequency.py
+import re
+from collections import Counter
+
+
+# Words of a title as the word cloud counted them before: letters only, a trailing 's dropped
+WORD = re.compile(r"[A-Za-z][A-Za-z']*")
+
+# Distinct spellings kept at most; beyond it the words seen only once are dropped
+MAX_TERMS = 50000
+
+
+class TitleWords:
+    """
+    Running word counts of the product titles of one search, for the word cloud.
+
+    Titles are counted as they are scraped, so the chart needs neither the titles nor one
+    string of all of them; memory grows with the vocabulary, not with the number of products.
+    Stopwords and the words of the search term are left out.
+    """
+
+    def __init__(self, search_term="", max_terms=MAX_TERMS):
+        self.counts = Counter()  # spelling as found -> occurrences
+        from wordcloud import STOPWORDS  # Imported on first use, wordcloud loads numpy and Pillow
+
+        searched = {word.lower() for word in WORD.findall(search_term or "")}
+        # The search term's words (and their singulars) are in nearly every title
+        self.excluded = ({word.lower() for word in STOPWORDS} | searched
+                         | {word[:-1] for word in searched if word.endswith("s") and not word.endswith("ss")})
+        self.max_terms = max_terms
+
+    def add(self, title):
+        """Counts the words of one title; None and non-text titles are skipped."""
+        if not isinstance(title, str):
+            return
+        for word in WORD.findall(title):
+            if word.lower().endswith("'s"):
+                word = word[:-2]
+            if len(word) > 1 and word.lower() not in self.excluded:
+                self.counts[word] += 1
+        if len(self.counts) > self.max_terms:
+            self.counts = Counter({word: count for word, count in self.counts.items() if count > 1})
+
+    def update(self, titles):
+        """Counts the words of every title of an iterable."""
+        for title in titles:
+            self.add(title)
+
+    def frequencies(self, max_words=200):
+        """
+        Returns the most frequent words, each in its most common spelling and with plurals
+        merged into their singular (e.g. 'Shoes' into 'shoe' when both occur).
+
+        :param max_words: Number of words kept, as many as the word cloud draws
+        :return: Dict of word -> count for WordCloud.generate_from_frequencies
+        """
+        spellings = {}  # lower case word -> Counter of its spellings
+        for word, count in self.counts.items():
+            spellings.setdefault(word.lower(), Counter())[word] += count
+        for word in list(spellings):
+            if word.endswith("s") and not word.endswith("ss") and word[:-1] in spellings:
+                for spelling, count in spellings.pop(word).items():
+                    spellings[word[:-1]][spelling[:-1]] += count
+        totals = Counter({forms.most_common(1)[0][0]: sum(forms.values()) for forms in spellings.values()})
+        return dict(totals.most_common(max_words))
\ No newline at end of file